@@ -24,9 +24,17 @@ import numpy as np                           # Mathematik und Arrays
 from datetime import datetime, timedelta     # Daten bearbeiten
 import random                                # Zufälliges Auswählen
 from collections import defaultdict         # Für Aggregation
+import os                                    # Pfade
+import sys                                   # Import-Pfad für Projekt-Module
 import warnings                              # Suppress warnings
 warnings.filterwarnings('ignore')
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from event_calendar import EventCalendar                         # Datum × Event Tabelle
+from event_curves import compile_event_curves, sample_event_activation  # Kurven + Aktivierung
+from schema import FreightSchema                                 # Codes + Lookup-Tabellen
+from rollup_cube import RollupCube                               # Aggregate Carrier × Route × Jahr × Monat
+
 
 # ============================================================================
 # SCHRITT 2: KONSTANTEN DEFINIEREN – Alle Parameter klar definiert
@@ -163,6 +171,16 @@ EVENT_IMPACT = {
     },
 }
 
+# EVENT_IMPACT → stückweise lineare Kurven (Ramp-Up, Plateau), 1× kompiliert
+COMPILED_EVENT_CURVES = compile_event_curves(EVENT_IMPACT)
+
+# Kompakte Spalten: carrier/route/day_of_week als Codes, Events als Bitmaske
+# (Bit-Reihenfolge = Spalten von EventCalendar.active)
+SCHEMA = FreightSchema(CARRIERS, ROUTES, COMPILED_EVENT_CURVES)
+
+# Kennzahlen im Rollup-Cube des Validierungs-Reports → (Min, Max, Bins) des Quantil-Sketches
+REPORT_MEASURES = {'avg_price_eur': (0, 6000, 1200), 'avg_ontime_pct': (50, 100, 500)}
+
 ###ALLE EVENTS HABEN EINE ZEITKURVE. Teilweise plötzlich Stark und kurz, oder eher vorhersehbar langsamer consistenter steigender und fallender. Wie in reell. Ich justiere am Ende nach
 
 # ============================================================================
@@ -259,50 +277,31 @@ AGGREGATION_MODE = "daily_detail"  # täglich pro Carrier × Route
 # SCHRITT 5: FUNKTIONEN – Die Logik des Data Generators
 # ============================================================================
 
-def get_active_events_for_date(date):
+def get_active_events_for_date(date, rng=None):
     """
     Bestimmt, welche Events zu einem Datum aktiv sind
     
-    INPUT: date (datetime object)
+    INPUT: date (datetime object), rng (optional: Seed/Generator)
     OUTPUT: Liste von aktiven Events an diesem Datum
     
     LOGIK:
-    - Red Sea: Nur ab 2024
-    - Saisonale Events: Nur in entsprechenden Monaten
-    - Wahrscheinlichkeit: Zufällig basierend auf probability_per_day
+    - Red Sea: Nur ab 2024 (start_date in EVENT_IMPACT)
+    - Saisonale Events: Nur im Kurvenfenster (Vorab-Phase + Monate)
+    - Wahrscheinlichkeit: genau 1 Ziehung pro Event (probability_per_day)
+    - Für ganze Zeitspannen: EventCalendar.from_curves() (1 Matrix für alles)
     """
-    events = []
-    month = date.month
-    year = date.year
-    
-    for event_name, config in EVENT_IMPACT.items():
-        
-        # Check: Ist das Event zum aktuellen Datum relevant?
-        
-        # Red Sea: nur ab 2024
-        if event_name == "Red Sea Blockade":   ### STIMMT DAS SO? IST DOCH VORBEI; ODER? MACH IM ZWEIFEL 24-25
-            if year < 2024-:
-                continue
-        
-        # Saisonale Events: nur in relevanten Monaten
-        if month not in config["months"]:
-            continue
-        
-        # Wahrscheinlichkeit: Tretet der Event auf? (z.B. 40% täglich) ####WOFÜR ????
-        if random.random() < config["probability_per_day"]:
-            events.append(event_name)
-    
-    return events
+    active = sample_event_activation([date], COMPILED_EVENT_CURVES, rng)[0]
+    return [event for event, is_active in zip(COMPILED_EVENT_CURVES, active) if is_active]
 
 
-def calculate_price_impact(date, base_cost):
+def calculate_price_impact(date, base_cost, event_adjustment=None):
     """
     Berechnet, wie viel der Preis durch Events/Saison steigt
 
 
     ## MUSS ABER AUCH PRO TAG UND IN EINER KURVE BEI EVENTS PASSIEREN: SUCHE MIR REALISTISCHE DATEN ALS PARAMETER !!
     
-    INPUT: date, base_cost (€/ton)
+    INPUT: date, base_cost (€/ton), event_adjustment (optional, z.B. aus EventCalendar)
     OUTPUT: final_price_impact (€/ton extra)
     
     LOGIK:
@@ -318,27 +317,12 @@ def calculate_price_impact(date, base_cost):
     seasonal_factor = 1.0 + (month - 6) * SEASONAL_FACTOR_MULTIPLIER
     seasonal_adjustment = base_cost * (seasonal_factor - 1)
     
-    # 2. EVENT-IMPACTS
-    active_events = get_active_events_for_date(date)
-    event_adjustment = 0
-    
-    for event in active_events:
-        config = EVENT_IMPACT[event]
-        
-        # Hauptphase oder Vorab-Phase?
-        weeks_before_event = config.get("weeks_before", 0)
-        event_month = config["months"][0]  # Hauptmonat
-        
-        if month == event_month:
-            # Hauptphase
-            event_adjustment += config["price_impact"]
-        elif weeks_before_event > 0:
-            # Vorab-Phase (z.B. November für Christmas)
-            days_until_event = 30 - date.day  # Vereinfacht
-            weeks_until_event = days_until_event // 7
-            
-            if weeks_until_event <= weeks_before_event and month == event_month - 1:
-                event_adjustment += config["price_before"]
+    # 2. EVENT-IMPACTS (Kurvenwert aller aktiven Events)
+    if event_adjustment is None:
+        event_adjustment = 0
+        for event in get_active_events_for_date(date):
+            price, _, _ = COMPILED_EVENT_CURVES[event].evaluate([date])
+            event_adjustment += price[0]
     
     # 3. MARKTRAUSCHEN (tägliche Volatilität)
     market_noise = random.uniform(-50, 100)
@@ -362,17 +346,141 @@ def calculate_ontime_impact(date):
     ontime_adjustment = 0
     
     for event in active_events:
-        config = EVENT_IMPACT[event]
-        ontime_adjustment += config["ontime_impact"]
+        _, ontime, _ = COMPILED_EVENT_CURVES[event].evaluate([date])
+        ontime_adjustment += ontime[0]
     
     return ontime_adjustment
 
 
-def generate_daily_aggregated_data():
+def _generate_day_rows(current_date, event_price, event_ontime, event_mask):
+    """
+    Erzeugt alle Zeilen eines Tages (1 Zeile pro Carrier × Route)
+
+    INPUT:
+    - current_date (datetime object)
+    - event_price, event_ontime: Event-Impacts dieses Tages (aus EventCalendar)
+    - event_mask: aktive Events dieses Tages als Bitmaske (SCHEMA.event_mask)
+    OUTPUT: Liste von Dicts (45 Zeilen = 5 Carriers × 9 Routes) mit Codes statt
+            Strings – _to_chunk macht daraus Categoricals
+    """
+    rows = []
+    date = np.datetime64(current_date.date(), 'D')
+    dow = current_date.weekday()
+
+    # Für JEDEN Carrier und JEDE Route an diesem Tag
+    for carrier_code, carrier in enumerate(CARRIERS):
+        for route_code, route in enumerate(ROUTES):
+            
+            # Hole Carrier-Basis-KPIs
+            carrier_config = CARRIER_CONFIG[carrier]
+            base_cost = carrier_config["base_cost"]
+            base_ontime = carrier_config["on_time_pct"]
+            base_ontime_std = carrier_config["on_time_std"]
+            
+            # Hole Route-Anpassung
+            destination = route.split(" → ")[1]  # "Hamburg", "Rotterdam", etc.
+            route_adjustment = ROUTE_ADJUSTMENT.get(destination, 0)
+            
+            # PREIS-BERECHNUNG
+            price_impact = calculate_price_impact(current_date, base_cost, event_price)
+            final_price = base_cost + route_adjustment + price_impact
+            
+            # ON-TIME %-BERECHNUNG
+            final_ontime = base_ontime + event_ontime + np.random.normal(0, base_ontime_std)
+            final_ontime = np.clip(final_ontime, ON_TIME_MIN, ON_TIME_MAX)
+            
+            # ANZAHL SHIPMENTS an diesem Tag
+            # ~33 Shipments pro Tag gesamt, verteilt auf 45 Kombinationen
+            # = ~0.73 Shipments pro Kombination und Tag (poisson verteilt)
+            shipment_count = np.random.poisson(0.7)  # Poisson für realistisches Rauschen
+            if shipment_count == 0:
+                shipment_count = 1  # Mindestens 1 pro Kombination
+            
+            # SPEICHERE DATENSATZ
+            rows.append({
+                'date': date,
+                'carrier': carrier_code,
+                'route': route_code,
+                'avg_price_eur': round(final_price, 2),
+                'avg_ontime_pct': round(final_ontime, 1),
+                'shipment_count': int(shipment_count),
+                'event_mask': event_mask,
+                'year': current_date.year,
+                'month': current_date.month,
+                'day_of_week': dow,
+            })
+
+    return rows
+
+
+def iter_daily_aggregated_data(chunk_size=50_000, as_arrow=False, start_date=START_DATE, end_date=END_DATE, seed=None):
+    """
+    Streaming-Modus: liefert die Daten in Blöcken statt alles im RAM zu halten
+
+    INPUT:
+    - start_date, end_date: Zeitspanne (Default: 2015-2024)
+    - chunk_size: Ziel-Zeilen pro Block (wird auf ganze Tage gerundet)
+    - as_arrow: True = pyarrow.RecordBatch statt DataFrame
+    - seed: fixiert die Event-Aktivierung (gleicher Seed = gleiche Events)
+    OUTPUT: Generator von DataFrames (bzw. RecordBatches)
+
+    Peak-Speicher hängt nur von chunk_size ab, nicht von der Zeitspanne.
+    """
+    rows_per_day = len(CARRIERS) * len(ROUTES)
+    days_per_chunk = max(1, chunk_size // rows_per_day)
+
+    # Event-Aktivierung 1× pro Tag und Event für die ganze Zeitspanne ziehen
+    # (klein: Tage × 6 Events) → Preis, On-Time und active_events konsistent
+    calendar = EventCalendar.from_curves(start_date, end_date, COMPILED_EVENT_CURVES, rng=seed)
+    event_price = calendar.price_impact()
+    event_ontime = calendar.ontime_impact()
+    event_masks = SCHEMA.event_mask(calendar.active)
+
+    data = []
+    days_in_chunk = 0
+    day = 0
+    current_date = start_date
+
+    while current_date <= end_date:
+
+        # Fortschritt alle 365 Tage anzeigen
+        if (current_date - start_date).days % 365 == 0:
+            print(f"  ⏳ {current_date.strftime('%Y-%m-%d')} ({(current_date - start_date).days // 365} Jahre)")
+
+        data.extend(_generate_day_rows(current_date, event_price[day], event_ontime[day], event_masks[day]))
+        days_in_chunk += 1
+
+        # Block voll → ausliefern und Speicher freigeben
+        if days_in_chunk == days_per_chunk:
+            yield _to_chunk(data, as_arrow)
+            data = []
+            days_in_chunk = 0
+
+        # Nächster Tag
+        current_date += timedelta(days=1)
+        day += 1
+
+    if data:
+        yield _to_chunk(data, as_arrow)
+
+
+def _to_chunk(rows, as_arrow):
+    """Wandelt eine Liste von Dicts in DataFrame oder Arrow RecordBatch (Codes → Categoricals)"""
+    df = SCHEMA.from_codes(rows)
+    if not as_arrow:
+        return df
+    try:
+        import pyarrow as pa
+    except ImportError as exc:
+        raise ImportError("as_arrow=True benötigt pyarrow (pip install pyarrow)") from exc
+    return pa.RecordBatch.from_pandas(df, preserve_index=False)
+
+
+def generate_daily_aggregated_data(seed=None):
     """
     Erzeugt täglich aggregierte Daten (1 Zeile pro Tag pro Carrier pro Route)
     
-    INPUT: None (nutzt globale Konstanten)
+    INPUT: seed (optional) – fixiert die Event-Aktivierung
     OUTPUT: DataFrame mit 164.385 Zeilen (3.653 Tage × 5 Carriers × 9 Routes)
     
     STRUKTUR:
@@ -382,75 +490,14 @@ def generate_daily_aggregated_data():
     - avg_price: Durchschnittspreis an diesem Tag
     - avg_ontime: Durchschnittliche On-Time % an diesem Tag
     - shipment_count: Wie viele Schiffe an diesem Tag auf dieser Route
-    - active_events: Welche Events waren aktiv
+    - event_mask: Welche Events waren aktiv (Bitmaske, Namen: SCHEMA.event_labels)
+
+    Für Datenmengen > RAM: iter_daily_aggregated_data() verwenden.
     """
     
-    data = []
-    current_date = START_DATE
-    shipment_id_counter = 1
-    
     print("📊 Generiere täglich aggregierte Daten...")
     
-    while current_date <= END_DATE:
-        
-        # Fortschritt alle 365 Tage anzeigen
-        if (current_date - START_DATE).days % 365 == 0:
-            print(f"  ⏳ {current_date.strftime('%Y-%m-%d')} ({(current_date - START_DATE).days // 365} Jahre)")
-        
-        # Für JEDEN Carrier und JEDE Route an diesem Tag
-        for carrier in CARRIERS:
-            for route in ROUTES:
-                
-                # Hole Carrier-Basis-KPIs
-                carrier_config = CARRIER_CONFIG[carrier]
-                base_cost = carrier_config["base_cost"]
-                base_ontime = carrier_config["on_time_pct"]
-                base_ontime_std = carrier_config["on_time_std"]
-                
-                # Hole Route-Anpassung
-                destination = route.split(" → ")[1]  # "Hamburg", "Rotterdam", etc.
-                route_adjustment = ROUTE_ADJUSTMENT.get(destination, 0)
-                
-                # PREIS-BERECHNUNG
-                price_impact = calculate_price_impact(current_date, base_cost)
-                final_price = base_cost + route_adjustment + price_impact
-                
-                # ON-TIME %-BERECHNUNG
-                ontime_impact = calculate_ontime_impact(current_date)
-                final_ontime = base_ontime + ontime_impact + np.random.normal(0, base_ontime_std)
-                final_ontime = np.clip(final_ontime, ON_TIME_MIN, ON_TIME_MAX)
-                
-                # ANZAHL SHIPMENTS an diesem Tag
-                # ~33 Shipments pro Tag gesamt, verteilt auf 45 Kombinationen
-                # = ~0.73 Shipments pro Kombination und Tag (poisson verteilt)
-                shipment_count = np.random.poisson(0.7)  # Poisson für realistisches Rauschen
-                if shipment_count == 0:
-                    shipment_count = 1  # Mindestens 1 pro Kombination
-                
-                # EVENTS
-                active_events = get_active_events_for_date(current_date)
-                events_str = " | ".join(active_events) if active_events else "None"
-                
-                # SPEICHERE DATENSATZ
-                data.append({
-                    'date': current_date.strftime('%Y-%m-%d'),
-                    'carrier': carrier,
-                    'route': route,
-                    'avg_price_eur': round(final_price, 2),
-                    'avg_ontime_pct': round(final_ontime, 1),
-                    'shipment_count': int(shipment_count),
-                    'active_events': events_str,
-                    'year': current_date.year,
-                    'month': current_date.month,
-                    'day_of_week': current_date.strftime('%A'),
-                })
-                
-                shipment_id_counter += shipment_count
-        
-        # Nächster Tag
-        current_date += timedelta(days=1)
-    
-    return pd.DataFrame(data)
+    return pd.concat(iter_daily_aggregated_data(seed=seed), ignore_index=True)
 
 
 # ============================================================================
@@ -529,13 +576,17 @@ def forecast_december_2025(df):
 # SCHRITT 7: VALIDIERUNGS-REPORT – Ist die Datenqualität OK?
 # ============================================================================
 
-def validate_data_quality(df):
+def validate_data_quality(df, cube=None):
     """
     Überprüft, ob die generierten Daten realistisch sind
     
     INPUT: df = DataFrame mit generierten Daten
+           cube = RollupCube über df (optional, sonst 1× aufgebaut) – alle
+                  Statistiken kommen aus dem Cube statt aus groupby-Scans
     OUTPUT: Druckt ausführlichen Validierungs-Report
     """
+    if cube is None:
+        cube = RollupCube.from_frame(df, CARRIERS, ROUTES, REPORT_MEASURES)
     
     print("\n" + "=" * 100)
     print("📊 DATENQUALITÄTS-VALIDIERUNG")
@@ -544,34 +595,37 @@ def validate_data_quality(df):
     # 1. DATENGRÖSSE
     print(f"\n✅ Datensätze: {len(df):,} (Ziel: 164.385 = 3.653 Tage × 5 Carriers × 9 Routes)")
     print(f"✅ CSV Größe: ~{len(df) * 200 / (1024*1024):.1f} MB")
+    print(f"✅ RAM (kompakte Spalten): {df.memory_usage(deep=True).sum() / (1024*1024):.1f} MB")
     
     # 2. ZEITSPANNE
     print(f"\n✅ Zeitspanne: {df['date'].min()} bis {df['date'].max()}")
-    print(f"✅ Abgedeckte Jahre: {sorted(df['year'].unique())}")
+    print(f"✅ Abgedeckte Jahre: {sorted(df['year'].unique().tolist())}")
     
     # 3. KOSTEN-STATISTIKEN
     print(f"\n✅ Kosten (EUR/Schiff auf dieser Route):")
-    print(f"   - Min: EUR {df['avg_price_eur'].min():.2f}")
-    print(f"   - Max: EUR {df['avg_price_eur'].max():.2f}")
-    print(f"   - Durchschnitt: EUR {df['avg_price_eur'].mean():.2f}")
-    print(f"   - Median: EUR {df['avg_price_eur'].median():.2f}")
+    price = cube.stats('avg_price_eur', by=()).iloc[0]
+    price_median = cube.quantile('avg_price_eur', 0.5, by=()).iloc[0, 0]
+    print(f"   - Min: EUR {price['min']:.2f}")
+    print(f"   - Max: EUR {price['max']:.2f}")
+    print(f"   - Durchschnitt: EUR {price['mean']:.2f}")
+    print(f"   - Median: EUR {price_median:.2f} (Sketch, ±EUR 5)")
     
     # 4. ON-TIME STATISTIKEN PRO CARRIER
     print(f"\n✅ On-Time % (nach Carrier):")
-    carrier_stats = df.groupby('carrier')['avg_ontime_pct'].agg(['mean', 'min', 'max', 'std'])
+    carrier_stats = cube.stats('avg_ontime_pct', by=('carrier',))
     for carrier, row in carrier_stats.iterrows():
         print(f"   {carrier:20} -> O {row['mean']:.1f}% (±{row['std']:.1f}%, Bereich {row['min']:.1f}%-{row['max']:.1f}%)")
     
     # 5. CARRIER-VERTEILUNG
     print(f"\n✅ Datensätze pro Carrier:")
-    carrier_dist = df['carrier'].value_counts().sort_values(ascending=False)
+    carrier_dist = cube.total_count(by=('carrier',)).sort_values(ascending=False, kind='stable')
     for carrier, count in carrier_dist.items():
         pct = (count / len(df)) * 100
         print(f"   {carrier:20} -> {count:7,} ({pct:5.1f}%)")
     
     # 6. ROUTE-VERTEILUNG
     print(f"\n✅ Datensätze pro Route:")
-    route_dist = df['route'].value_counts().sort_values(ascending=False)
+    route_dist = cube.total_count(by=('route',)).sort_values(ascending=False, kind='stable')
     for route, count in route_dist.items():
         pct = (count / len(df)) * 100
         print(f"   {route:30} -> {count:7,} ({pct:5.1f}%)")
@@ -582,18 +636,15 @@ def validate_data_quality(df):
     print(f"   - Total Schiffe: {df['shipment_count'].sum():,} (über 10 Jahre)")
     print(f"   - Durchschnitt pro Tag: {df['shipment_count'].sum() / len(df['date'].unique()):.0f} Schiffe")
     
-    # 8. EVENT-HÄUFIGKEITEN
+    # 8. EVENT-HÄUFIGKEITEN (Bit-Test über event_mask statt String-Split pro Zeile)
     print(f"\n✅ Event-Häufigkeiten:")
-    event_counts = {}
-    for events_str in df['active_events']:
-        if events_str != "None":
-            for event in events_str.split(" | "):
-                event_counts[event] = event_counts.get(event, 0) + 1
+    if 'event_mask' not in df:
+        df = SCHEMA.encode(df)       # z.B. alte CSV mit active_events-Strings
+    event_counts = SCHEMA.event_counts(df['event_mask'])
     
-    if event_counts:
-        for event, count in sorted(event_counts.items(), key=lambda x: x[1], reverse=True):
-            pct = (count / len(df)) * 100
-            print(f"   {event:25} -> {count:7,} ({pct:5.1f}%) der Tage")
+    for event, count in event_counts[event_counts > 0].sort_values(ascending=False, kind='stable').items():
+        pct = (count / len(df)) * 100
+        print(f"   {event:25} -> {count:7,} ({pct:5.1f}%) der Tage")
     
     print("\n" + "=" * 100)
 
@@ -633,7 +684,7 @@ if __name__ == "__main__":
     
     # Historische Daten
     output_file_historical = "shipments_history_daily.csv"
-    df_historical.to_csv(output_file_historical, index=False)
+    SCHEMA.decode(df_historical).to_csv(output_file_historical, index=False)   # lesbare Event-Namen
     print(f"✅ Historische Daten gespeichert: {output_file_historical}")
     print(f"   - {len(df_historical):,} Zeilen")
     print(f"   - Größe: {len(df_historical) * 200 / (1024*1024):.1f} MB")
@@ -644,6 +695,15 @@ if __name__ == "__main__":
     print(f"✅ Dezember 2025 Vorhersage gespeichert: {output_file_forecast}")
     print(f"   - {len(df_forecast):,} Zeilen (45 Kombinationen = 5 Carriers × 9 Routes)")
     
+    # Parquet-Store (partitioniert nach Jahr/Route) für UI & Predictor
+    try:
+        from dataset_store import write_dataset
+        output_dir_historical = "shipments_history_daily"
+        write_dataset(df_historical, output_dir_historical)
+        print(f"✅ Parquet-Store gespeichert: {output_dir_historical}/ (year=…/route=…)")
+    except ImportError:
+        print("ℹ️ pyarrow nicht installiert – Parquet-Store übersprungen")
+    
     print("\n" + "=" * 100)
     print("✅ GENERATOR ERFOLGREICH ABGESCHLOSSEN!")
     print("=" * 100)
@@ -652,7 +712,7 @@ if __name__ == "__main__":
 📋 NÄCHSTE SCHRITTE:
 
 1. CSV in Streamlit laden:
-   → df = pd.read_csv('shipments_history_daily.csv')
+   → df = SCHEMA.encode(pd.read_csv('shipments_history_daily.csv'))
    → df_forecast = pd.read_csv('forecast_december_2025.csv')
 
 2. Dezember-Vergleich im Vortrag:
@@ -667,5 +727,6 @@ if __name__ == "__main__":
    
 📊 DATENQUELLEN:
    - shipments_history_daily.csv: Historische Daten 2015-2024 (164k Zeilen)
+   - shipments_history_daily/: gleiche Daten als Parquet (read_dataset(..., routes=[...]))
    - forecast_december_2025.csv: Dezember 2025 Vorhersage (45 Zeilen)
     """)
@@ -1,4 +1,4 @@
-============================================================================
+# ============================================================================
 # DATA GENERATOR V2.0 – MIT EVENT-KURVEN (Komplett)
 # ============================================================================
 # VERWENDUNG: python3 data_generator_v2.py
@@ -9,9 +9,17 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import random
+import os
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from event_calendar import EventCalendar
+from event_curves import EVENT_CURVES, compile_event_curves, sample_event_activation
+from schema import FreightSchema
+from rollup_cube import RollupCube
+
 
 # ============================================================================
 # SCHRITT 1: KONSTANTEN
@@ -93,6 +101,15 @@ WEIGHT_MAX = 500
 ON_TIME_MIN = 70
 ON_TIME_MAX = 99
 
+# Event-Kurven: Definition in event_curves.EVENT_CURVES, hier 1× kompiliert
+COMPILED_EVENT_CURVES = compile_event_curves(EVENT_CURVES)
+
+# Codes für carrier/route/day_of_week, Events als Bitmaske (Reihenfolge = EventCalendar)
+SCHEMA = FreightSchema(CARRIERS, ROUTES, COMPILED_EVENT_CURVES)
+
+# Kennzahlen im Rollup-Cube der Validierung → (Min, Max, Bins) des Quantil-Sketches
+REPORT_MEASURES = {'avg_price_eur': (0, 6000, 1200), 'avg_ontime_pct': (50, 100, 500)}
+
 
 # ============================================================================
 # SCHRITT 2: EVENT-KURVEN-FUNKTIONEN
@@ -110,199 +127,41 @@ def get_event_curve_impact(date, event_name):
       - tuple (price_impact €, ontime_impact %)
     
     LOGIK:
-    - Jeder Event hat eine charakteristische Kurve
+    - Kurven sind deklarativ in event_curves.EVENT_CURVES definiert
     - Christmas: Dreieck-Kurve (Ramp-up, Peak, Ramp-down)
-    - Red Sea: Plötzlich & intermittierend (40% Tage)
+    - Red Sea: Plötzlich (Intermittenz über probability_per_day)
     - Suez: Konstant (keine Kurve)
+    - Für ganze Zeitspannen: EventCalendar.from_curves() (vektorisiert)
     """
-    
-    year = date.year
-    month = date.month
-    day = date.day
-    
-    # ========== CHRISTMAS PEAK (Okt-Jan) ==========
-    if event_name == "Christmas Peak":
-        
-        # Phase 1: Early Bird (1. Okt - 15. Nov)
-        # Logik: Langsamer Anstieg, viele Wochen vorher buchen
-        if month == 10 and day >= 1:
-            weeks_in = min((datetime(year, 10, day) - datetime(year, 10, 1)).days // 7, 4)
-            price = 10 + (weeks_in / 4) * 40  # 10€ → 50€ linear
-            ontime = -0.5 - (weeks_in / 4) * 1.5  # -0.5% → -2%
-            return (price, ontime)
-        
-        # Phase 1b: Early Mid (16. Nov - 30. Nov)
-        elif month == 11 and day <= 15:
-            weeks_in = (day - 1) // 7
-            price = 50 + (weeks_in / 2) * 50  # 50€ → 100€
-            ontime = -2 - (weeks_in / 2) * 0.5  # -2% → -2.5%
-            return (price, ontime)
-        
-        # Phase 2: Peak Surge (16. Nov - 20. Dez)
-        # Logik: Schneller Anstieg, letzte Chance zu buchen
-        elif (month == 11 and day > 15) or (month == 12 and day <= 20):
-            if month == 11:
-                progress = (day - 15) / 15  # 0 → 1 over 15 days
-            else:
-                progress = (20 + (day - 1)) / 35  # continuation
-            price = 100 + (progress / 2) * 150  # 100€ → 250€
-            ontime = -2.5 - (progress / 2) * 0.5  # -2.5% → -3%
-            return (price, ontime)
-        
-        # Phase 3: Absolute Peak (21. Dez - 24. Dez)
-        # Logik: Maximum Preis, maximaler Stress
-        elif month == 12 and 21 <= day <= 24:
-            return (250, -3.0)
-        
-        # Phase 4: Post-Event (25. Dez - 31. Dez)
-        # Logik: Nach Weihnachten Abbau, Kapazität freigegeben
-        elif month == 12 and day >= 25:
-            weeks_after = (31 - day) // 7
-            price = 250 - (weeks_after / 2) * 100  # 250€ → 150€
-            ontime = -3.0 + (weeks_after / 2) * 1.0  # -3% → -1%
-            return (price, ontime)
-        
-        # Phase 5: Post-Event Fortsetzung (1. Jan - 14. Jan)
-        elif month == 1 and day <= 14:
-            weeks_after = 1 + (day - 1) // 7
-            price = 150 - min(weeks_after / 3, 1) * 150  # 150€ → 0€
-            ontime = -1.0 + (weeks_after / 4) * 1.0  # -1% → 0%
-            return (price, ontime)
-    
-    # ========== CHINESE NEW YEAR (Jan-März) ==========
-    elif event_name == "Chinese New Year":
-        
-        # Phase 1: Early (1. Jan - 15. Jan)
-        if month == 1 and day <= 15:
-            progress = day / 15
-            price = 20 + progress * 60  # 20€ → 80€
-            ontime = -0.8 - progress * 1.2  # -0.8% → -2%
-            return (price, ontime)
-        
-        # Phase 2: Peak (16. Jan - 14. Feb)
-        elif (month == 1 and day > 15) or (month == 2 and day <= 14):
-            if month == 1:
-                progress = (day - 15) / 16
-            else:
-                progress = day / 14
-            price = 80 + progress * 70  # 80€ → 150€
-            ontime = -2.0 - progress * 2.0  # -2% → -4%
-            return (price, ontime)
-        
-        # Phase 3: Post (15. Feb - 28./29. Feb)
-        elif month == 2 and day >= 15:
-            progress = (day - 15) / 13
-            price = 150 - progress * 150  # 150€ → 0€
-            ontime = -4.0 + progress * 4.0  # -4% → 0%
-            return (price, ontime)
-    
-    # ========== EASTER HOLIDAY (März-April) ==========
-    elif event_name == "Easter Holiday":
-        
-        # Phase 1: Ramp (1. März - 31. März)
-        if month == 3:
-            progress = day / 31
-            price = 20 + progress * 80  # 20€ → 100€
-            ontime = -1.0 - progress * 1.0  # -1% → -2%
-            return (price, ontime)
-        
-        # Phase 2: Post (1. April - 15. April)
-        elif month == 4 and day <= 15:
-            progress = (15 - day) / 15
-            price = 100 - progress * 100  # 100€ → 0€
-            ontime = -2.0 + progress * 2.0  # -2% → 0%
-            return (price, ontime)
-    
-    # ========== SUMMER PEAK (Juni-Sept) ==========
-    elif event_name == "Summer Peak":
-        
-        # Phase 1: Ramp (1. Juni - 30. Juni)
-        if month == 6:
-            progress = day / 30
-            price = 20 + progress * 60  # 20€ → 80€
-            ontime = -0.5 - progress * 0.5  # -0.5% → -1%
-            return (price, ontime)
-        
-        # Phase 2: Plateau (1. Juli - 31. Aug)
-        elif month == 7 or month == 8:
-            return (80, -1.0)
-        
-        # Phase 3: Post (1. Sept - 15. Sept)
-        elif month == 9 and day <= 15:
-            progress = day / 15
-            price = 80 - progress * 80  # 80€ → 0€
-            ontime = -1.0 + progress * 1.0  # -1% → 0%
-            return (price, ontime)
-    
-    # ========== RED SEA BLOCKADE (Jan 2024+) ==========
-    elif event_name == "Red Sea Blockade":
-        # Erste ab 2024, unerwartete Krise (keine sanfte Kurve)
-        if year < 2024:
-            return (0, 0)
-        
-        # Intermittierend: 40% der Tage aktiv
-        if random.random() < 0.4:
-            return (300, -5.0)
-        else:
-            return (0, 0)
-    
-    # ========== SUEZ CONGESTION (Ganzjährig) ==========
-    elif event_name == "Suez Congestion":
-        # Konstant, keine Kurve, keine zeitliche Variation
-        return (50, -1.0)
-    
-    # Default: Kein Event
-    return (0, 0)
+    curve = COMPILED_EVENT_CURVES.get(event_name)
+    if curve is None:
+        return (0, 0)
+    price, ontime, _ = curve.evaluate([date])
+    return (float(price[0]), float(ontime[0]))
 
 
-def get_active_events_for_date(date):
+def get_active_events_for_date(date, rng=None):
     """
     ✅ Bestimmt, welche Events an einem Datum aktiv sind
-    Nutzt get_event_curve_impact() zur Berechnung
-    """
-    events = []
-    month = date.month
-    year = date.year
-    
-    # Christmas Peak (Oktober-Januar)
-    if month in [10, 11, 12, 1]:
-        events.append("Christmas Peak")
-    
-    # Chinese New Year (Januar-März)
-    if month in [1, 2, 3]:
-        # Nur wenn noch nicht in Christmas
-        if month != 1:
-            events.append("Chinese New Year")
-    
-    # Easter Holiday (März-April)
-    if month in [3, 4]:
-        # Nur wenn nicht bereits in CNY
-        if month == 4 or (month == 3 and date.day > 15):
-            events.append("Easter Holiday")
-    
-    # Summer Peak (Juni-September)
-    if month in [6, 7, 8, 9]:
-        events.append("Summer Peak")
-    
-    # Red Sea Blockade (ab 2024, ganzjährig)
-    if year >= 2024:
-        # Intermittierend: nur 40% der Tage
-        if random.random() < 0.4:
-            events.append("Red Sea Blockade")
     
-    # Suez Congestion (immer aktiv)
-    events.append("Suez Congestion")
-    
-    return events
+    - Zeitfenster kommt aus der Kurve (event_curves.EVENT_CURVES)
+    - Intermittenz: genau 1 Ziehung pro Event (probability_per_day)
+    - Für ganze Zeitspannen: EventCalendar.from_curves() (1 Matrix für alles)
+    """
+    active = sample_event_activation([date], COMPILED_EVENT_CURVES, rng)[0]
+    return [event for event, is_active in zip(COMPILED_EVENT_CURVES, active) if is_active]
 
 
 # ============================================================================
 # SCHRITT 3: PREISBERECHNUNGEN
 # ============================================================================
 
-def calculate_price_impact(date, base_cost):
+def calculate_price_impact(date, base_cost, event_adjustment=None):
     """
     💰 Berechnet Preis-Impact = Saisonalität + Event-Kurven + Rauschen
+    
+    event_adjustment: vorberechneter Event-Impact (z.B. aus EventCalendar),
+    None = Event-Kurven hier auswerten
     """
     month = date.month
     
@@ -312,12 +171,11 @@ def calculate_price_impact(date, base_cost):
     seasonal_adjustment = base_cost * (seasonal_factor - 1)
     
     # 2. Event-Impacts mit Kurven
-    active_events = get_active_events_for_date(date)
-    event_adjustment = 0
-    
-    for event in active_events:
-        price_impact, _ = get_event_curve_impact(date, event)
-        event_adjustment += price_impact
+    if event_adjustment is None:
+        event_adjustment = 0
+        for event in get_active_events_for_date(date):
+            price_impact, _ = get_event_curve_impact(date, event)
+            event_adjustment += price_impact
     
     # 3. Marktrauschen (tägliche Volatilität ±€100)
     market_noise = random.uniform(-100, 100)
@@ -345,10 +203,12 @@ def calculate_ontime_impact(date):
 # SCHRITT 4: HAUPTDATENGENERIERUNG
 # ============================================================================
 
-def generate_daily_aggregated_data():
+def generate_daily_aggregated_data(seed=None):
     """
     📊 Erzeugt 164.385 täglich aggregierte Datensätze mit Event-Kurven
     
+    INPUT: seed – fixiert die Event-Aktivierung (gleicher Seed = gleiche Events)
+    
     OUTPUT:
     - 1 Zeile pro Tag pro Carrier pro Route
     - = 3.653 Tage × 5 Carriers × 9 Routes = 164.385 Zeilen
@@ -361,6 +221,14 @@ def generate_daily_aggregated_data():
     print(f"   Tage: {DATE_RANGE_DAYS}, Carriers: 5, Routen: 9")
     print(f"   Erwartet: ~{DATE_RANGE_DAYS * 5 * 9:,} Datensätze\n")
     
+    # Event-Aktivierung 1× pro Tag und Event ziehen, Kurven 1× pro Tag auswerten
+    # → Preis, On-Time und active_events nutzen dieselbe Aktivierungs-Matrix
+    calendar = EventCalendar.from_curves(START_DATE, END_DATE, COMPILED_EVENT_CURVES, rng=seed)
+    event_price = calendar.price_impact()
+    event_ontime = calendar.ontime_impact()
+    event_masks = SCHEMA.event_mask(calendar.active)
+    day = 0
+    
     while current_date <= END_DATE:
         
         # Fortschritt zeigen
@@ -368,9 +236,13 @@ def generate_daily_aggregated_data():
             years_passed = (current_date - START_DATE).days // 365
             print(f"  ⏳ {current_date.strftime('%Y-%m-%d')} ({years_passed} Jahre verarbeitet...)")
         
+        # Datum + Wochentag 1× pro Tag (statt strftime pro Zeile)
+        date = np.datetime64(current_date.date(), 'D')
+        dow = current_date.weekday()
+        
         # Für JEDEN Carrier und JEDE Route an diesem Tag
-        for carrier in CARRIERS:
-            for route in ROUTES:
+        for carrier_code, carrier in enumerate(CARRIERS):
+            for route_code, route in enumerate(ROUTES):
                 
                 # Hole Carrier-Basis-KPIs
                 carrier_config = CARRIER_CONFIG[carrier]
@@ -383,12 +255,11 @@ def generate_daily_aggregated_data():
                 route_adjustment = ROUTE_ADJUSTMENT.get(destination, 0)
                 
                 # === PREIS-BERECHNUNG ===
-                price_impact = calculate_price_impact(current_date, base_cost)
+                price_impact = calculate_price_impact(current_date, base_cost, event_price[day])
                 final_price = base_cost + route_adjustment + price_impact
                 
                 # === ON-TIME %-BERECHNUNG ===
-                ontime_impact = calculate_ontime_impact(current_date)
-                final_ontime = base_ontime + ontime_impact + np.random.normal(0, base_ontime_std)
+                final_ontime = base_ontime + event_ontime[day] + np.random.normal(0, base_ontime_std)
                 final_ontime = np.clip(final_ontime, ON_TIME_MIN, ON_TIME_MAX)
                 
                 # === ANZAHL SHIPMENTS ===
@@ -397,28 +268,25 @@ def generate_daily_aggregated_data():
                 if shipment_count == 0:
                     shipment_count = 1  # Mindestens 1
                 
-                # === AKTIVE EVENTS ===
-                active_events = get_active_events_for_date(current_date)
-                events_str = " | ".join(active_events) if active_events else "None"
-                
-                # === SPEICHERE DATENSATZ ===
+                # === SPEICHERE DATENSATZ (Codes, Events als Bitmaske) ===
                 data.append({
-                    'date': current_date.strftime('%Y-%m-%d'),
-                    'carrier': carrier,
-                    'route': route,
+                    'date': date,
+                    'carrier': carrier_code,
+                    'route': route_code,
                     'avg_price_eur': round(final_price, 2),
                     'avg_ontime_pct': round(final_ontime, 1),
                     'shipment_count': int(shipment_count),
-                    'active_events': events_str,
+                    'event_mask': event_masks[day],
                     'year': current_date.year,
                     'month': current_date.month,
-                    'day_of_week': current_date.strftime('%A'),
+                    'day_of_week': dow,
                 })
         
         # Nächster Tag
         current_date += timedelta(days=1)
+        day += 1
     
-    return pd.DataFrame(data)
+    return SCHEMA.from_codes(data)
 
 
 # ============================================================================
@@ -493,10 +361,12 @@ def forecast_december_2025(df):
 # SCHRITT 6: VALIDIERUNG
 # ============================================================================
 
-def validate_data_quality(df):
+def validate_data_quality(df, cube=None):
     """
-    ✅ Validiert die Datenqualität
+    ✅ Validiert die Datenqualität (Statistiken aus dem RollupCube, optional übergeben)
     """
+    if cube is None:
+        cube = RollupCube.from_frame(df, CARRIERS, ROUTES, REPORT_MEASURES)
     
     print("\n" + "=" * 100)
     print("📊 DATENQUALITÄTS-VALIDIERUNG")
@@ -505,30 +375,29 @@ def validate_data_quality(df):
     # 1. DATENGRÖSSE
     print(f"\n✅ Datensätze: {len(df):,} (Ziel: {DATE_RANGE_DAYS * 5 * 9:,})")
     print(f"✅ Zeitspanne: {df['date'].min()} bis {df['date'].max()}")
-    print(f"✅ Jahre: {sorted(df['year'].unique())}")
+    print(f"✅ Jahre: {sorted(df['year'].unique().tolist())}")
     
     # 2. KOSTEN-STATISTIKEN
     print(f"\n✅ Kosten (EUR/Ton):")
-    print(f"   Min: €{df['avg_price_eur'].min():.2f}")
-    print(f"   Max: €{df['avg_price_eur'].max():.2f}")
-    print(f"   Durchschnitt: €{df['avg_price_eur'].mean():.2f}")
-    print(f"   Median: €{df['avg_price_eur'].median():.2f}")
+    price = cube.stats('avg_price_eur', by=()).iloc[0]
+    print(f"   Min: €{price['min']:.2f}")
+    print(f"   Max: €{price['max']:.2f}")
+    print(f"   Durchschnitt: €{price['mean']:.2f}")
+    print(f"   Median: €{cube.quantile('avg_price_eur', 0.5, by=()).iloc[0, 0]:.2f} (Sketch, ±€5)")
     
     # 3. ON-TIME STATISTIKEN PRO CARRIER
     print(f"\n✅ On-Time % (nach Carrier):")
-    carrier_stats = df.groupby('carrier')['avg_ontime_pct'].agg(['mean', 'min', 'max', 'std'])
+    carrier_stats = cube.stats('avg_ontime_pct', by=('carrier',))
     for carrier, row in carrier_stats.iterrows():
         print(f"   {carrier:20} → {row['mean']:.1f}% (±{row['std']:.1f}%, Bereich {row['min']:.1f}%-{row['max']:.1f}%)")
     
-    # 4. EVENT-HÄUFIGKEITEN
+    # 4. EVENT-HÄUFIGKEITEN (Bit-Test über event_mask)
     print(f"\n✅ Event-Häufigkeiten:")
-    event_counts = {}
-    for events_str in df['active_events']:
-        if events_str != "None":
-            for event in events_str.split(" | "):
-                event_counts[event] = event_counts.get(event, 0) + 1
+    if 'event_mask' not in df:
+        df = SCHEMA.encode(df)       # alte CSV mit active_events-Strings
+    event_counts = SCHEMA.event_counts(df['event_mask'])
     
-    for event, count in sorted(event_counts.items(), key=lambda x: x[1], reverse=True):
+    for event, count in event_counts[event_counts > 0].sort_values(ascending=False, kind='stable').items():
         pct = (count / len(df)) * 100
         print(f"   {event:25} → {count:7,} Tage ({pct:5.1f}%)")
     
@@ -562,7 +431,7 @@ if __name__ == "__main__":
     print("\n⏳ SCHRITT 4: Speichere CSVs...")
     
     output_file_historical = "shipments_history_daily.csv"
-    df_historical.to_csv(output_file_historical, index=False)
+    SCHEMA.decode(df_historical).to_csv(output_file_historical, index=False)
     print(f"✅ {output_file_historical}: {len(df_historical):,} Zeilen")
     
     output_file_forecast = "forecast_december_2025.csv"
@@ -597,11 +466,11 @@ if __name__ == "__main__":
 🚀 NÄCHSTE SCHRITTE:
 
 1️⃣ Lade in Streamlit:
-   df = pd.read_csv('shipments_history_daily.csv')
+   df = SCHEMA.encode(pd.read_csv('shipments_history_daily.csv'))
    df_forecast = pd.read_csv('forecast_december_2025.csv')
 
 2️⃣ Visualisiere Event-Kurven:
-   christmas = df[df['active_events'].str.contains('Christmas')]
+   christmas = df[SCHEMA.has_event(df['event_mask'], 'Christmas Peak')]
    christmas.groupby('date')['avg_price_eur'].mean().plot()
 
 3️⃣ Dezember-Vergleich (Pitch):
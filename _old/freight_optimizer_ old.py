@@ -9,12 +9,29 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import StandardScaler
+import os
+import sys
 import random
 import warnings
+from concurrent.futures import ProcessPoolExecutor
 warnings.filterwarnings('ignore')
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from event_calendar import EventCalendar
+from event_curves import EVENT_CURVES, compile_event_curves, sample_event_activation
+from history_arrays import HistoryArrays
+from feature_store import FeatureStore
+from linear_models import GroupedLinearModel
+from forecast_engine import ForecastEngine, seasonal_features
+from tco_engine import TCOEngine, calculate_tco
+from risk_engine import DEFAULT_SAMPLES, RiskEngine
+from lane_graph import LaneGraph
+from portfolio import allocate_shipments
+from schema import FreightSchema
+from model_registry import derive_fingerprint, fingerprint
+from recommendation_cache import make_key
+from rollup_cube import RollupCube
+
 
 # ════════════════════════════════════════════════════════════════════════════
 # MODULE 1: DATA GENERATOR (Existiert, nur kurz zusammengefasst)
@@ -34,98 +51,38 @@ CARRIER_CONFIG = {
     "Eco Liner": {"base_cost": 2350, "on_time_pct": 94, "on_time_std": 1.5},
 }
 
+EVENTS = list(EVENT_CURVES)
+COMPILED_EVENT_CURVES = compile_event_curves(EVENT_CURVES)
+SCHEMA = FreightSchema(CARRIERS, ROUTES, COMPILED_EVENT_CURVES)   # Codes für carrier/route
+
 ROUTE_ADJUSTMENT = {"Hamburg": 0, "Rotterdam": -50, "Antwerpen": -100}
 SEASONAL_FACTOR_MULTIPLIER = 0.025
 ON_TIME_MIN, ON_TIME_MAX = 70, 99
 
 
 def get_event_curve_impact(date, event_name):
-    """EVENT-KURVEN: Realistischer Impact pro Datum"""
-    year, month, day = date.year, date.month, date.day
-    
-    if event_name == "Christmas Peak":
-        if month == 10:
-            weeks = min((date - datetime(year, 10, 1)).days // 7, 4)
-            return (10 + (weeks/4)*40, -0.5 - (weeks/4)*1.5)
-        elif month == 11 and day <= 15:
-            weeks = (day-1)//7
-            return (50 + (weeks/2)*50, -2 - (weeks/2)*0.5)
-        elif (month == 11 and day > 15) or (month == 12 and day <= 20):
-            progress = (day-15)/15 if month == 11 else (20+(day-1))/35
-            return (100 + (progress/2)*150, -2.5 - (progress/2)*0.5)
-        elif month == 12 and 21 <= day <= 24:
-            return (250, -3.0)
-        elif month == 12 and day >= 25:
-            weeks_after = (31-day)//7
-            return (250 - (weeks_after/2)*100, -3.0 + (weeks_after/2)*1.0)
-        elif month == 1 and day <= 14:
-            weeks_after = 1 + (day-1)//7
-            return (150 - min(weeks_after/3, 1)*150, -1.0 + (weeks_after/4)*1.0)
-    
-    elif event_name == "Chinese New Year":
-        if month == 1 and day <= 15:
-            progress = day/15
-            return (20 + progress*60, -0.8 - progress*1.2)
-        elif (month == 1 and day > 15) or (month == 2 and day <= 14):
-            progress = (day-15)/16 if month == 1 else day/14
-            return (80 + progress*70, -2.0 - progress*2.0)
-        elif month == 2 and day >= 15:
-            progress = (day-15)/13
-            return (150 - progress*150, -4.0 + progress*4.0)
-    
-    elif event_name == "Easter Holiday":
-        if month == 3:
-            progress = day/31
-            return (20 + progress*80, -1.0 - progress*1.0)
-        elif month == 4 and day <= 15:
-            progress = (15-day)/15
-            return (100 - progress*100, -2.0 + progress*2.0)
-    
-    elif event_name == "Summer Peak":
-        if month == 6:
-            progress = day/30
-            return (20 + progress*60, -0.5 - progress*0.5)
-        elif month in [7, 8]:
-            return (80, -1.0)
-        elif month == 9 and day <= 15:
-            progress = day/15
-            return (80 - progress*80, -1.0 + progress*1.0)
-    
-    elif event_name == "Red Sea Blockade":
-        if year < 2024:
-            return (0, 0)
-        return (300, -5.0) if random.random() < 0.4 else (0, 0)
-    
-    elif event_name == "Suez Congestion":
-        return (50, -1.0)
-    
-    return (0, 0)
-
-
-def get_active_events_for_date(date):
-    """Aktive Events für Datum"""
-    events = []
-    if date.month in [10, 11, 12, 1]:
-        events.append("Christmas Peak")
-    if date.month in [1, 2, 3] and date.month != 1:
-        events.append("Chinese New Year")
-    if date.month in [3, 4] and (date.month == 4 or date.day > 15):
-        events.append("Easter Holiday")
-    if date.month in [6, 7, 8, 9]:
-        events.append("Summer Peak")
-    if date.year >= 2024 and random.random() < 0.4:
-        events.append("Red Sea Blockade")
-    events.append("Suez Congestion")
-    return events
-
-
-def calculate_price_impact(date, base_cost):
-    """Preis = Saison + Events + Rauschen"""
+    """EVENT-KURVEN: Realistischer Impact pro Datum (Definition: event_curves.EVENT_CURVES)"""
+    curve = COMPILED_EVENT_CURVES.get(event_name)
+    if curve is None:
+        return (0, 0)
+    price, ontime, _ = curve.evaluate([date])
+    return (float(price[0]), float(ontime[0]))
+
+
+def get_active_events_for_date(date, rng=None):
+    """Aktive Events für Datum (1 Ziehung pro Event – für Zeitspannen: EventCalendar.from_curves)"""
+    active = sample_event_activation([date], COMPILED_EVENT_CURVES, rng)[0]
+    return [event for event, is_active in zip(EVENTS, active) if is_active]
+
+
+def calculate_price_impact(date, base_cost, event_adjustment=None):
+    """Preis = Saison + Events + Rauschen (event_adjustment z.B. aus EventCalendar)"""
     month = date.month
     seasonal_factor = 1.0 + (month - 6) * SEASONAL_FACTOR_MULTIPLIER
     seasonal_adjustment = base_cost * (seasonal_factor - 1)
     
-    event_adjustment = sum(get_event_curve_impact(date, e)[0] for e in get_active_events_for_date(date))
+    if event_adjustment is None:
+        event_adjustment = sum(get_event_curve_impact(date, e)[0] for e in get_active_events_for_date(date))
     market_noise = random.uniform(-100, 100)
     
     return seasonal_adjustment + event_adjustment + market_noise
@@ -136,14 +93,20 @@ def calculate_ontime_impact(date):
     return sum(get_event_curve_impact(date, e)[1] for e in get_active_events_for_date(date))
 
 
-def generate_training_data():
-    """📊 Generiere 2015-30.11.2025 Daten (163.800 Zeilen)"""
-    print("📊 Generiere Training-Daten (2015-30.11.2025)...")
+def _generate_rows(start_date, end_date, verbose=True, rng=None):
+    """Zeilen für [start_date, end_date] (1 Zeile pro Tag × Carrier × Route)"""
     data = []
-    current_date = START_DATE
     
-    while current_date <= END_DATE:
-        if (current_date - START_DATE).days % 365 == 0:
+    # Event-Kurven + Aktivierung 1× pro Tag statt 1× pro Zeile (rng = Seed/Generator)
+    calendar = EventCalendar.from_curves(start_date, end_date, COMPILED_EVENT_CURVES, rng=rng)
+    event_price = calendar.price_impact()
+    event_ontime = calendar.ontime_impact()
+    
+    current_date = start_date
+    day = 0
+    
+    while current_date <= end_date:
+        if verbose and (current_date - START_DATE).days % 365 == 0:
             print(f"  ⏳ {current_date.strftime('%Y-%m-%d')}")
         
         for carrier in CARRIERS:
@@ -152,11 +115,10 @@ def generate_training_data():
                 destination = route.split(" → ")[1]
                 route_adj = ROUTE_ADJUSTMENT.get(destination, 0)
                 
-                price_impact = calculate_price_impact(current_date, config["base_cost"])
+                price_impact = calculate_price_impact(current_date, config["base_cost"], event_price[day])
                 final_price = config["base_cost"] + route_adj + price_impact
                 
-                ontime_impact = calculate_ontime_impact(current_date)
-                final_ontime = config["on_time_pct"] + ontime_impact + np.random.normal(0, config["on_time_std"])
+                final_ontime = config["on_time_pct"] + event_ontime[day] + np.random.normal(0, config["on_time_std"])
                 final_ontime = np.clip(final_ontime, ON_TIME_MIN, ON_TIME_MAX)
                 
                 data.append({
@@ -171,24 +133,144 @@ def generate_training_data():
                 })
         
         current_date += timedelta(days=1)
+        day += 1
     
+    return data
+
+
+def _to_frame(data):
+    """Zeilen → kompakter DataFrame (carrier/route als Categorical, Kalender-Spalten int8)"""
+    df = SCHEMA.encode(pd.DataFrame(data))
+    df[['month', 'day', 'dow']] = df[['month', 'day', 'dow']].astype(np.int8)
+    return df
+
+
+def generate_training_data(seed=None):
+    """📊 Generiere 2015-30.11.2025 Daten (163.800 Zeilen) – seed fixiert die Event-Aktivierung"""
+    print("📊 Generiere Training-Daten (2015-30.11.2025)...")
+    data = _generate_rows(START_DATE, END_DATE, rng=seed)
     print(f"✅ {len(data):,} Datensätze generiert!")
-    return pd.DataFrame(data)
+    return _to_frame(data)
+
+
+def _generate_shard(shard):
+    """Worker: Ein Datums-Shard mit eigenem, reproduzierbarem RNG-Stream"""
+    start_date, end_date, seed_seq = shard
+    
+    # Eigener Seed pro Shard → Ergebnis unabhängig davon, welcher Prozess ihn rechnet.
+    # _generate_rows zieht aus random/np.random – globalen Zustand danach zurücksetzen,
+    # sonst verstellt workers=1 (im Aufrufer-Prozess) dessen RNGs
+    py_seed, np_seed = seed_seq.generate_state(2)
+    py_state, np_state = random.getstate(), np.random.get_state()
+    random.seed(int(py_seed))
+    np.random.seed(int(np_seed))
+    try:
+        event_rng = np.random.default_rng(seed_seq.spawn(1)[0])
+        return _to_frame(_generate_rows(start_date, end_date, verbose=False, rng=event_rng))
+    finally:
+        random.setstate(py_state)
+        np.random.set_state(np_state)
+
+
+def generate_training_data_parallel(workers=None, seed=42, shard_days=365):
+    """
+    📊 Wie generate_training_data(), aber parallel über einen Prozess-Pool
+    
+    workers: Anzahl Prozesse (None = alle CPU-Kerne, 1 = ohne Pool)
+    seed: Basis-Seed – gleicher Seed ⇒ identische Daten, egal wie viele Worker
+    shard_days: Tage pro Shard (bestimmt die Aufteilung, nicht die Worker-Zahl)
+    """
+    print(f"📊 Generiere Training-Daten parallel (workers={workers or os.cpu_count()})...")
+    
+    # Shards hängen nur von der Zeitspanne ab, nie von der Worker-Zahl
+    bounds = []
+    shard_start = START_DATE
+    while shard_start <= END_DATE:
+        shard_end = min(shard_start + timedelta(days=shard_days - 1), END_DATE)
+        bounds.append((shard_start, shard_end))
+        shard_start = shard_end + timedelta(days=1)
+    
+    seed_seqs = np.random.SeedSequence(seed).spawn(len(bounds))
+    shards = [(start, end, seq) for (start, end), seq in zip(bounds, seed_seqs)]
+    
+    if workers == 1:
+        frames = [_generate_shard(shard) for shard in shards]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # map() liefert in Shard-Reihenfolge → deterministisches Merge
+            frames = list(pool.map(_generate_shard, shards))
+    
+    df = pd.concat(frames, ignore_index=True)
+    print(f"✅ {len(df):,} Datensätze generiert ({len(shards)} Shards)!")
+    return df
 
 
 # ════════════════════════════════════════════════════════════════════════════
 # MODULE 2: ML MODEL – Price Predictor
 # ════════════════════════════════════════════════════════════════════════════
 
+FEATURE_COLS = ['lag1_price', 'lag7_price', 'lag30_price', 'month_sin', 'month_cos', 
+                'dow_sin', 'dow_cos', 'is_christmas_peak', 'is_chinese_new_year', 'is_summer_peak']
+MODEL_VERSION = 2  # Erhöhen, wenn sich Features/Training ändern → Registry trainiert neu
+
+
 class ShippingPricePredictor:
-    """ML-Modell: Linear Regression für Preisvorhersage"""
+    """ML-Modell: Linear Regression für Preisvorhersage (1 Modell + Scaler pro Carrier × Route)"""
     
-    def __init__(self, df):
-        print("\n🤖 Trainiere ML-Modell...")
+    def __init__(self, df, history=None, train=True, feature_store=None, version=None):
         self.df = df
-        self.models = {}  # Ein Modell pro Carrier
-        self.scaler = StandardScaler()
-        self.train_models()
+        # Daten-/Modell-Stand (Registry-Key) – Teil jedes Cache-Schlüssels
+        self._version = version
+        # Kompakte Historie für Lookups (geteilt per mmap, siehe history_arrays.py)
+        self.history = history if history is not None else HistoryArrays.from_frame(df, CARRIERS, ROUTES)
+        # Optional: fertige Features (feature_store.py) statt engineer_features über alles
+        self.feature_store = feature_store
+        self.model = GroupedLinearModel(len(CARRIERS) * len(ROUTES), len(FEATURE_COLS))
+        if train:
+            print("\n🤖 Trainiere ML-Modell...")
+            self.train_models()
+    
+    @staticmethod
+    def model_config():
+        """Alles außer den Daten, was die trainierten Modelle beeinflusst (für den Registry-Key)"""
+        return {
+            'model': 'ShippingPricePredictor',
+            'version': MODEL_VERSION,
+            'features': FEATURE_COLS,
+            'carriers': CARRIERS,
+            'routes': ROUTES,
+        }
+    
+    def export_artifacts(self):
+        """Fitted Modelle + Scaler + Feature-Schema (für model_registry)"""
+        return {
+            'model': self.model,
+            'feature_cols': FEATURE_COLS,
+            'config': self.model_config(),
+        }
+    
+    @classmethod
+    def from_artifacts(cls, df, artifacts, history=None, version=None):
+        """Predictor aus gespeicherten Artefakten – ohne Training (version = Registry-Key)"""
+        if artifacts['feature_cols'] != FEATURE_COLS or 'model' not in artifacts:
+            raise ValueError("Artefakte passen nicht zum aktuellen Feature-Schema")
+        predictor = cls(df, history=history, train=False, version=version)
+        predictor.model = artifacts['model']
+        return predictor
+    
+    @property
+    def version(self):
+        """Fingerprint aus Daten + Modell-Konfiguration (wie der Registry-Key), 1× berechnet"""
+        if self._version is None:
+            self._version = fingerprint(self.df, self.model_config())
+        return self._version
+    
+    @staticmethod
+    def group_ids(carriers, routes):
+        """Modell-Index pro Zeile: carrier_idx × len(ROUTES) + route_idx"""
+        carrier_idx = SCHEMA.carrier_codes(carriers).astype(np.int64)
+        route_idx = SCHEMA.route_codes(routes).astype(np.int64)
+        return carrier_idx * len(ROUTES) + route_idx
     
     def engineer_features(self, df):
         """Feature Engineering: Lag Features + Saisonalität"""
@@ -199,93 +281,84 @@ class ShippingPricePredictor:
         df['lag7_price'] = df.groupby(['carrier', 'route'])['price'].shift(7).fillna(df['price'])
         df['lag30_price'] = df.groupby(['carrier', 'route'])['price'].shift(30).fillna(df['price'])
         
-        # Saisonalität
-        df['month_sin'] = np.sin(2 * np.pi * df['month'] / 12)
-        df['month_cos'] = np.cos(2 * np.pi * df['month'] / 12)
-        df['dow_sin'] = np.sin(2 * np.pi * df['dow'] / 7)
-        df['dow_cos'] = np.cos(2 * np.pi * df['dow'] / 7)
-        
-        # Event-Indikatoren (einfach: ist Dezember? ist Januar?)
-        df['is_christmas_peak'] = df['month'].isin([10, 11, 12, 1]).astype(int)
-        df['is_chinese_new_year'] = df['month'].isin([1, 2, 3]).astype(int)
-        df['is_summer_peak'] = df['month'].isin([6, 7, 8, 9]).astype(int)
+        # Saisonalität + Event-Indikatoren (einfach: ist Dezember? ist Januar?)
+        # – dieselbe Funktion nutzt die Prognose, Training & Inferenz bleiben identisch
+        df[FEATURE_COLS[3:]] = seasonal_features(df['month'].values, df['dow'].values)
         
         return df
     
     def train_models(self):
-        """Train ein Modell pro Carrier"""
-        df = self.engineer_features(self.df.copy())
+        """Train ein Modell pro Carrier × Route – alle in einem Batch (linear_models.py)"""
+        if self.feature_store is not None:
+            df = self.feature_store.frame()
+        else:
+            df = self.engineer_features(self.df.copy())
         
-        feature_cols = ['lag1_price', 'lag7_price', 'lag30_price', 'month_sin', 'month_cos', 
-                        'dow_sin', 'dow_cos', 'is_christmas_peak', 'is_chinese_new_year', 'is_summer_peak']
+        X = df[FEATURE_COLS].values
+        y = df['price'].values
+        groups = self.group_ids(df['carrier'], df['route'])
+        self.model.fit(X, y, groups)
         
-        for carrier in CARRIERS:
-            carrier_data = df[df['carrier'] == carrier]
-            X = carrier_data[feature_cols].values
-            y = carrier_data['price'].values
-            
-            # Normalisiere Features
-            X_scaled = self.scaler.fit_transform(X)
-            
-            # Train Linear Regression
-            model = LinearRegression()
-            model.fit(X_scaled, y)
-            self.models[carrier] = model
-            
-            # Zeige R² Score
-            score = model.score(X_scaled, y)
-            print(f"  ✅ {carrier:20} R²={score:.3f}")
+        # Zeige R² Score (Ø über die Routen des Carriers)
+        scores = self.model.score(X, y, groups).reshape(len(CARRIERS), len(ROUTES))
+        for carrier, carrier_scores in zip(CARRIERS, scores):
+            print(f"  ✅ {carrier:20} R²={np.nanmean(carrier_scores):.3f} ({len(ROUTES)} Routen)")
+    
+    def update(self, new_rows):
+        """
+        Online-Update mit neuen Tageszeilen (z.B. Rate-Sheets) – ohne Retraining
+        
+        Features nur für die neuen Zeilen (feature_store), dann werden die
+        suffizienten Statistiken (XᵀX, Xᵀy pro Carrier × Route) aufaddiert und die
+        Koeffizienten neu gelöst. Kosten: O(neue Zeilen), unabhängig von der Historie.
+        Persistieren: registry.save(derive_fingerprint(key, new_rows), predictor.export_artifacts())
+        """
+        if self.feature_store is None:
+            self.feature_store = FeatureStore.from_frame(self.df)
+        features = self.feature_store.append(new_rows)
+        self.model.partial_fit(
+            features[FEATURE_COLS].values,
+            features['price'].values,
+            self.group_ids(features['carrier'], features['route']),
+        )
+        # Lag-Startzustand für Prognosen nachziehen
+        self.history.extend(new_rows)
+        # Neue Version → gecachte Prognosen/Empfehlungen werden nicht mehr getroffen
+        self._version = derive_fingerprint(self.version, new_rows)
+        return self
+    
+    @property
+    def forecaster(self):
+        """Vektorisierte Prognose über alle Carrier × Routen (forecast_engine.py)"""
+        return ForecastEngine(
+            self.model, self.history, self.group_ids,
+            default_price=lambda carrier: CARRIER_CONFIG[carrier]['base_cost'],
+        )
     
     def predict_next_days(self, carrier, route, start_date, days=14):
         """Vorhersage für nächste N Tage"""
-        predictions = []
-        last_data = self.df[(self.df['carrier'] == carrier) & (self.df['route'] == route)].tail(30).copy()
-        
-        current_date = start_date
-        for _ in range(days):
-            # Erstelle Features basierend auf letzten Daten
-            month_val = current_date.month
-            dow_val = current_date.weekday()
-            
-            lag1 = last_data.iloc[-1]['price'] if len(last_data) > 0 else CARRIER_CONFIG[carrier]['base_cost']
-            lag7 = last_data.iloc[-7]['price'] if len(last_data) >= 7 else lag1
-            lag30 = last_data.iloc[-30]['price'] if len(last_data) >= 30 else lag1
-            
-            features = np.array([
-                lag1, lag7, lag30,
-                np.sin(2 * np.pi * month_val / 12),
-                np.cos(2 * np.pi * month_val / 12),
-                np.sin(2 * np.pi * dow_val / 7),
-                np.cos(2 * np.pi * dow_val / 7),
-                1 if month_val in [10, 11, 12, 1] else 0,
-                1 if month_val in [1, 2, 3] else 0,
-                1 if month_val in [6, 7, 8, 9] else 0,
-            ]).reshape(1, -1)
-            
-            features_scaled = self.scaler.transform(features)
-            predicted_price = self.models[carrier].predict(features_scaled)[0]
-            
-            # Füge zu letzten Daten hinzu
-            last_data = pd.concat([last_data, pd.DataFrame({
-                'date': [current_date],
-                'price': [predicted_price],
-                'month': [month_val],
-                'day': [current_date.day],
-                'dow': [dow_val],
-            })], ignore_index=True)
-            
-            # Behalte nur letzte 30
-            if len(last_data) > 30:
-                last_data = last_data.tail(30)
-            
-            predictions.append({
-                'date': current_date,
-                'predicted_price': round(predicted_price, 2),
-            })
-            
-            current_date += timedelta(days=1)
+        prices, dates = self.forecaster.forecast([carrier], [route], [start_date], days)
+        return [
+            {'date': date, 'predicted_price': round(float(price), 2)}
+            for date, price in zip(pd.DatetimeIndex(dates[0]).to_pydatetime(), prices[0, 0, 0])
+        ]
+    
+    def predict_batch(self, routes, carriers=None, start_dates=None, horizon=14):
+        """
+        Vorhersage für viele Routen × Carrier × Ready-Dates in einem Durchlauf
         
-        return predictions
+        routes: Liste von Routen
+        carriers: Liste von Carriern (None = alle)
+        start_dates: Liste von Start-Daten (None = Tag nach Ende der Historie)
+        horizon: Tage pro Start-Datum
+        OUTPUT: (prices (Routen, Carrier, Start-Daten, Tage), dates (Start-Daten, Tage))
+        """
+        carriers = CARRIERS if carriers is None else carriers
+        if start_dates is None:
+            last_day = self.history.start + int(self.history.last_day.max())
+            start_dates = [pd.Timestamp(last_day) + timedelta(days=1)]
+        prices, dates = self.forecaster.forecast(carriers, routes, start_dates, horizon)
+        return prices.transpose(1, 0, 2, 3), dates
 
 
 # ════════════════════════════════════════════════════════════════════════════
@@ -295,76 +368,242 @@ class ShippingPricePredictor:
 class BookingOptimizer:
     """Findet beste Buchungstermine und Carrier"""
     
-    def __init__(self, df, predictor):
+    def __init__(self, df, predictor, history=None, cache=None, cube=None):
         print("\n📋 Initialisiere Booking Optimizer...")
         self.df = df
         self.predictor = predictor
+        self.history = history if history is not None else predictor.history
+        # Optional: RecommendationCache (recommendation_cache.py), Schlüssel inkl. self.version
+        self.cache = cache
+        self._data_version = None   # Stand von Cube/Kennzahlen nach update()
+        # Aggregate Carrier × Route × Jahr × Monat (rollup_cube.py) statt groupby pro Aufruf
+        self.cube = cube if cube is not None else RollupCube.from_frame(df, CARRIERS, ROUTES)
         self.historical_stats = self.calculate_historical_stats()
+        self.reliability = self.calculate_reliability_index()
     
     def calculate_historical_stats(self):
-        """Berechne Durchschnittswerte pro Carrier"""
-        return self.df.groupby('carrier').agg({
-            'price': ['mean', 'std'],
-            'ontime': ['mean', 'std']
-        }).round(2)
+        """Berechne Durchschnittswerte pro Carrier (aus dem Rollup-Cube, kein Full-Scan)"""
+        price = self.cube.stats('price')
+        ontime = self.cube.stats('ontime')
+        stats = pd.concat({
+            ('price', 'mean'): price['mean'], ('price', 'std'): price['std'],
+            ('ontime', 'mean'): ontime['mean'], ('ontime', 'std'): ontime['std'],
+        }, axis=1)
+        return stats.round(2)
+    
+    def update(self, new_rows):
+        """
+        Neue Tageszeilen in Cube + Kennzahlen (Ø-Werte, Zuverlässigkeit) übernehmen –
+        O(neue Zeilen). Preismodell separat: predictor.update(new_rows)
+        """
+        self.cube.append(new_rows)
+        self.historical_stats = self.calculate_historical_stats()
+        self.reliability = self.calculate_reliability_index()
+        # Neue Version → gecachte Empfehlungen mit alten Kennzahlen werden nicht mehr getroffen
+        self._data_version = derive_fingerprint(self._data_version or '', new_rows)
+        return self
+    
+    @property
+    def version(self):
+        """Cache-Version: Modell (predictor.version) + Datenstand der Kennzahlen"""
+        if self._data_version is None:
+            return self.predictor.version
+        return f"{self.predictor.version}:{self._data_version}"
+    
+    def calculate_reliability_index(self):
+        """Ø On-Time pro Carrier × Route (Carrier, Routen) – aus dem Rollup-Cube,
+        folgt damit update() ohne Umweg über die Historie
+        Route ohne Historie → Ø des Carriers über alle Routen"""
+        ontime = self.cube.stats('ontime', by=('carrier', 'route'))['mean']
+        per_route = ontime.reindex(pd.MultiIndex.from_product([CARRIERS, ROUTES])).to_numpy(dtype=np.float64)
+        per_route = per_route.reshape(len(CARRIERS), len(ROUTES))
+        per_carrier = self.historical_stats[('ontime', 'mean')].reindex(CARRIERS).to_numpy()
+        return np.where(np.isnan(per_route), per_carrier[:, None], per_route)
     
     def calculate_tco(self, price, ontime_pct, penalty_per_day_late=100):
         """TCO = Preis + Penalty für Verspätung
-        Annahme: 10-14 Tage Transit, jeder % Verspätung kostet €100"""
-        avg_days = 12
-        expected_late_days = (100 - ontime_pct) / 100 * avg_days
-        late_penalty = expected_late_days * penalty_per_day_late
-        return price + late_penalty
+        Annahme: 10-14 Tage Transit, jeder % Verspätung kostet €100
+        (funktioniert auch mit NumPy-Arrays, Details: tco_engine.py)"""
+        return calculate_tco(price, ontime_pct, penalty_per_day_late=penalty_per_day_late)
+    
+    def candidate_tco(self, forecast, route):
+        """TCO-Engine für alle Kandidaten (Carrier × Tage) einer Prognose –
+        danach beliebig viele Cost-of-Delay-Profile ohne neue Prognose"""
+        prices, _ = forecast
+        ontime = self.reliability[:, ROUTES.index(route)]
+        return TCOEngine(np.round(np.asarray(prices, dtype=np.float64), 2), ontime[:, None])
+    
+    def risk_tco(self, forecast, route, profile='Default', n_samples=DEFAULT_SAMPLES, seed=42):
+        """
+        Monte-Carlo-TCO (risk_engine.py) für alle Kandidaten (Carrier × Tage)
+        
+        On-Time pro Carrier ~ N(μ, on_time_std): μ = self.reliability der Route (wie
+        die deterministische TCO), σ = Rauschen ohne Events aus CARRIER_CONFIG.
+        Events pro Tag aus den Event-Kurven (Impact × probability_per_day), zentriert:
+        Prognose und Historie enthalten den mittleren Event-Effekt schon – simuliert
+        wird nur die Abweichung (Treffer oder nicht), nicht der Effekt ein 2. Mal.
+        OUTPUT: Dict expected / std / p90 / p99 / expected_late_days, je (Carrier, Tage)
+        """
+        prices, dates = forecast
+        ontime_mean = self.reliability[:, ROUTES.index(route)]
+        ontime_std = np.array([CARRIER_CONFIG[c]['on_time_std'] for c in CARRIERS], dtype=np.float64)
+        
+        # Event-Exposure pro Tag: (Tage, Events) – wird gegen Carrier gebroadcastet
+        curves = list(COMPILED_EVENT_CURVES.values())
+        evaluated = [curve.evaluate(dates) for curve in curves]
+        event_price = np.column_stack([price for price, _, _ in evaluated])
+        event_ontime = np.column_stack([ontime for _, ontime, _ in evaluated])
+        event_prob = np.column_stack([support * curve.probability for (_, _, support), curve in zip(evaluated, curves)])
+        
+        engine = RiskEngine(n_samples, n_events=len(curves), seed=seed)
+        return engine.simulate(
+            np.round(np.asarray(prices, dtype=np.float64), 2), ontime_mean[:, None], ontime_std[:, None],
+            profile=profile, event_price=event_price, event_ontime=event_ontime, event_prob=event_prob,
+            centered_events=True, ontime_bounds=(ON_TIME_MIN, ON_TIME_MAX),
+        )
+    
+    def build_lane_graph(self, start_date, days_ahead=14, profile='Default'):
+        """
+        Door-to-Door-Graph (lane_graph.py) für alle Routen ab start_date
+        See-Kanten = TCO (Prognose + Verspätung nach Profil) pro Carrier × Tag
+        """
+        prices, dates = self.predictor.predict_batch(ROUTES, CARRIERS, [start_date], days_ahead)
+        prices = np.round(prices[:, :, 0], 2)                       # (Routen, Carrier, Tage)
+        tco = np.stack([
+            TCOEngine(prices[r], self.reliability[:, r, None]).breakdown(profile)['total']
+            for r in range(len(ROUTES))
+        ])
+        return LaneGraph.from_route_forecast(tco, ROUTES, CARRIERS, dates[0])
+    
+    def allocate_portfolio(self, shipments, capacity, days_ahead=14, method='auto'):
+        """
+        Viele Sendungen gemeinsam unter Carrier-Kapazitäten buchen (portfolio.py)
+        
+        shipments: DataFrame (ready_date, route, weight in Tonnen, profile)
+        capacity: Tonnen pro Carrier (CARRIERS-Reihenfolge) oder (Carrier, Tage)
+        Eine Batch-Prognose deckt alle Buchungsfenster ab: erstes ready_date
+        bis letztes ready_date + days_ahead
+        OUTPUT: (assignments DataFrame, info Dict)
+        """
+        ready = pd.to_datetime(shipments['ready_date']).dt.normalize()
+        horizon = (ready.max() - ready.min()).days + days_ahead
+        prices, dates = self.predictor.predict_batch(ROUTES, CARRIERS, [ready.min()], horizon)
+        return allocate_shipments(
+            shipments, np.round(prices[:, :, 0], 2), dates[0], ROUTES, CARRIERS, capacity,
+            self.reliability, window=days_ahead, method=method,
+        )
+    
+    def score_matrix(self, prices, ontime, criteria, profile='Default', risk=None):
+        """Score für alle Kandidaten auf einmal: prices (Carrier, Tage), ontime (Carrier,)"""
+        if criteria == 'price':
+            # Je niedriger, desto besser → normalisieren
+            score = 100 - (prices / 3000) * 100  # Max ~€3000
+        elif criteria == 'ontime':
+            score = np.broadcast_to(ontime[:, None], prices.shape)  # Je höher, desto besser
+        elif criteria == 'tco':
+            tco = TCOEngine(prices, ontime[:, None]).breakdown(profile)['total']
+            score = 100 - (tco / 4000) * 100  # Max ~€4000 TCO
+        elif criteria == 'risk':
+            score = 100 - (risk['p90'] / 4000) * 100  # P90-TCO: teure Ausreißer zählen
+        else:
+            score = np.full(prices.shape, 50.0)
+        return np.round(score, 2)
+    
+    @staticmethod
+    def top_k(scores, k):
+        """Indizes der k besten Scores in O(n) (argpartition statt Sortieren)
+        Gleichstand: frühere Position gewinnt (wie der bisherige stabile Sort)
+        k ≤ 0 → leere Auswahl"""
+        flat = scores.ravel()
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        if k >= flat.size:
+            candidates = np.arange(flat.size)
+        else:
+            threshold = np.partition(flat, flat.size - k)[flat.size - k]
+            candidates = np.flatnonzero(flat >= threshold)
+        order = np.lexsort((candidates, -flat[candidates]))[:k]
+        return candidates[order]
+    
+    def route_forecast(self, route, ready_date, days_ahead=14):
+        """(prices (Carrier, Tage), dates) einer Route – mit Cache 1× pro Daten-/Modell-Version"""
+        def compute():
+            prices, dates = self.predictor.predict_batch([route], CARRIERS, [ready_date], days_ahead)
+            prices, dates = prices[0, :, 0], dates[0]
+            prices.flags.writeable = False      # geteilt zwischen Sessions → read-only
+            dates.flags.writeable = False
+            return prices, dates
+        
+        if self.cache is None:
+            return compute()
+        key = make_key('forecast', route, ready_date, days_ahead=days_ahead)
+        return self.cache.get_or_compute(key, compute, version=self.version)
     
-    def get_best_booking_dates(self, target_date, route, criteria='price', days_ahead=14):
+    def get_best_booking_dates(self, target_date, route, criteria='price', days_ahead=14, forecast=None, top_k=3,
+                               profile='Default'):
         """
         🎯 HAUPTFUNKTION: Finde beste Buchungstermine
         
         target_date: Wann ist Ware fertig?
         route: Welche Route?
-        criteria: 'price' | 'ontime' | 'tco'
+        criteria: 'price' | 'ontime' | 'tco' | 'risk' (Monte-Carlo P90-TCO)
         days_ahead: Wie viele Tage in die Zukunft schauen?
+        forecast: optional fertiges (prices (Carrier, Tage), dates) aus predict_batch –
+                  z.B. dieselbe Prognose, die die UI auch anzeigt
+        top_k: Anzahl Empfehlungen
+        profile: Cost-of-Delay-Profil für die TCO (tco_engine.COST_OF_DELAY_PROFILES)
+        
+        Mit Cache (und ohne fertige forecast): 1 Dict-Lookup pro wiederholter Anfrage
         """
+        if forecast is None and self.cache is not None:
+            key = make_key('recommendations', route, target_date, criteria=criteria, days_ahead=days_ahead,
+                           top_k=top_k, profile=profile)
+            recommendations = self.cache.get_or_compute(
+                key,
+                lambda: self.get_best_booking_dates(
+                    target_date, route, criteria, days_ahead,
+                    self.route_forecast(route, target_date, days_ahead), top_k, profile,
+                ),
+                version=self.version,
+            )
+            return [dict(rec) for rec in recommendations]
         
-        recommendations = []
+        # Generiere Vorhersagen für alle Carrier & alle Tage (1 Batch-Aufruf)
+        if forecast is None:
+            forecast = self.route_forecast(route, target_date, days_ahead)
+        prices, dates = forecast
+        prices = np.round(np.asarray(prices, dtype=np.float64), 2)
         
-        # Generiere Vorhersagen für alle Carrier & alle Tage
-        for carrier in CARRIERS:
-            predictions = self.predictor.predict_next_days(
-                carrier, route, target_date, days=days_ahead
-            )
-            
-            for pred in predictions:
-                booking_date = pred['date']
-                predicted_price = pred['predicted_price']
-                
-                # Hole historische On-Time für diesen Carrier
-                hist_ontime = self.df[self.df['carrier'] == carrier]['ontime'].mean()
-                
-                # Berechne Score basierend auf Kriterium
-                if criteria == 'price':
-                    # Je niedriger, desto besser → normalisieren
-                    score = 100 - (predicted_price / 3000) * 100  # Max ~€3000
-                elif criteria == 'ontime':
-                    score = hist_ontime  # Je höher, desto besser
-                elif criteria == 'tco':
-                    tco = self.calculate_tco(predicted_price, hist_ontime)
-                    score = 100 - (tco / 4000) * 100  # Max ~€4000 TCO
-                else:
-                    score = 50
-                
-                recommendations.append({
-                    'booking_date': booking_date.strftime('%Y-%m-%d'),
-                    'carrier': carrier,
-                    'predicted_price_eur': predicted_price,
-                    'historical_ontime_pct': round(hist_ontime, 1),
-                    'tco_estimated_eur': round(self.calculate_tco(predicted_price, hist_ontime), 2),
-                    'score': round(score, 2),
-                    'reason': self._get_reason(booking_date, predicted_price, hist_ontime, criteria),
-                })
+        # Historische On-Time pro Carrier auf dieser Route (vorberechnet)
+        ontime = self.reliability[:, ROUTES.index(route)]
+        
+        # Score-Matrix (Carrier × Tage) → nur die TOP k als Dicts formatieren
+        risk = self.risk_tco((prices, dates), route, profile) if criteria == 'risk' else None
+        scores = self.score_matrix(prices, ontime, criteria, profile, risk)
+        winners = self.top_k(scores, top_k)
+        tco = TCOEngine(prices, ontime[:, None]).breakdown(profile)
         
-        # Sort by score (descending) und return TOP 3
-        recommendations = sorted(recommendations, key=lambda x: x['score'], reverse=True)[:3]
+        recommendations = []
+        for flat_idx in winners:
+            c, d = np.unravel_index(flat_idx, scores.shape)
+            booking_date = pd.Timestamp(dates[d]).to_pydatetime()
+            predicted_price = float(prices[c, d])
+            hist_ontime = float(ontime[c])
+            rec = {
+                'booking_date': booking_date.strftime('%Y-%m-%d'),
+                'carrier': CARRIERS[c],
+                'predicted_price_eur': predicted_price,
+                'historical_ontime_pct': round(hist_ontime, 1),
+                'tco_estimated_eur': round(float(tco['total'][c, d]), 2),
+                'delay_cost_eur': round(float(tco['delay'][c, d]), 2),
+                'score': float(scores[c, d]),
+                'reason': self._get_reason(booking_date, predicted_price, hist_ontime, criteria),
+            }
+            if risk is not None:
+                rec['tco_expected_eur'] = round(float(risk['expected'][c, d]), 2)
+                rec['tco_p90_eur'] = round(float(risk['p90'][c, d]), 2)
+                rec['tco_p99_eur'] = round(float(risk['p99'][c, d]), 2)
+            recommendations.append(rec)
         
         return recommendations
     
@@ -386,6 +625,8 @@ class BookingOptimizer:
                 return "⚠️ Weniger zuverlässig (<90%)"
         elif criteria == 'tco':
             return "✅ Best Value (Preis + Zuverlässigkeit)"
+        elif criteria == 'risk':
+            return "✅ Robust (niedrige TCO auch im schlechten Fall)"
         return "ℹ️ Alternative"
 
 
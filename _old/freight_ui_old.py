@@ -7,14 +7,24 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
+import os
 import sys
 sys.path.insert(0, '/c/Users/UserS2025/Desktop/freight-optimizer')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from freight_optimizer import (
     generate_training_data, ShippingPricePredictor, BookingOptimizer,
-    CARRIERS, ROUTES
+    CARRIERS, ROUTES, SCHEMA
 )
+from dataset_store import dataset_exists, read_dataset, write_dataset
+from history_arrays import HistoryArrays
+from model_registry import ModelRegistry, fingerprint
+from feature_store import FeatureStore
+from tco_engine import COST_OF_DELAY_PROFILES
+from recommendation_cache import RecommendationCache
+from chart_data import ChartPyramid, box_stats
 import plotly.express as px
 import plotly.graph_objects as go
 
@@ -41,13 +51,68 @@ st.markdown("""
 # CACHE: Load Data Once
 # ════════════════════════════════════════════════════════════════════════════
 
+# Parquet-Store (partitioniert nach Jahr/Route) – wird nur beim 1. Start generiert
+DATA_DIR = os.environ.get(
+    "FREIGHT_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "training_history"),
+)
+# Memory-mapped Preis-/On-Time-Arrays – alle Sessions/Prozesse teilen 1 Kopie
+# (Unterordner pro Daten-Fingerprint → neu generierte Daten bauen neue Arrays)
+HISTORY_DIR = DATA_DIR + "_arrays"
+# Engineerte Lag-/Saison-Features – neue Tage werden nur angehängt
+# (Unterordner pro Registry-Key: Daten + Feature-/Modell-Konfiguration)
+FEATURE_DIR = DATA_DIR + "_features"
+
+
+def load_training_data():
+    """Training data from the Parquet store; generate + persist only if missing"""
+    if not dataset_exists(DATA_DIR):
+        write_dataset(generate_training_data(), DATA_DIR)
+    # Immer der zurückgelesene Frame (Spalten, Reihenfolge, year) → gleicher
+    # Fingerprint beim 1. Start und bei jedem weiteren Start/Replica
+    print(f"📂 Lade Training-Daten aus {DATA_DIR}...")
+    return SCHEMA.encode(read_dataset(DATA_DIR))   # feste Kategorien-Reihenfolge wie CARRIERS/ROUTES
+
+
+@st.cache_resource
+def load_chart_pyramid(route):
+    """Tag/Woche/Monat-Pyramide der Preise einer Route aus den History-Arrays (chart_data.py)"""
+    _, _, optimizer = load_ml_models()
+    return ChartPyramid.from_history(optimizer.history, route)
+
+
+def load_feature_store(df, key):
+    """Features aus FEATURE_DIR/<key>, beim 1. Mal aus der kompletten Historie berechnen"""
+    feature_dir = os.path.join(FEATURE_DIR, key)
+    if FeatureStore.exists(feature_dir):
+        return FeatureStore.load(feature_dir)
+    store = FeatureStore.from_frame(df)
+    store.save(feature_dir)
+    return store
+
+
 @st.cache_resource
 def load_ml_models():
-    """Load training data and train ML models (cached)"""
-    print("🔄 Training ML models...")
-    df = generate_training_data()
-    predictor = ShippingPricePredictor(df)
-    optimizer = BookingOptimizer(df, predictor)
+    """Load training data and ML models (registry on disk, trained only on change)"""
+    print("🔄 Loading ML models...")
+    df = load_training_data()
+    history_dir = os.path.join(HISTORY_DIR, fingerprint(df))
+    if not HistoryArrays.exists(history_dir):
+        HistoryArrays.from_frame(df, CARRIERS, ROUTES).save(history_dir)
+    history = HistoryArrays.open(history_dir)
+
+    # Modelle aus der Registry – Training nur, wenn Daten oder Konfiguration neu sind
+    registry = ModelRegistry()
+    key = fingerprint(df, ShippingPricePredictor.model_config())
+    artifacts, cached = registry.get_or_train(
+        key,
+        lambda: ShippingPricePredictor(df, history=history, feature_store=load_feature_store(df, key)).export_artifacts(),
+        meta={'rows': len(df), **ShippingPricePredictor.model_config()},
+    )
+    print(f"{'📦 Modelle aus Registry geladen' if cached else '💾 Modelle trainiert & gespeichert'} ({key})")
+    predictor = ShippingPricePredictor.from_artifacts(df, artifacts, history=history, version=key)
+    # 1 Cache für alle Sessions – Schlüssel enthalten den Registry-Key (Daten + Modell)
+    optimizer = BookingOptimizer(df, predictor, history=history, cache=RecommendationCache())
     return df, predictor, optimizer
 
 # ════════════════════════════════════════════════════════════════════════════
@@ -78,14 +143,24 @@ selected_route = st.sidebar.selectbox(
 st.sidebar.subheader("📈 Optimization Criterion")
 criteria = st.sidebar.radio(
     "Worauf optimieren?",
-    options=['price', 'ontime', 'tco'],
+    options=['price', 'ontime', 'tco', 'risk'],
     format_func=lambda x: {
         'price': '💰 Günstigster Preis',
         'ontime': '⏱️ Höchste Pünktlichkeit',
-        'tco': '⚖️ Beste Gesamtwertigkeit (TCO)'
+        'tco': '⚖️ Beste Gesamtwertigkeit (TCO)',
+        'risk': '🎲 Risiko-TCO (P90, Monte Carlo)'
     }[x]
 )
 
+# INPUT 3b: Kundenprofil (Cost of Delay) – wirkt auf die TCO
+st.sidebar.subheader("🏭 Customer Profile")
+delay_profile = st.sidebar.selectbox(
+    "Kosten einer Verspätung:",
+    options=list(COST_OF_DELAY_PROFILES),
+    format_func=lambda x: f"{x} (€{COST_OF_DELAY_PROFILES[x]['penalty_per_day_late']:,}/Tag) – "
+                          f"{COST_OF_DELAY_PROFILES[x]['label']}"
+)
+
 # INPUT 4: Lookahead Periode
 st.sidebar.subheader("📅 Booking Window")
 days_ahead = st.sidebar.slider(
@@ -107,7 +182,7 @@ df, predictor, optimizer = load_ml_models()
 
 # HEADER
 st.title("🚢 Freight Optimizer – ML-powered Booking Assistant")
-criteria_label = {'price': 'Preis', 'ontime': 'Pünktlichkeit', 'tco': 'TCO'}[criteria]
+criteria_label = {'price': 'Preis', 'ontime': 'Pünktlichkeit', 'tco': 'TCO', 'risk': 'Risiko-TCO (P90)'}[criteria]
 
 st.markdown(f"""
 **Lerne aus historischen Daten wann Du günstig buchen solltest!**
@@ -122,15 +197,27 @@ st.divider()
 
 # GET RECOMMENDATIONS
 try:
+    # 1 Batch-Prognose (alle Carrier) – speist Empfehlungen UND den Forecast-Tab;
+    # beides gecacht → Widget-Wechsel ohne neue Parameter = Dict-Lookup
+    route_forecast = optimizer.route_forecast(selected_route, ready_date, days_ahead)
+    
     recommendations = optimizer.get_best_booking_dates(
-        ready_date, selected_route, criteria=criteria, days_ahead=days_ahead
+        ready_date, selected_route, criteria=criteria, days_ahead=days_ahead, profile=delay_profile,
+    )
+    
+    cache_stats = optimizer.cache.stats()
+    st.sidebar.caption(
+        f"⚡ Cache: {cache_stats['hits']:,} Treffer / {cache_stats['misses']:,} berechnet "
+        f"({cache_stats['hit_rate']:.0%}), {cache_stats['size']} Einträge"
     )
     
     # ════════════════════════════════════════════════════════════════════════════
     # TAB 1: TOP RECOMMENDATIONS
     # ════════════════════════════════════════════════════════════════════════════
     
-    tab1, tab2, tab3 = st.tabs(["🎯 TOP Recommendations", "📊 Price Forecast", "📈 Historical Data"])
+    tab1, tab2, tab3, tab4 = st.tabs([
+        "🎯 TOP Recommendations", "📊 Price Forecast", "📈 Historical Data", "🛣️ Sub-Route Optimizer"
+    ])
     
     with tab1:
         st.subheader("🏆 Beste 3 Buchungsoptionen")
@@ -196,6 +283,23 @@ try:
             - Historische Samples: 3.650+
             - Daten-Range: 2015-2025
             """)
+        
+        # Gleiche Kandidaten, neu gerankt pro Kundenprofil (keine neue Prognose)
+        st.markdown("### 🏭 Beste TCO-Option pro Kundenprofil")
+        tco_engine = optimizer.candidate_tco(route_forecast, selected_route)
+        profile_rows = []
+        for profile, totals in zip(COST_OF_DELAY_PROFILES, tco_engine.totals()):
+            c, d = np.unravel_index(np.argmin(totals), totals.shape)
+            parts = tco_engine.breakdown(profile)
+            profile_rows.append({
+                'Profil': profile,
+                'Carrier': CARRIERS[c],
+                'Datum': pd.Timestamp(route_forecast[1][d]).strftime('%Y-%m-%d'),
+                'Preis (€)': round(float(parts['freight'][c, d]), 2),
+                'Verspätung (€)': round(float(parts['delay'][c, d]), 2),
+                'TCO (€)': round(float(totals[c, d]), 2),
+            })
+        st.dataframe(pd.DataFrame(profile_rows), use_container_width=True, hide_index=True)
     
     # ════════════════════════════════════════════════════════════════════════════
     # TAB 2: PRICE FORECAST
@@ -204,18 +308,13 @@ try:
     with tab2:
         st.subheader("📊 Preisvorhersage (nächste 14 Tage)")
         
-        # Generate detailed forecast for all carriers
-        forecast_data = []
-        for carrier in CARRIERS:
-            preds = predictor.predict_next_days(carrier, selected_route, ready_date, days=days_ahead)
-            for pred in preds:
-                forecast_data.append({
-                    'date': pred['date'],
-                    'carrier': carrier,
-                    'price': pred['predicted_price']
-                })
-        
-        forecast_df = pd.DataFrame(forecast_data)
+        # Detailed forecast for all carriers (aus der Batch-Prognose oben)
+        prices, dates = route_forecast
+        forecast_df = pd.DataFrame({
+            'date': np.tile(dates, len(CARRIERS)),
+            'carrier': np.repeat(CARRIERS, len(dates)),
+            'price': prices.ravel().round(2),
+        })
         
         # Plotly Line Chart
         fig = px.line(
@@ -252,45 +351,95 @@ try:
     with tab3:
         st.subheader("📈 Historische Daten")
         
-        # Filter historical data for this route
-        route_data = df[df['route'] == selected_route].copy()
-        route_data['date'] = pd.to_datetime(route_data['date'])
+        # Nur der sichtbare Zeitraum, vorab verdichtet (Pyramide + LTTB) statt aller Tagespunkte
+        pyramid = load_chart_pyramid(selected_route)
+        first_day, last_day = pyramid.date_range
+        zoom = st.slider(
+            "Zeitraum:",
+            min_value=first_day.date(),
+            max_value=last_day.date(),
+            value=(first_day.date(), last_day.date()),
+        )
+        chart_df = pyramid.window(*zoom)
+        level_label = {'day': 'täglich', 'week': 'Wochenmittel', 'month': 'Monatsmittel'}[chart_df.attrs['level']]
         
         # Price trend
         col1, col2 = st.columns(2)
         
         with col1:
             fig_price = px.line(
-                route_data.groupby(['date', 'carrier'])['price'].mean().reset_index(),
+                chart_df,
                 x='date',
                 y='price',
                 color='carrier',
-                title='Historische Preise (2015-2025)',
-                labels={'date': 'Datum', 'price': 'Preis (EUR)', 'carrier': 'Carrier'}
+                title=f'Historische Preise ({level_label})',
+                labels={'date': 'Datum', 'price': 'Preis (EUR)', 'carrier': 'Carrier'},
+                render_mode='webgl',
             )
             fig_price.update_layout(height=400)
             st.plotly_chart(fig_price, use_container_width=True)
         
         with col2:
-            fig_ontime = px.box(
-                route_data,
-                x='carrier',
-                y='ontime',
-                title='On-Time Verteilung nach Carrier',
-                labels={'carrier': 'Carrier', 'ontime': 'On-Time %'}
+            # Quantile serverseitig – der Browser bekommt 7 Zahlen pro Carrier statt aller Tage
+            history = optimizer.history
+            ontime_box = box_stats(history.arrays['ontime'][:, history.route_id(selected_route), :], history.carriers)
+            fig_ontime = go.Figure([
+                go.Box(
+                    name=carrier, q1=[row.q1], median=[row.median], q3=[row.q3],
+                    lowerfence=[row.lowerfence], upperfence=[row.upperfence], mean=[row.mean],
+                )
+                for carrier, row in ontime_box.iterrows()
+            ])
+            fig_ontime.update_layout(
+                height=400, title='On-Time Verteilung nach Carrier',
+                xaxis_title='Carrier', yaxis_title='On-Time %', showlegend=False,
             )
-            fig_ontime.update_layout(height=400)
             st.plotly_chart(fig_ontime, use_container_width=True)
         
         # Carrier Statistics
         st.subheader("📊 Carrier-Statistiken")
-        stats = route_data.groupby('carrier').agg({
-            'price': ['mean', 'std', 'min', 'max'],
-            'ontime': ['mean', 'std']
-        }).round(2)
+        # Aus dem Rollup-Cube des Optimizers (Carrier × Route × Jahr × Monat) statt groupby pro Rerun
+        price_stats = optimizer.cube.stats('price', routes=[selected_route])
+        ontime_stats = optimizer.cube.stats('ontime', routes=[selected_route])
+        stats = pd.concat({
+            'price': price_stats[['mean', 'std', 'min', 'max']],
+            'ontime': ontime_stats[['mean', 'std']],
+        }, axis=1).round(2)
         
         st.dataframe(stats, use_container_width=True)
     
+    # ════════════════════════════════════════════════════════════════════════════
+    # TAB 4: SUB-ROUTE OPTIMIZER (alternative Häfen + LKW-Nachlauf)
+    # ════════════════════════════════════════════════════════════════════════════
+    
+    with tab4:
+        st.subheader("🛣️ Door-to-Door: Welcher Zielhafen ist wirklich am günstigsten?")
+        
+        lane_graph = optimizer.build_lane_graph(ready_date, days_ahead, profile=delay_profile)
+        origin = selected_route.split(" → ")[0]
+        final_destination = st.selectbox("Endziel (Stadt):", options=lane_graph.cities)
+        booking_day = st.select_slider(
+            "Buchungstag:",
+            options=[d.strftime('%Y-%m-%d') for d in lane_graph.dates],
+        )
+        
+        port_rows = lane_graph.compare_ports(origin, final_destination, booking_day)
+        if port_rows:
+            best_port = port_rows[0]
+            st.success(
+                f"✅ Beste Option: {origin} → {best_port['port']} ({best_port['carrier']}) "
+                f"+ LKW nach {final_destination} = €{best_port['total_eur']:,.2f}"
+            )
+            st.dataframe(
+                pd.DataFrame(port_rows).rename(columns={
+                    'port': 'Hafen', 'carrier': 'Carrier', 'sea_eur': 'See (TCO €)',
+                    'truck_eur': 'LKW (€)', 'warehouse_eur': 'Lager (€)', 'total_eur': 'Gesamt (€)',
+                }),
+                use_container_width=True, hide_index=True,
+            )
+        else:
+            st.info("Keine Verbindung zu diesem Ziel hinterlegt.")
+    
     # ════════════════════════════════════════════════════════════════════════════
     # BOTTOM: INFO & DISCLAIMERS
     # ════════════════════════════════════════════════════════════════════════════
@@ -0,0 +1,345 @@
+# ════════════════════════════════════════════════════════════════════════════
+# BENCHMARK SUITE – Laufzeit + Speicher der Pipeline, JSON, Baseline-Vergleich
+# ════════════════════════════════════════════════════════════════════════════
+# Misst mit festen Seeds und wählbaren Datenmengen (10k … 50M Zeilen):
+#
+#   generate_shipping_data          data_generator.py          Größe = Zeilen
+#   generate_daily_aggregated_data  _old/data_generator.py     feste Größe (10 Jahre)
+#   forecast_december_2025          _old/data_generator.py     feste Größe
+#   engineer_features               ShippingPricePredictor     Größe = Historien-Zeilen
+#   train_models                    ShippingPricePredictor     Größe = Historien-Zeilen
+#   predict_next_days               ShippingPricePredictor     pro Aufruf (alle Carrier × Routen)
+#   get_best_booking_dates          BookingOptimizer           pro Aufruf (alle Routen, ohne Cache)
+#
+# - Zeit: `repeat` Läufe nach 1 Warm-up, Vergleich über den schnellsten Lauf
+#   (am wenigsten vom Rauschen anderer Prozesse betroffen)
+# - Speicher: 1 separater Lauf unter tracemalloc (Peak der Python-/NumPy-
+#   Allokationen) – getrennt, weil tracemalloc die Zeitmessung verfälscht
+# - Historien > 163.800 Zeilen: Trainingsdaten k× mit Preisrauschen gestapelt
+#   (gleiche Tage, gleiche Gruppen) – misst Skalierung, nicht Modellqualität
+#
+# START:
+#   python benchmark_suite.py --sizes 10k,100k,1M --output benchmark_results.json
+#   python benchmark_suite.py --baseline baseline.json   → Exit-Code 1 bei Regression
+# ════════════════════════════════════════════════════════════════════════════
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+DEFAULT_SEED = 42
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.10        # +10 % Laufzeit/Peak-Speicher = Regression
+MIN_DELTA_S = 0.001             # … aber erst ab 1 ms bzw. 1 MB Unterschied (Jitter)
+MIN_DELTA_MB = 1.0
+DEFAULT_OUTPUT = "benchmark_results.json"
+
+SIZE_SUFFIXES = {'k': 1_000, 'm': 1_000_000}
+BENCHMARKS = (
+    'generate_shipping_data', 'generate_daily_aggregated_data', 'forecast_december_2025',
+    'engineer_features', 'train_models', 'predict_next_days', 'get_best_booking_dates',
+)
+
+
+def parse_size(text):
+    """'10k' → 10_000, '50M' → 50_000_000, '250000' → 250_000"""
+    text = str(text).strip().lower().replace('_', '')
+    factor = SIZE_SUFFIXES.get(text[-1:], 1)
+    number = text[:-1] if text[-1:] in SIZE_SUFFIXES else text
+    return int(float(number) * factor)
+
+
+def _seed(seed):
+    """Alle Zufallsquellen der Generatoren fixieren (random, np.random, rng-Parameter)"""
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# MESSUNG
+# ════════════════════════════════════════════════════════════════════════════
+
+def measure(name, fn, size, rows=None, repeat=DEFAULT_REPEAT, calls=1):
+    """
+    fn() `repeat`× timen (nach 1 Warm-up), dann 1× unter tracemalloc
+
+    size: Parameter der Messung (Zeilen) – Schlüssel für den Baseline-Vergleich
+    rows: verarbeitete Zeilen pro Lauf (für Durchsatz), calls: Aufrufe pro fn()
+    OUTPUT: Dict für das JSON-Ergebnis
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    best = min(times)
+    result = {
+        'name': name,
+        'size': int(size),
+        'rows': int(rows if rows is not None else size),
+        'calls': calls,
+        'repeat': repeat,
+        'times_s': [round(t, 6) for t in times],
+        'best_s': round(best, 6),
+        'median_s': round(float(np.median(times)), 6),
+        'per_call_ms': round(best / calls * 1e3, 4),
+        'rows_per_s': round((rows if rows is not None else size) / best, 1) if best > 0 else None,
+        'peak_mb': round(peak / (1024 * 1024), 3),
+    }
+    print(f"  ⏱️  {name:32} {size:>12,}  best {best:9.4f}s  "
+          f"({result['per_call_ms']:.3f} ms/Aufruf)  peak {result['peak_mb']:9.1f} MB")
+    return result
+
+
+def scale_history(df, n_rows, seed=DEFAULT_SEED):
+    """
+    Trainingsdaten auf ~n_rows Zeilen bringen, ganze Tage über alle Carrier × Routen
+
+    n_rows ≤ len(df): die jüngsten Tage; größer: k Kopien mit ±1 % Preisrauschen
+    """
+    per_day = df.groupby('date', observed=True).size().iloc[0]
+    if n_rows <= len(df):
+        days = df['date'].drop_duplicates().sort_values()
+        cutoff = days.iloc[-max(1, n_rows // per_day)]
+        return df[df['date'] >= cutoff].reset_index(drop=True)
+
+    rng = np.random.default_rng(seed)
+    copies = -(-n_rows // len(df))
+    scaled = pd.concat([df] * copies, ignore_index=True)
+    scaled['price'] = np.round(scaled['price'].to_numpy() * rng.normal(1, 0.01, len(scaled)), 2)
+    return scaled
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# BENCHMARKS
+# ════════════════════════════════════════════════════════════════════════════
+
+def run_generators(sizes, seed, repeat, only):
+    from data_generator import generate_shipping_data
+    from legacy_modules import load_daily_generator
+
+    results = []
+    if 'generate_shipping_data' in only:
+        for size in sizes:
+            results.append(measure(
+                'generate_shipping_data', lambda: generate_shipping_data(size, seed=seed), size, repeat=repeat,
+            ))
+
+    if only & {'generate_daily_aggregated_data', 'forecast_december_2025'}:
+        daily = load_daily_generator()
+
+        def generate():
+            _seed(seed)
+            return daily.generate_daily_aggregated_data(seed=seed)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            df_daily = generate()
+        if 'generate_daily_aggregated_data' in only:
+            results.append(measure('generate_daily_aggregated_data', generate, len(df_daily), repeat=repeat))
+        if 'forecast_december_2025' in only:
+            results.append(measure(
+                'forecast_december_2025', lambda: daily.forecast_december_2025(df_daily), len(df_daily),
+                repeat=repeat,
+            ))
+    return results
+
+
+def run_pipeline(sizes, seed, repeat, only):
+    """Features → Training → Prognose → Ranking auf Historien der Größe `size`"""
+    from legacy_modules import load_freight_optimizer
+
+    fo = load_freight_optimizer()
+    generate_training_data, ShippingPricePredictor = fo.generate_training_data, fo.ShippingPricePredictor
+    BookingOptimizer, ROUTES = fo.BookingOptimizer, fo.ROUTES
+
+    pipeline = {'engineer_features', 'train_models', 'predict_next_days', 'get_best_booking_dates'}
+    if not only & pipeline:
+        return []
+
+    _seed(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        base = generate_training_data(seed=seed)
+
+    results = []
+    for size in sizes:
+        df = scale_history(base, size, seed)
+        with contextlib.redirect_stdout(io.StringIO()):
+            predictor = ShippingPricePredictor(df, train=False)
+
+        if 'engineer_features' in only:
+            results.append(measure(
+                'engineer_features', lambda: predictor.engineer_features(df.copy()), size, len(df), repeat,
+            ))
+        if 'train_models' in only or only & {'predict_next_days', 'get_best_booking_dates'}:
+            # Training einmal auch für Prognose/Ranking – gemessen nur auf Wunsch
+            if 'train_models' in only:
+                results.append(measure('train_models', predictor.train_models, size, len(df), repeat))
+            else:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    predictor.train_models()
+
+        start_date = pd.Timestamp(df['date'].max()) + pd.Timedelta(days=1)
+        if 'predict_next_days' in only:
+            pairs = [(c, r) for c in predictor.history.carriers for r in predictor.history.routes]
+            results.append(measure(
+                'predict_next_days',
+                lambda: [predictor.predict_next_days(c, r, start_date, days=14) for c, r in pairs],
+                size, len(df), repeat, calls=len(pairs),
+            ))
+        if 'get_best_booking_dates' in only:
+            with contextlib.redirect_stdout(io.StringIO()):
+                optimizer = BookingOptimizer(df, predictor)
+            results.append(measure(
+                'get_best_booking_dates',
+                lambda: [optimizer.get_best_booking_dates(start_date, route, days_ahead=14) for route in ROUTES],
+                size, len(df), repeat, calls=len(ROUTES),
+            ))
+    return results
+
+
+def environment(seed, sizes, repeat):
+    """Metadaten – Vergleiche sind nur auf gleicher Maschine/gleichen Versionen aussagekräftig"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, timeout=10,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'seed': seed,
+        'sizes': list(sizes),
+        'repeat': repeat,
+    }
+
+
+def run_suite(sizes=DEFAULT_SIZES, seed=DEFAULT_SEED, repeat=DEFAULT_REPEAT, only=None):
+    """Alle (oder `only`) Benchmarks → {'meta': …, 'results': [...]}"""
+    only = set(BENCHMARKS if only is None else only)
+    unknown = only - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Unbekannte Benchmarks: {sorted(unknown)}")
+    sizes = sorted(parse_size(s) for s in sizes)
+
+    print(f"🏁 Benchmarks: {len(only)} Funktionen × Größen {[f'{s:,}' for s in sizes]} (seed={seed})")
+    results = run_generators(sizes, seed, repeat, only) + run_pipeline(sizes, seed, repeat, only)
+    return {'meta': environment(seed, sizes, repeat), 'results': results}
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# BASELINE-VERGLEICH
+# ════════════════════════════════════════════════════════════════════════════
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Pro (Benchmark, Größe): Laufzeit (best_s) und Peak-Speicher gegen die Baseline
+
+    OUTPUT: DataFrame mit time_ratio, memory_ratio und status
+            ('regression', 'faster', 'ok', 'new')
+    """
+    base = {(r['name'], r['size']): r for r in baseline['results']}
+    rows = []
+    for result in current['results']:
+        ref = base.get((result['name'], result['size']))
+        row = {'name': result['name'], 'size': result['size'], 'best_s': result['best_s'],
+               'peak_mb': result['peak_mb'], 'baseline_s': None, 'baseline_mb': None,
+               'time_ratio': None, 'memory_ratio': None, 'status': 'new'}
+        if ref is not None:
+            time_ratio = result['best_s'] / ref['best_s'] if ref['best_s'] > 0 else np.inf
+            memory_ratio = result['peak_mb'] / ref['peak_mb'] if ref['peak_mb'] > 0 else 1.0
+            slower = time_ratio > 1 + threshold and result['best_s'] - ref['best_s'] > MIN_DELTA_S
+            heavier = memory_ratio > 1 + threshold and result['peak_mb'] - ref['peak_mb'] > MIN_DELTA_MB
+            if slower or heavier:
+                status = 'regression'
+            elif time_ratio < 1 - threshold and ref['best_s'] - result['best_s'] > MIN_DELTA_S:
+                status = 'faster'
+            else:
+                status = 'ok'
+            row.update(baseline_s=ref['best_s'], baseline_mb=ref['peak_mb'],
+                       time_ratio=round(time_ratio, 3), memory_ratio=round(memory_ratio, 3), status=status)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def print_comparison(comparison, current, baseline):
+    print("\n📊 VERGLEICH MIT BASELINE:")
+    for key in ('machine', 'cpu_count', 'python', 'numpy', 'pandas'):
+        if current['meta'].get(key) != baseline['meta'].get(key):
+            print(f"  ⚠️  {key} weicht ab: {baseline['meta'].get(key)} → {current['meta'].get(key)}")
+    icons = {'regression': '❌', 'faster': '🚀', 'ok': '✅', 'new': '🆕'}
+    for row in comparison.itertuples():
+        if row.status == 'new':
+            print(f"  {icons[row.status]} {row.name:32} {row.size:>12,}  (keine Baseline)")
+            continue
+        print(f"  {icons[row.status]} {row.name:32} {row.size:>12,}  "
+              f"Zeit ×{row.time_ratio:.2f} ({row.baseline_s:.4f}s → {row.best_s:.4f}s)  "
+              f"Speicher ×{row.memory_ratio:.2f}")
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_results(results, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Freight Optimizer – Benchmark Suite")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="Kommagetrennt, z.B. 10k,100k,1M,10M,50M")
+    parser.add_argument('--only', default=None, help=f"Kommagetrennt aus: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', default=None, help="JSON eines früheren Laufs")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    results = run_suite(
+        sizes=args.sizes.split(','), seed=args.seed, repeat=args.repeat,
+        only=args.only.split(',') if args.only else None,
+    )
+    save_results(results, args.output)
+    print(f"\n💾 Ergebnisse: {args.output}")
+
+    if args.baseline:
+        baseline = load_results(args.baseline)
+        comparison = compare(results, baseline, args.threshold)
+        print_comparison(comparison, results, baseline)
+        sys.exit(1 if (comparison['status'] == 'regression').any() else 0)
@@ -0,0 +1,151 @@
+# ════════════════════════════════════════════════════════════════════════════
+# CHART DATA – Server-seitiges Downsampling für lange Preis-Historien
+# ════════════════════════════════════════════════════════════════════════════
+# 10 Jahre × 5 Carrier = ~18k Tagespunkte pro Route → zu viel Payload für den
+# Browser. Statt Rohpunkten schickt die UI nur, was man sieht:
+#
+#   1. Pyramide: Mittelwerte pro Tag / Woche / Monat, 1× vorberechnet
+#   2. Zoom-Bereich → gröbste Stufe, die noch genug Punkte hat
+#   3. LTTB (Largest-Triangle-Three-Buckets) auf max_points pro Carrier –
+#      erhält Spitzen und Täler, anders als reines Mitteln
+#   4. Box-Plots: Quantile + Whisker serverseitig (go.Box q1/median/q3),
+#      Rohwerte verlassen den Server nie
+# ════════════════════════════════════════════════════════════════════════════
+
+import numpy as np
+import pandas as pd
+
+# Stufe → pandas-Frequenz, feinste zuerst
+LEVELS = {'day': 'D', 'week': 'W-MON', 'month': 'MS'}
+MAX_POINTS = 500        # Punkte pro Carrier-Linie nach LTTB
+LTTB_HEADROOM = 4       # Stufe wählen, solange sie ≤ 4× max_points Punkte hat
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets → Indizes der behaltenen Punkte
+
+    Erster und letzter Punkt bleiben, dazwischen pro Bucket der Punkt, der mit
+    dem zuletzt gewählten Punkt und dem Mittel des nächsten Buckets das größte
+    Dreieck bildet. x muss aufsteigend sein, NaN vorher entfernen.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)   # n_out-2 Buckets in [1, n-1)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo = hi
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+class ChartPyramid:
+    """Vorberechnete Tag/Woche/Monat-Mittelwerte (Carrier, Zeitpunkte) einer Kennzahl"""
+
+    def __init__(self, carriers, levels, field='price'):
+        self.carriers = list(carriers)
+        self.levels = levels        # Stufe → (dates (N,), values (Carrier, N))
+        self.field = field
+
+    @classmethod
+    def from_series(cls, carriers, dates, values, field='price'):
+        """dates (Tage,), values (Carrier, Tage) mit NaN = kein Wert"""
+        daily = pd.DataFrame(np.asarray(values, dtype=np.float64).T, index=pd.DatetimeIndex(dates))
+        levels = {}
+        for level, rule in LEVELS.items():
+            frame = daily if level == 'day' else daily.resample(rule, label='left', closed='left').mean()
+            frame = frame.dropna(how='all')
+            levels[level] = (frame.index.values, frame.to_numpy().T)
+        return cls(carriers, levels, field)
+
+    @classmethod
+    def from_history(cls, history, route, field='price'):
+        """Direkt aus HistoryArrays (1 Route, alle Carrier) – kein DataFrame-Scan"""
+        values = history.arrays[field][:, history.route_id(route), :]
+        dates = history.start + np.arange(values.shape[1]).astype('timedelta64[D]')
+        return cls.from_series(history.carriers, dates, values, field)
+
+    @classmethod
+    def from_frame(cls, df, field='price', carriers=None):
+        """Aus Zeilen (date, carrier, field) – Mittel bei mehreren Zeilen pro Tag"""
+        wide = df.pivot_table(index='date', columns='carrier', values=field, aggfunc='mean', observed=True)
+        carriers = list(carriers) if carriers is not None else list(wide.columns)
+        wide = wide.reindex(columns=carriers).sort_index()
+        return cls.from_series(carriers, wide.index, wide.to_numpy().T, field)
+
+    @property
+    def date_range(self):
+        dates = self.levels['day'][0]
+        return pd.Timestamp(dates[0]), pd.Timestamp(dates[-1])
+
+    def level_for(self, start=None, end=None, max_points=MAX_POINTS):
+        """Feinste Stufe, die im Zoom-Bereich höchstens LTTB_HEADROOM × max_points Punkte hat"""
+        for level in LEVELS:
+            dates = self.levels[level][0]
+            lo, hi = self._bounds(dates, start, end)
+            if hi - lo <= LTTB_HEADROOM * max_points:
+                return level
+        return level
+
+    @staticmethod
+    def _bounds(dates, start, end):
+        lo = 0 if start is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(start)), 'left')
+        hi = len(dates) if end is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(end)), 'right')
+        return lo, hi
+
+    def window(self, start=None, end=None, max_points=MAX_POINTS, level=None):
+        """
+        Sichtbarer Ausschnitt als Long-Format (date, carrier, field) für px.line
+
+        OUTPUT: DataFrame mit ≤ max_points Punkten pro Carrier, df.attrs['level'] = Stufe
+        """
+        level = level or self.level_for(start, end, max_points)
+        dates, values = self.levels[level]
+        lo, hi = self._bounds(dates, start, end)
+        dates, values = dates[lo:hi], values[:, lo:hi]
+        x = dates.astype('datetime64[D]').astype(np.float64)
+
+        parts = []
+        for carrier, row in zip(self.carriers, values):
+            valid = np.flatnonzero(~np.isnan(row))
+            keep = valid[lttb(x[valid], row[valid], max_points)]
+            parts.append(pd.DataFrame({'date': dates[keep], 'carrier': carrier, self.field: row[keep]}))
+
+        chart = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=['date', 'carrier', self.field])
+        chart.attrs['level'] = level
+        return chart
+
+
+def box_stats(values, labels, whisker=1.5):
+    """
+    Box-Plot-Kennzahlen pro Zeile von values (Gruppen, Beobachtungen), NaN ignoriert
+
+    OUTPUT: DataFrame (Index = labels) mit q1, median, q3, lowerfence, upperfence,
+            mean, count – Whisker wie Plotly: äußerster Wert innerhalb 1.5 × IQR
+    """
+    values = np.asarray(values, dtype=np.float64)
+    q1, median, q3 = np.nanquantile(values, [0.25, 0.5, 0.75], axis=1)
+    iqr = q3 - q1
+    low_limit = (q1 - whisker * iqr)[:, None]
+    high_limit = (q3 + whisker * iqr)[:, None]
+    inside = ~np.isnan(values) & (values >= low_limit) & (values <= high_limit)
+    return pd.DataFrame({
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'lowerfence': np.where(inside, values, np.inf).min(axis=1),
+        'upperfence': np.where(inside, values, -np.inf).max(axis=1),
+        'mean': np.nanmean(values, axis=1),
+        'count': (~np.isnan(values)).sum(axis=1),
+    }, index=pd.Index(list(labels), name='carrier'))
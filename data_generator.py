@@ -1,7 +1,8 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import random
+
+from rollup_cube import RollupCube
+from schema import FreightSchema
 
 # Konstanten
 CARRIERS = ['Maersk', 'Hapag-Lloyd', 'MSC', 'Cosco', 'Evergreen']
@@ -9,43 +10,92 @@ START_PORTS = ['Singapur', 'Shanghai', 'Ningbo']
 END_PORTS = ['Hamburg', 'Rotterdam', 'Antwerpen']
 ROUTES = [f"({start}->{end})" for start in START_PORTS for end in END_PORTS]
 
-def generate_shipping_data(num_records=1000):
-    data = []
-    
-    for _ in range(num_records):
-        carrier = random.choice(CARRIERS)
-        route = random.choice(ROUTES)
-        date = datetime(2020, 1, 1) + timedelta(days=random.randint(1, 1825))
-        price = random.uniform(3500, 5500)
-        transit_days = random.randint(30, 45)
-        on_time_pct = random.randint(80, 98)
-        
-        data.append({
-            'date': date,
-            'carrier': carrier,
-            'route': route,
-            'price_eur': round(float(price), 2)
-            'transit_days': transit_days,
-            'on_time_pct': on_time_pct
-        })
-    return pd.DataFrame(data)
-
-def find_cheapest_carrier(df):
-    avg_prices = df.groupby(['route', 'carrier'])['price_eur'].mean().reset_index()
-    cheapest_idx = avg_prices.groupby('route')['price_eur'].idxmin()
+BASE_DATE = np.datetime64('2020-01-01')
+
+SCHEMA = FreightSchema(CARRIERS, ROUTES)
+
+# Kennzahl im Rollup-Cube → (Min, Max, Bins) des Quantil-Sketches
+CUBE_MEASURES = {'price_eur': (3000, 6000, 600)}
+
+
+def _draw_columns(rng, num_records):
+    """Zieht alle Spalten als NumPy-Arrays (spaltenweise statt zeilenweise)"""
+    carrier_codes = rng.integers(0, len(CARRIERS), size=num_records, dtype=np.int8)
+    route_codes = rng.integers(0, len(ROUTES), size=num_records, dtype=np.int8)
+    day_offsets = rng.integers(1, 1826, size=num_records)
+    price = rng.uniform(3500, 5500, size=num_records)
+
+    return {
+        'date': BASE_DATE + day_offsets.astype('timedelta64[D]'),
+        'carrier': SCHEMA.carriers_from_codes(carrier_codes),
+        'route': SCHEMA.routes_from_codes(route_codes),
+        'price_eur': np.round(price, 2),
+        'transit_days': rng.integers(30, 46, size=num_records, dtype=np.int16),
+        'on_time_pct': rng.integers(80, 99, size=num_records, dtype=np.int16),
+    }
+
+
+def generate_shipping_data(num_records=1000, seed=None):
+    """Erzeugt num_records Zeilen in einem Schritt aus einem geseedeten Generator"""
+    rng = np.random.default_rng(seed)
+    return _to_frame(_draw_columns(rng, num_records))
+
+
+def iter_shipping_data(num_records, chunk_size=1_000_000, seed=None, as_arrow=False):
+    """Streaming-Modus: liefert num_records Zeilen in Blöcken à chunk_size
+
+    Peak-Speicher hängt nur von chunk_size ab. as_arrow=True liefert
+    pyarrow.RecordBatch statt DataFrame (z.B. direkt in einen Parquet-Writer).
+    """
+    rng = np.random.default_rng(seed)
+    remaining = num_records
+    while remaining > 0:
+        n = min(chunk_size, remaining)
+        df = _to_frame(_draw_columns(rng, n))
+        remaining -= n
+        yield _to_record_batch(df) if as_arrow else df
+
+
+def _to_frame(columns):
+    df = pd.DataFrame(columns)
+    df['date'] = df['date'].astype('datetime64[ns]')
+    return df
+
+
+def _to_record_batch(df):
+    try:
+        import pyarrow as pa
+    except ImportError as exc:
+        raise ImportError("as_arrow=True benötigt pyarrow (pip install pyarrow)") from exc
+    return pa.RecordBatch.from_pandas(df, preserve_index=False)
+
+
+def build_cube(df):
+    """Aggregate Carrier × Route × Jahr × Monat – 1× aufbauen, dann beliebig abfragen"""
+    return RollupCube.from_frame(df, CARRIERS, ROUTES, CUBE_MEASURES)
+
+
+def find_cheapest_carrier(df=None, cube=None):
+    """Günstigster Ø-Preis pro Route – aus dem Cube statt groupby über alle Zeilen"""
+    if cube is None:
+        cube = build_cube(df)
+    avg_prices = cube.stats('price_eur', by=('route', 'carrier'))['mean'].rename('price_eur').reset_index()
+    avg_prices['route'] = pd.Categorical(avg_prices['route'], dtype=SCHEMA.route_dtype)
+    avg_prices['carrier'] = pd.Categorical(avg_prices['carrier'], dtype=SCHEMA.carrier_dtype)
+    cheapest_idx = avg_prices.groupby('route', sort=False)['price_eur'].idxmin()
     cheapest = avg_prices.loc[cheapest_idx]
     return cheapest.sort_values('route')
 
 if __name__ == '__main__':
     print("🚢 Generiere Daten...")
-    df = generate_shipping_data(150000)
-    
+    df = generate_shipping_data(150000, seed=42)
+
     print("\n📊 ERSTE 10 DATENSÄTZE:")
     print(df.head(10))
     print(f"\nShape: {df.shape}")
-    
+
     print("\n💰 GÜNSTIGSTER CARRIER PRO ROUTE:")
     cheapest = find_cheapest_carrier(df)
     print(cheapest)
-    
+
     print("\n✅ FERTIG!")
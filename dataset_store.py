@@ -0,0 +1,126 @@
+# ════════════════════════════════════════════════════════════════════════════
+# DATASET STORE – Parquet-Speicher, partitioniert nach Jahr & Route
+# ════════════════════════════════════════════════════════════════════════════
+# Generierte oder importierte Historien 1× schreiben, danach nur das lesen,
+# was gebraucht wird (z.B. 1 Route + Zeitfenster) statt neu zu generieren.
+#
+# LAYOUT: <root>/year=2024/route=Shanghai%20%E2%86%92%20Hamburg/part-0-0.parquet
+# - carrier/route: dictionary-encoded (kleine Integer-Codes statt Strings)
+# - Filter auf year/route → Partition-Pruning (Ordner werden übersprungen)
+# - Filter auf date/carrier → Predicate-Pushdown über Row-Group-Statistiken
+# ════════════════════════════════════════════════════════════════════════════
+
+import os
+import shutil
+
+import pandas as pd
+
+PARTITION_COLS = ('year', 'route')
+DICTIONARY_COLS = ('carrier', 'route')
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.dataset as ds
+    except ImportError as exc:
+        raise ImportError("dataset_store benötigt pyarrow (pip install pyarrow)") from exc
+    return ds
+
+
+def _prepare(chunk):
+    """DataFrame/RecordBatch → Arrow-Table mit datetime 'date', 'year' und Dictionary-Spalten"""
+    import pyarrow as pa
+
+    df = chunk.to_pandas() if isinstance(chunk, (pa.RecordBatch, pa.Table)) else chunk.copy()
+    df['date'] = pd.to_datetime(df['date'])
+    if 'year' not in df.columns:
+        df['year'] = df['date'].dt.year
+    df['year'] = df['year'].astype('int16')
+    for col in DICTIONARY_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def write_dataset(data, root, partition_cols=PARTITION_COLS, overwrite=True):
+    """
+    Schreibt Daten als partitioniertes Parquet-Dataset
+
+    INPUT:
+    - data: DataFrame ODER Iterable von DataFrames/RecordBatches (Streaming-Modus
+      der Generatoren) – dann wird Block für Block geschrieben
+    - root: Zielordner
+    - overwrite: True = bestehendes Dataset ersetzen
+    """
+    ds = _require_pyarrow()
+    import pyarrow as pa
+
+    chunks = [data] if isinstance(data, (pd.DataFrame, pa.RecordBatch, pa.Table)) else data
+    partition_types = {'year': pa.int16(), 'route': pa.string(), 'carrier': pa.string()}
+    partitioning = ds.partitioning(
+        pa.schema([(col, partition_types[col]) for col in partition_cols]), flavor='hive'
+    ) if partition_cols else None
+
+    # 1× vorab leeren: 'delete_matching' pro Block träfe nur dessen Partitionen,
+    # alte Dateien in Partitionen späterer Blöcke blieben sonst liegen
+    if overwrite and os.path.isdir(root):
+        shutil.rmtree(root)
+
+    for i, chunk in enumerate(chunks):
+        table = _prepare(chunk)
+        for col in partition_cols:
+            # Partition-Spalten als Ordnernamen (String), in den Dateien bleibt der Rest dictionary-encoded
+            idx = table.schema.get_field_index(col)
+            table = table.set_column(idx, col, table.column(col).cast(partition_types[col]))
+        ds.write_dataset(
+            table, root, format='parquet',
+            partitioning=partitioning,
+            basename_template=f'part-{i}-{{i}}.parquet',
+            existing_data_behavior='overwrite_or_ignore',
+        )
+
+
+def read_dataset(root, routes=None, carriers=None, start_date=None, end_date=None, columns=None):
+    """
+    Liest nur die benötigten Partitionen / Zeilen
+
+    INPUT:
+    - routes, carriers: Liste von Namen (None = alle)
+    - start_date, end_date: Zeitfenster inkl. Grenzen (None = offen)
+    - columns: Spaltenauswahl (None = alle)
+    OUTPUT: DataFrame, sortiert nach date/carrier/route
+    """
+    ds = _require_pyarrow()
+
+    dataset = ds.dataset(root, format='parquet', partitioning='hive')
+    expr = None
+
+    def _and(condition):
+        return condition if expr is None else expr & condition
+
+    if routes is not None:
+        expr = _and(ds.field('route').isin(list(routes)))
+    if carriers is not None:
+        expr = _and(ds.field('carrier').isin(list(carriers)))
+    if start_date is not None:
+        start = pd.Timestamp(start_date)
+        expr = _and((ds.field('year') >= start.year) & (ds.field('date') >= start))
+    if end_date is not None:
+        end = pd.Timestamp(end_date)
+        expr = _and((ds.field('year') <= end.year) & (ds.field('date') <= end))
+
+    df = dataset.to_table(columns=columns, filter=expr).to_pandas()
+    for col in DICTIONARY_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
+    sort_cols = [c for c in ('date', 'carrier', 'route') if c in df.columns]
+    return df.sort_values(sort_cols).reset_index(drop=True) if sort_cols else df
+
+
+def dataset_exists(root):
+    """True wenn unter root bereits Parquet-Dateien liegen"""
+    if not os.path.isdir(root):
+        return False
+    return any(name.endswith('.parquet') for _, _, files in os.walk(root) for name in files)
@@ -0,0 +1,102 @@
+# ════════════════════════════════════════════════════════════════════════════
+# EVENT-KALENDER – Vorberechnete Event-Impacts pro Datum
+# ════════════════════════════════════════════════════════════════════════════
+# Event-Kurven hängen nur vom Datum ab, nicht von Carrier oder Route.
+# Darum: 1× pro Zeitspanne eine dichte Tabelle (Tage × Events) berechnen,
+# Generatoren & Feature-Pipelines lesen danach nur noch per Tages-Index.
+# ════════════════════════════════════════════════════════════════════════════
+
+import numpy as np
+import pandas as pd
+
+from event_curves import sample_event_activation
+
+
+class EventCalendar:
+    """Dichte Datum × Event Tabelle mit (price_impact, ontime_impact, active)"""
+
+    def __init__(self, start_date, events, price, ontime, active):
+        self.start = np.datetime64(pd.Timestamp(start_date).date(), 'D')
+        self.events = list(events)
+        self.price = price      # float64 (Tage, Events) – €/Ton, 0 wenn inaktiv
+        self.ontime = ontime    # float64 (Tage, Events) – %-Punkte, 0 wenn inaktiv
+        self.active = active    # bool    (Tage, Events)
+
+    @classmethod
+    def from_curves(cls, start_date, end_date, curves, rng=None, active=None):
+        """
+        Vektorisiert: jede kompilierte Kurve (event_curves) 1× über alle Tage
+
+        curves: Dict Name → CompiledCurve
+        rng: Generator/Seed für die Event-Aktivierung (sample_event_activation)
+        active: fertige bool-Matrix (Tage × Events) statt Ziehung
+        """
+        dates = pd.date_range(start_date, end_date, freq='D')
+        events = list(curves)
+
+        if active is None:
+            active = sample_event_activation(dates, curves, rng)
+
+        price = np.zeros((len(dates), len(events)), dtype=np.float64)
+        ontime = np.zeros((len(dates), len(events)), dtype=np.float64)
+        for j, event in enumerate(events):
+            price[:, j], ontime[:, j], _ = curves[event].evaluate(dates)
+
+        price[~active] = 0.0
+        ontime[~active] = 0.0
+        return cls(start_date, events, price, ontime, active)
+
+    # ── Zugriff ──────────────────────────────────────────────────────────────
+
+    @property
+    def dates(self):
+        return self.start + np.arange(len(self.price)).astype('timedelta64[D]')
+
+    def day_index(self, dates):
+        """Tages-Index (int) für ein Datum oder ein Datums-Array"""
+        days = np.asarray(dates, dtype='datetime64[D]')
+        idx = (days - self.start).astype(np.int64)
+        if np.any((idx < 0) | (idx >= len(self.price))):
+            raise KeyError("Datum liegt außerhalb des Event-Kalenders")
+        return idx
+
+    def price_impact(self, dates=None):
+        """Summe der Preis-Impacts aller aktiven Events (pro Tag)"""
+        total = self.price.sum(axis=1)
+        return total if dates is None else total[self.day_index(dates)]
+
+    def ontime_impact(self, dates=None):
+        """Summe der On-Time-Impacts aller aktiven Events (pro Tag)"""
+        total = self.ontime.sum(axis=1)
+        return total if dates is None else total[self.day_index(dates)]
+
+    def active_events(self, date):
+        """Namen der aktiven Events an einem Datum"""
+        row = self.active[self.day_index(date)]
+        return [event for event, is_active in zip(self.events, row) if is_active]
+
+    def to_frame(self):
+        """Event-Features als DataFrame (1 Zeile pro Tag) – zum Joinen per 'date'"""
+        columns = {'date': self.dates}
+        for j, event in enumerate(self.events):
+            key = event.lower().replace(' ', '_')
+            columns[f'{key}_active'] = self.active[:, j]
+            columns[f'{key}_price'] = self.price[:, j]
+            columns[f'{key}_ontime'] = self.ontime[:, j]
+        columns['event_price_impact'] = self.price_impact()
+        columns['event_ontime_impact'] = self.ontime_impact()
+        return pd.DataFrame(columns)
+
+    # ── Cache ────────────────────────────────────────────────────────────────
+
+    def save(self, path):
+        """Speichert den Kalender als .npz (wiederverwendbar ohne Neuberechnung)"""
+        np.savez_compressed(
+            path, start=self.start, events=np.array(self.events),
+            price=self.price, ontime=self.ontime, active=self.active,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            return cls(f['start'], f['events'].tolist(), f['price'], f['ontime'], f['active'])
@@ -0,0 +1,256 @@
+# ════════════════════════════════════════════════════════════════════════════
+# EVENT-KURVEN – Deklarative Definition + Compiler
+# ════════════════════════════════════════════════════════════════════════════
+# Statt if/elif-Ketten pro Event: Kurven stehen als Konfiguration hier und
+# werden in stückweise lineare Auswerter kompiliert, die ganze Datums-Arrays
+# auf einmal berechnen. Neues Krisen-Szenario = neuer Eintrag, kein Code.
+#
+# ZWEI FORMATE pro Event:
+#
+# 1) "keyframes": [(Monat, Tag, €/Ton, On-Time %), ...]
+#    Lineare Interpolation zwischen den Punkten, außerhalb = 0.
+#    Monat > 12 = Folgejahr (z.B. (13, 14, ...) = 14. Januar).
+#    Sprung = 2 Keyframes an aufeinanderfolgenden Tagen.
+#    "window": ((Monat, Tag), (Monat, Tag)) = Zeitraum, in dem das Event
+#    aktiv ist (active_events), auch wenn die Kurve dort schon 0 ist.
+#    Default: erster bis letzter Keyframe.
+#
+# 2) EVENT_IMPACT-Format (wie in data_generator.py):
+#    "months", "price_impact", "ontime_impact" = Plateau,
+#    "weeks_before" + "price_before" = Ramp-Up, "weeks_after" = Decay.
+#    12 Monate = ganzjährig konstant.
+#
+# OPTIONAL (beide Formate):
+#    "start_date" / "end_date": Event existiert nur in diesem Zeitraum
+#    "probability_per_day": Intermittenz (Anteil der Tage, an denen es wirkt)
+# ════════════════════════════════════════════════════════════════════════════
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+
+EVENT_CURVES = {
+    # Aktiv Okt-Jan; Werte wie die ursprünglichen Phasen (Wochen-Stufen im
+    # Oktober/Anfang November, Sprung am 1. Dez, Abbau in 2 Wochen-Stufen)
+    "Christmas Peak": {
+        "window": ((10, 1), (13, 31)),
+        "keyframes": [
+            (10, 1, 10, -0.5),      # Early Bird: +10 €/Woche
+            (10, 7, 10, -0.5),
+            (10, 8, 20, -0.875),
+            (10, 14, 20, -0.875),
+            (10, 15, 30, -1.25),
+            (10, 21, 30, -1.25),
+            (10, 22, 40, -1.625),
+            (10, 28, 40, -1.625),
+            (10, 29, 50, -2.0),
+            (11, 7, 50, -2.0),      # Early Mid
+            (11, 8, 75, -2.25),
+            (11, 14, 75, -2.25),
+            (11, 15, 100, -2.5),    # Peak Surge
+            (11, 30, 175, -2.75),
+            (12, 1, 142.86, -2.643),
+            (12, 20, 183.57, -2.779),
+            (12, 21, 250, -3.0),    # Absolute Peak bis Silvester
+            (12, 31, 250, -3.0),
+            (13, 1, 100, -0.75),    # Post-Event
+            (13, 7, 100, -0.75),
+            (13, 8, 50, -0.5),
+            (13, 14, 50, -0.5),
+            (13, 15, 0, 0.0),
+        ],
+    },
+    # Aktiv Feb-März (Januar gehört Christmas), Impact nur im Februar
+    "Chinese New Year": {
+        "window": ((2, 1), (3, 31)),
+        "keyframes": [
+            (2, 1, 85, -2.143),
+            (2, 14, 150, -4.0),     # Peak
+            (2, 15, 150, -4.0),
+            (2, 28, 0, 0.0),
+        ],
+    },
+    # Aktiv 16. März - April (vorher CNY)
+    "Easter Holiday": {
+        "window": ((3, 16), (4, 30)),
+        "keyframes": [
+            (3, 16, 61.29, -1.516),
+            (3, 31, 100, -2.0),     # Peak
+            (4, 1, 6.67, -0.133),
+            (4, 15, 100, -2.0),
+            (4, 16, 0, 0.0),
+        ],
+    },
+    # Plateau-Kurve: Ramp-Up im Juni, konstant Jul-Aug, Decay bis Mitte Sept
+    "Summer Peak": {
+        "window": ((6, 1), (9, 30)),
+        "keyframes": [
+            (6, 1, 22, -0.517),
+            (6, 30, 80, -1.0),
+            (8, 31, 80, -1.0),
+            (9, 1, 74.67, -0.933),
+            (9, 15, 0, 0.0),
+        ],
+    },
+    # Plötzliche Krise, intermittierend (40% der Tage)
+    "Red Sea Blockade": {
+        "months": list(range(1, 13)),
+        "start_date": datetime(2024, 1, 1),
+        "price_impact": 300,
+        "ontime_impact": -5.0,
+        "probability_per_day": 0.4,
+    },
+    # Chronisch, ganzjährig konstant
+    "Suez Congestion": {
+        "months": list(range(1, 13)),
+        "price_impact": 50,
+        "ontime_impact": -1.0,
+    },
+}
+
+
+def keyframes_from_impact(config):
+    """
+    Leitet Keyframes aus einem EVENT_IMPACT-Eintrag ab
+
+    OUTPUT: Liste von (Monat, Tag, Offset-Tage, €/Ton, On-Time %)
+    """
+    months = sorted(config["months"])
+    price = config["price_impact"]
+    ontime = config["ontime_impact"]
+
+    if len(months) == 12:
+        return [(1, 1, 0, price, ontime), (12, 31, 0, price, ontime)]
+
+    first, last = months[0], months[-1]
+    keyframes = []
+
+    # Ramp-Up: price_before ab weeks_before Wochen vor Monatsbeginn
+    weeks_before = config.get("weeks_before", 0)
+    if weeks_before > 0:
+        price_before = config.get("price_before", 0)
+        ontime_before = ontime * price_before / price if price else 0.0
+        keyframes.append((first, 1, -7 * weeks_before, price_before, ontime_before))
+
+    # Plateau: erster Tag des ersten bis letzter Tag des letzten Monats
+    keyframes.append((first, 1, 0, price, ontime))
+    keyframes.append((last + 1, 1, -1, price, ontime))
+
+    # Decay: linear auf 0 über weeks_after Wochen
+    weeks_after = config.get("weeks_after", 0)
+    if weeks_after > 0:
+        keyframes.append((last + 1, 1, 7 * weeks_after - 1, 0, 0.0))
+
+    return keyframes
+
+
+class CompiledCurve:
+    """Stückweise lineare Event-Kurve, ausgewertet auf ganzen Datums-Arrays"""
+
+    def __init__(self, name, keyframes, start_date=None, end_date=None, probability=1.0, window=None):
+        self.name = name
+        self.keyframes = keyframes      # (Monat, Tag, Offset, €/Ton, On-Time %)
+        self.window = window            # ((Monat, Tag, Offset), (Monat, Tag, Offset)) oder None
+        self.start_date = _to_day(start_date)
+        self.end_date = _to_day(end_date)
+        self.probability = probability
+        self._price = np.array([k[3] for k in keyframes], dtype=np.float64)
+        self._ontime = np.array([k[4] for k in keyframes], dtype=np.float64)
+
+    @staticmethod
+    def _anchor_days(year, points):
+        """Positionen (Tage seit Epoche) von (Monat, Tag, Offset, …) für die Kurve, die in `year` beginnt"""
+        days = []
+        for month, day, offset, *_ in points:
+            y, m = year + (month - 1) // 12, (month - 1) % 12 + 1
+            days.append(np.datetime64(f"{y:04d}-{m:02d}-01") + (day - 1 + offset))
+        return np.array(days, dtype='datetime64[D]').astype(np.int64)
+
+    def evaluate(self, dates):
+        """
+        INPUT: dates (Array datetime64 / DatetimeIndex)
+        OUTPUT: (price_impact, ontime_impact, support) – je ein Array pro Datum
+        """
+        days = np.asarray(dates, dtype='datetime64[D]')
+        day_num = days.astype(np.int64)
+        price = np.zeros(len(days), dtype=np.float64)
+        ontime = np.zeros(len(days), dtype=np.float64)
+        support = np.zeros(len(days), dtype=bool)
+
+        # Kurven können über den Jahreswechsel laufen → auch Vorjahr auswerten
+        years = days.astype('datetime64[Y]').astype(np.int64) + 1970
+        for year in range(years.min() - 1, years.max() + 1) if len(days) else ():
+            xp = self._anchor_days(year, self.keyframes)
+            lo, hi = (xp[0], xp[-1]) if self.window is None else self._anchor_days(year, self.window)
+            in_window = (day_num >= lo) & (day_num <= hi)
+            if not in_window.any():
+                continue
+            in_curve = in_window & (day_num >= xp[0]) & (day_num <= xp[-1])
+            price[in_curve] = np.interp(day_num[in_curve], xp, self._price)
+            ontime[in_curve] = np.interp(day_num[in_curve], xp, self._ontime)
+            support |= in_window
+
+        if self.start_date is not None:
+            support &= days >= self.start_date
+        if self.end_date is not None:
+            support &= days <= self.end_date
+
+        price[~support] = 0.0
+        ontime[~support] = 0.0
+        return price, ontime, support
+
+
+def compile_event_curves(spec=None):
+    """
+    Kompiliert ein Kurven-Dict (Default: EVENT_CURVES) in CompiledCurve-Objekte
+
+    Akzeptiert auch EVENT_IMPACT aus data_generator.py direkt.
+    """
+    spec = EVENT_CURVES if spec is None else spec
+    compiled = {}
+    for name, config in spec.items():
+        window = None
+        if "keyframes" in config:
+            keyframes = [(m, d, 0, p, o) for m, d, p, o in config["keyframes"]]
+            if "window" in config:
+                window = [(m, d, 0) for m, d in config["window"]]
+        else:
+            keyframes = keyframes_from_impact(config)
+        compiled[name] = CompiledCurve(
+            name, keyframes,
+            start_date=config.get("start_date"),
+            end_date=config.get("end_date"),
+            probability=config.get("probability_per_day", 1.0),
+            window=window,
+        )
+    return compiled
+
+
+def sample_event_activation(dates, curves, rng=None):
+    """
+    Zieht die Event-Aktivierung 1× pro Datum und Event für die ganze Zeitspanne
+
+    INPUT:
+    - dates: Datums-Array
+    - curves: Dict Name → CompiledCurve
+    - rng: numpy Generator oder Seed (None = zufällig)
+    OUTPUT: bool-Matrix (Tage × Events) – aktiv = im Kurvenfenster UND Ziehung < probability_per_day
+
+    Dieselbe Matrix speist Preis, On-Time und die active_events-Spalte,
+    dadurch sind alle drei pro Datum konsistent.
+    """
+    rng = np.random.default_rng(rng)
+    days = np.asarray(dates, dtype='datetime64[D]')
+    probability = np.array([curve.probability for curve in curves.values()])
+
+    support = np.column_stack([curve.evaluate(days)[2] for curve in curves.values()])
+    draws = rng.random((len(days), len(curves)))
+    return support & (draws < probability)
+
+
+def _to_day(date):
+    if date is None:
+        return None
+    return np.datetime64(pd.Timestamp(date).date(), 'D')
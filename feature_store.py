@@ -0,0 +1,114 @@
+# ════════════════════════════════════════════════════════════════════════════
+# FEATURE STORE – Inkrementelle Lag- & Saison-Features
+# ════════════════════════════════════════════════════════════════════════════
+# engineer_features() sortiert die ganze Historie und rechnet alle Lags neu.
+# Hier bleiben die fertigen Features gespeichert; pro Carrier × Route merkt
+# sich der Store nur die letzten 30 Preise ("Tail-State"). Neue Tageszeilen
+# → Features nur für diese Zeilen aus dem Tail. Kosten: O(neue Zeilen).
+#
+# SEMANTIK wie engineer_features: lagK = Preis K Beobachtungen früher in
+# derselben Carrier × Route-Reihe, fehlt er → eigener Preis.
+#
+# LAYOUT: <root>/state.pkl (Tails, letztes Datum), <root>/part-00000.pkl, ...
+#         (1 Datei pro append → Speichern schreibt nur neue Teile)
+# ════════════════════════════════════════════════════════════════════════════
+
+import glob
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from forecast_engine import LAGS, WINDOW, seasonal_features
+
+LAG_COLS = [f'lag{k}_price' for k in LAGS]
+SEASONAL_COLS = ['month_sin', 'month_cos', 'dow_sin', 'dow_cos',
+                 'is_christmas_peak', 'is_chinese_new_year', 'is_summer_peak']
+
+
+class FeatureStore:
+    """Engineerte Features + Tail-State pro Carrier × Route"""
+
+    def __init__(self):
+        self.parts = []         # Liste von Feature-DataFrames (1 pro append)
+        self.tails = {}         # (carrier, route) → letzte WINDOW Preise
+        self.last_date = {}     # (carrier, route) → letztes Datum
+        self._saved = 0         # Anzahl bereits gespeicherter parts
+
+    @classmethod
+    def from_frame(cls, df):
+        """Erstbefüllung mit der kompletten Historie"""
+        store = cls()
+        store.append(df)
+        return store
+
+    def append(self, rows):
+        """
+        Features für neue Zeilen (date, carrier, route, price, month, dow, ...)
+
+        Neue Zeilen müssen pro Carrier × Route NACH dem letzten gespeicherten Datum
+        liegen. OUTPUT: Feature-DataFrame nur der neuen Zeilen
+        """
+        rows = rows.sort_values(['carrier', 'route', 'date'], kind='stable').reset_index(drop=True)
+        prices = rows['price'].to_numpy(dtype=np.float64)
+        dates = pd.to_datetime(rows['date']).to_numpy()
+        lags = np.empty((len(rows), len(LAGS)), dtype=np.float64)
+
+        keys = pd.MultiIndex.from_arrays([rows['carrier'].astype(str), rows['route'].astype(str)])
+        codes, uniques = pd.factorize(keys)
+        bounds = np.flatnonzero(np.diff(codes)) + 1
+        for key, lo, hi in zip(uniques, np.r_[0, bounds], np.r_[bounds, len(rows)]):
+            if key in self.last_date and dates[lo] <= self.last_date[key]:
+                raise ValueError(f"{key}: neue Zeilen müssen nach {pd.Timestamp(self.last_date[key]).date()} liegen")
+
+            tail = self.tails.get(key, np.empty(0))
+            new = prices[lo:hi]
+            combined = np.concatenate([tail, new])
+            pos = len(tail) + np.arange(len(new))
+            for i, k in enumerate(LAGS):
+                src = pos - k
+                lags[lo:hi, i] = np.where(src >= 0, combined[np.maximum(src, 0)], new)
+
+            self.tails[key] = combined[-WINDOW:]
+            self.last_date[key] = dates[hi - 1]
+
+        features = rows.copy()
+        features[LAG_COLS] = lags
+        features[SEASONAL_COLS] = seasonal_features(rows['month'].values, rows['dow'].values)
+        self.parts.append(features)
+        return features
+
+    def frame(self):
+        """Alle Features (Reihenfolge: pro append nach carrier/route/date)"""
+        if not self.parts:
+            return pd.DataFrame()
+        return pd.concat(self.parts, ignore_index=True)
+
+    def __len__(self):
+        return sum(len(part) for part in self.parts)
+
+    # ── Persistenz ───────────────────────────────────────────────────────────
+
+    def save(self, root):
+        """Schreibt nur neue parts + den (kleinen) Tail-State"""
+        os.makedirs(root, exist_ok=True)
+        for i in range(self._saved, len(self.parts)):
+            self.parts[i].to_pickle(os.path.join(root, f'part-{i:05d}.pkl'))
+        self._saved = len(self.parts)
+        with open(os.path.join(root, 'state.pkl'), 'wb') as f:
+            pickle.dump({'tails': self.tails, 'last_date': self.last_date}, f)
+
+    @classmethod
+    def load(cls, root):
+        store = cls()
+        with open(os.path.join(root, 'state.pkl'), 'rb') as f:
+            state = pickle.load(f)
+        store.tails, store.last_date = state['tails'], state['last_date']
+        store.parts = [pd.read_pickle(p) for p in sorted(glob.glob(os.path.join(root, 'part-*.pkl')))]
+        store._saved = len(store.parts)
+        return store
+
+    @staticmethod
+    def exists(root):
+        return os.path.exists(os.path.join(root, 'state.pkl'))
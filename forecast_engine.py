@@ -0,0 +1,118 @@
+# ════════════════════════════════════════════════════════════════════════════
+# FORECAST ENGINE – Vektorisierte Mehrtages-Prognose ohne DataFrames
+# ════════════════════════════════════════════════════════════════════════════
+# Die Preis-Prognose ist rekursiv: der Preis von morgen hängt von lag1/lag7/
+# lag30 ab, also auch von den eigenen Vorhersagen. Statt pro Tag 1-Zeilen-
+# DataFrames zu bauen (pd.concat + tail(30)):
+# - Lag-Zustand ALLER Carrier × Routen in einem Ringpuffer (G, 30)
+# - pro Horizont-Schritt 1 Matrix-Vorhersage für alle Gruppen gleichzeitig
+# - Saison-Features für alle Tage vorab als Array
+# ════════════════════════════════════════════════════════════════════════════
+
+import numpy as np
+import pandas as pd
+
+WINDOW = 30
+LAGS = (1, 7, 30)
+
+
+def seasonal_features(months, dows):
+    """
+    Saison- & Event-Indikatoren (gleiche Reihenfolge wie FEATURE_COLS nach den Lags)
+
+    OUTPUT: (..., 7) – month_sin, month_cos, dow_sin, dow_cos,
+            is_christmas_peak, is_chinese_new_year, is_summer_peak
+    """
+    months = np.asarray(months, dtype=np.float64)
+    dows = np.asarray(dows, dtype=np.float64)
+    return np.stack([
+        np.sin(2 * np.pi * months / 12),
+        np.cos(2 * np.pi * months / 12),
+        np.sin(2 * np.pi * dows / 7),
+        np.cos(2 * np.pi * dows / 7),
+        np.isin(months, [10, 11, 12, 1]).astype(np.float64),
+        np.isin(months, [1, 2, 3]).astype(np.float64),
+        np.isin(months, [6, 7, 8, 9]).astype(np.float64),
+    ], axis=-1)
+
+
+class LagRingBuffer:
+    """Letzte `window` Preise pro Gruppe – fester Speicher, kein Umkopieren"""
+
+    def __init__(self, n_groups, window=WINDOW):
+        self.window = window
+        self.values = np.zeros((n_groups, window), dtype=np.float64)
+        self.n_valid = np.zeros(n_groups, dtype=np.int64)   # Wie viele Werte echt sind (max. window)
+        self.pos = 0                                        # Nächste Schreibposition (alle Gruppen synchron)
+
+    @classmethod
+    def from_tails(cls, tails, window=WINDOW):
+        """tails: Liste von Arrays (ältester → neuester Wert), je Gruppe"""
+        buffer = cls(len(tails), window)
+        for g, tail in enumerate(tails):
+            tail = np.asarray(tail, dtype=np.float64)[-window:]
+            # Rechtsbündig ablegen → neuester Wert liegt bei pos - 1
+            buffer.values[g, window - len(tail):] = tail
+            buffer.n_valid[g] = len(tail)
+        return buffer
+
+    def push(self, values):
+        self.values[:, self.pos] = values
+        self.pos = (self.pos + 1) % self.window
+        self.n_valid = np.minimum(self.n_valid + 1, self.window)
+
+    def lag(self, k, fallback):
+        """
+        Wert von vor k Schritten; fehlt er, wie bisher: lag7/lag30 → lag1,
+        lag1 → fallback (z.B. base_cost des Carriers)
+        """
+        value = self.values[:, (self.pos - k) % self.window]
+        if k == 1:
+            return np.where(self.n_valid >= 1, value, fallback)
+        return np.where(self.n_valid >= k, value, self.lag(1, fallback))
+
+
+class ForecastEngine:
+    """Batched rekursive Prognose für beliebige Carrier × Routen × Horizonte"""
+
+    def __init__(self, model, history, group_fn, default_price):
+        self.model = model                  # predict(X, groups), z.B. GroupedLinearModel
+        self.history = history              # HistoryArrays (Lag-Startzustand)
+        self.group_fn = group_fn            # (carriers, routes) → Modell-Gruppen-Index
+        self.default_price = default_price  # carrier → Preis, wenn keine Historie existiert
+
+    def forecast(self, carriers, routes, start_dates, horizon):
+        """
+        INPUT:
+        - carriers, routes: Listen – prognostiziert wird das Kreuzprodukt
+        - start_dates: erster Prognosetag, einzeln oder Liste (mehrere Ready-Dates)
+        - horizon: Anzahl Tage
+        OUTPUT: (prices (C, R, S, H), dates (S, H) datetime64)
+        """
+        starts = pd.DatetimeIndex(np.atleast_1d(pd.to_datetime(start_dates))).normalize()
+        n_pairs, n_starts = len(carriers) * len(routes), len(starts)
+
+        pairs_c = np.repeat(np.asarray(carriers, dtype=object), len(routes))
+        pairs_r = np.tile(np.asarray(routes, dtype=object), len(carriers))
+
+        # Zeilen-Reihenfolge: (carrier, route, start) – Lag-Startzustand ist für alle
+        # Start-Daten gleich (letzte 30 beobachtete Tage), nur die Saison unterscheidet sich
+        groups = np.repeat(self.group_fn(pairs_c, pairs_r), n_starts)
+        tails = [self.history.tail(c, r, WINDOW) for c, r in zip(pairs_c, pairs_r)]
+        buffer = LagRingBuffer.from_tails([t for t in tails for _ in range(n_starts)])
+        fallback = np.repeat([float(self.default_price(c)) for c in pairs_c], n_starts)
+
+        dates = starts.values[:, None] + np.arange(horizon).astype('timedelta64[D]')   # (S, H)
+        flat = pd.DatetimeIndex(dates.ravel())
+        seasonal = seasonal_features(flat.month, flat.weekday).reshape(n_starts, horizon, -1)
+
+        prices = np.empty((len(groups), horizon), dtype=np.float64)
+        X = np.empty((len(groups), len(LAGS) + seasonal.shape[2]), dtype=np.float64)
+        for h in range(horizon):
+            for i, k in enumerate(LAGS):
+                X[:, i] = buffer.lag(k, fallback)
+            X[:, len(LAGS):] = np.tile(seasonal[:, h], (n_pairs, 1))
+            prices[:, h] = self.model.predict(X, groups)
+            buffer.push(prices[:, h])
+
+        return prices.reshape(len(carriers), len(routes), n_starts, horizon), dates
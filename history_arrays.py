@@ -0,0 +1,157 @@
+# ════════════════════════════════════════════════════════════════════════════
+# HISTORY ARRAYS – Kompakte, memory-mapped Preis-/On-Time-Historie
+# ════════════════════════════════════════════════════════════════════════════
+# Statt DataFrame + Boolean-Masken pro Abfrage:
+#   price[carrier_id, route_id, day_offset]   (float32, zusammenhängend)
+#   ontime[carrier_id, route_id, day_offset]  (float32, NaN = kein Wert)
+#
+# Auf Disk als .npy + meta.json → mehrere Prozesse (Streamlit-Sessions,
+# Batch-Jobs) öffnen dieselbe Datei read-only per mmap, das Betriebssystem
+# hält sie nur 1× im RAM. Slice pro Carrier × Route = O(1), keine Kopie.
+# ════════════════════════════════════════════════════════════════════════════
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ('price', 'ontime')
+
+
+class HistoryArrays:
+    """Preis-/On-Time-Historie als (Carrier, Route, Tag) float32-Arrays"""
+
+    def __init__(self, carriers, routes, start_date, arrays, last_day):
+        self.carriers = list(carriers)
+        self.routes = list(routes)
+        self.start = np.datetime64(pd.Timestamp(start_date).date(), 'D')
+        self.arrays = arrays          # {'price': (C, R, D), 'ontime': (C, R, D)}
+        self.last_day = last_day      # (C, R) letzter Tag mit Wert, -1 = keiner
+        self._carrier_ids = {name: i for i, name in enumerate(self.carriers)}
+        self._route_ids = {name: i for i, name in enumerate(self.routes)}
+
+    # ── Aufbau ───────────────────────────────────────────────────────────────
+
+    @classmethod
+    def from_frame(cls, df, carriers=None, routes=None, price_col='price', ontime_col='ontime'):
+        """Baut die Arrays aus einem DataFrame mit date/carrier/route/price/ontime"""
+        carriers = list(carriers) if carriers is not None else sorted(df['carrier'].unique())
+        routes = list(routes) if routes is not None else sorted(df['route'].unique())
+
+        dates = pd.to_datetime(df['date']).values.astype('datetime64[D]')
+        start = dates.min()
+        day = (dates - start).astype(np.int64)
+        c = pd.Categorical(df['carrier'], categories=carriers).codes
+        r = pd.Categorical(df['route'], categories=routes).codes
+        keep = (c >= 0) & (r >= 0)
+        c, r, day = c[keep], r[keep], day[keep]
+
+        shape = (len(carriers), len(routes), int(day.max()) + 1)
+        arrays = {}
+        for field, col in zip(FIELDS, (price_col, ontime_col)):
+            arr = np.full(shape, np.nan, dtype=np.float32)
+            arr[c, r, day] = df[col].to_numpy(dtype=np.float32)[keep]
+            arrays[field] = arr
+
+        last_day = np.full(shape[:2], -1, dtype=np.int64)
+        np.maximum.at(last_day, (c, r), day)
+        return cls(carriers, routes, start, arrays, last_day)
+
+    def extend(self, df, price_col='price', ontime_col='ontime'):
+        """
+        Neue Zeilen eintragen (z.B. tägliche Rate-Sheets); wächst bei Bedarf nach hinten
+
+        Gemappte (read-only) Arrays werden dabei in den RAM kopiert –
+        danach mit save() neu schreiben, damit andere Prozesse sie sehen.
+        """
+        dates = pd.to_datetime(df['date']).values.astype('datetime64[D]')
+        day = (dates - self.start).astype(np.int64)
+        if len(day) and day.min() < 0:
+            raise ValueError("Zeilen vor Beginn der Historie können nicht angehängt werden")
+        c = pd.Categorical(df['carrier'], categories=self.carriers).codes
+        r = pd.Categorical(df['route'], categories=self.routes).codes
+        keep = (c >= 0) & (r >= 0)
+        c, r, day = c[keep], r[keep], day[keep]
+        if not len(day):
+            return self
+
+        n_days = max(int(day.max()) + 1, self.arrays['price'].shape[2])
+        for field, col in zip(FIELDS, (price_col, ontime_col)):
+            old = self.arrays[field]
+            arr = np.full(old.shape[:2] + (n_days,), np.nan, dtype=np.float32)
+            arr[:, :, :old.shape[2]] = old
+            arr[c, r, day] = df[col].to_numpy(dtype=np.float32)[keep]
+            self.arrays[field] = arr
+
+        self.last_day = self.last_day.copy()
+        np.maximum.at(self.last_day, (c, r), day)
+        return self
+
+    def save(self, path):
+        """Schreibt meta.json + 1 .npy pro Feld (mmap-fähig)"""
+        os.makedirs(path, exist_ok=True)
+        for field, arr in self.arrays.items():
+            out = np.lib.format.open_memmap(
+                os.path.join(path, f'{field}.npy'), mode='w+', dtype=np.float32, shape=arr.shape
+            )
+            out[:] = arr
+            out.flush()
+            del out
+        np.save(os.path.join(path, 'last_day.npy'), self.last_day)
+        with open(os.path.join(path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'carriers': self.carriers,
+                'routes': self.routes,
+                'start_date': str(self.start),
+            }, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def open(cls, path):
+        """Öffnet gespeicherte Arrays read-only per mmap (keine Kopie im Prozess)"""
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        arrays = {
+            field: np.load(os.path.join(path, f'{field}.npy'), mmap_mode='r')
+            for field in FIELDS
+        }
+        last_day = np.load(os.path.join(path, 'last_day.npy'))
+        return cls(meta['carriers'], meta['routes'], meta['start_date'], arrays, last_day)
+
+    @staticmethod
+    def exists(path):
+        return os.path.exists(os.path.join(path, 'meta.json'))
+
+    # ── Zugriff ──────────────────────────────────────────────────────────────
+
+    def carrier_id(self, carrier):
+        return self._carrier_ids[carrier]
+
+    def route_id(self, route):
+        return self._route_ids[route]
+
+    def day_offset(self, date):
+        return int((np.datetime64(pd.Timestamp(date).date(), 'D') - self.start).astype(np.int64))
+
+    def series(self, carrier, route, field='price', start_date=None, end_date=None):
+        """Zeitreihe eines Carrier × Route als View (O(1), keine Kopie)"""
+        row = self.arrays[field][self.carrier_id(carrier), self.route_id(route)]
+        lo = 0 if start_date is None else max(self.day_offset(start_date), 0)
+        hi = len(row) if end_date is None else self.day_offset(end_date) + 1
+        return row[lo:hi]
+
+    def tail(self, carrier, route, n, field='price'):
+        """Die letzten n Tageswerte bis zum letzten beobachteten Tag"""
+        c, r = self.carrier_id(carrier), self.route_id(route)
+        last = self.last_day[c, r]
+        if last < 0:
+            return np.empty(0, dtype=np.float32)
+        row = self.arrays[field][c, r, max(0, last - n + 1):last + 1]
+        return row[~np.isnan(row)]
+
+    def mean(self, field, carrier=None, route=None):
+        """Mittelwert über alle Tage (optional nur 1 Carrier und/oder 1 Route)"""
+        arr = self.arrays[field]
+        c = slice(None) if carrier is None else self.carrier_id(carrier)
+        r = slice(None) if route is None else self.route_id(route)
+        return float(np.nanmean(arr[c, r]))
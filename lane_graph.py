@@ -0,0 +1,195 @@
+# ════════════════════════════════════════════════════════════════════════════
+# LANE GRAPH – Door-to-Door über alternative Häfen + LKW-Nachlauf
+# ════════════════════════════════════════════════════════════════════════════
+# Pitch Tab 5 "Sub-Route Optimizer" / Feature 2A "Last-Mile Cost Integration":
+# "Customer needs Hamburg, but Bremen is cheaper"
+#
+#   Origin ──See (Carrier, Datum)──▶ Zielhafen ──Lager + LKW──▶ Stadt
+#
+# Der Graph ist geschichtet (Origin → Hafen → Stadt), kürzeste Wege sind
+# darum exakt eine Min-Plus-Verknüpfung der Kanten-Kosten-Arrays – kein
+# Dijkstra mit Priority-Queue nötig:
+#
+#   total[d, o, stadt, carrier, hafen] = see[d, o, carrier, hafen] + nachlauf[hafen, stadt]
+#
+# 1× für alle Daten × Origins × Städte vorberechnen (Best + Ranking), danach
+# ist jede Sendung ein Array-Lookup → tausende Sendungen pro Aufruf.
+# ════════════════════════════════════════════════════════════════════════════
+
+import numpy as np
+import pandas as pd
+
+WAREHOUSE_COST_PER_DAY = 10     # €/Tag Lager am Hafen (Pitch-Annahme)
+
+# Häfen ohne eigene Prognose: Seefracht = Proxy-Hafen + Aufschlag (Pitch: Bremen ~€200 günstiger)
+PORT_PROXIES = {
+    "Bremen": ("Hamburg", -200),
+}
+
+# Nachlauf pro (Hafen, Stadt): (LKW €, Lagertage am Hafen)
+# Berlin-Werte aus dem Pitch, Rest grob nach Straßenkilometern geschätzt
+TRUCK_LEGS = {
+    ("Hamburg", "Berlin"): (350, 2.0),
+    ("Bremen", "Berlin"): (380, 3.0),
+    ("Rotterdam", "Berlin"): (420, 3.5),
+    ("Antwerpen", "Berlin"): (450, 3.5),
+    ("Hamburg", "Hannover"): (260, 2.0),
+    ("Bremen", "Hannover"): (230, 3.0),
+    ("Rotterdam", "Hannover"): (360, 3.5),
+    ("Antwerpen", "Hannover"): (390, 3.5),
+    ("Hamburg", "Köln"): (390, 2.0),
+    ("Bremen", "Köln"): (340, 3.0),
+    ("Rotterdam", "Köln"): (270, 3.5),
+    ("Antwerpen", "Köln"): (250, 3.5),
+    ("Hamburg", "Frankfurt"): (450, 2.0),
+    ("Bremen", "Frankfurt"): (420, 3.0),
+    ("Rotterdam", "Frankfurt"): (390, 3.5),
+    ("Antwerpen", "Frankfurt"): (380, 3.5),
+    ("Hamburg", "Leipzig"): (380, 2.0),
+    ("Bremen", "Leipzig"): (400, 3.0),
+    ("Rotterdam", "Leipzig"): (470, 3.5),
+    ("Antwerpen", "Leipzig"): (490, 3.5),
+    ("Hamburg", "Stuttgart"): (560, 2.0),
+    ("Bremen", "Stuttgart"): (530, 3.0),
+    ("Rotterdam", "Stuttgart"): (480, 3.5),
+    ("Antwerpen", "Stuttgart"): (470, 3.5),
+    ("Hamburg", "München"): (620, 2.0),
+    ("Bremen", "München"): (610, 3.0),
+    ("Rotterdam", "München"): (600, 3.5),
+    ("Antwerpen", "München"): (590, 3.5),
+    ("Hamburg", "Hamburg"): (80, 2.0),
+    ("Bremen", "Hamburg"): (190, 3.0),
+}
+
+
+def last_mile_costs(ports, cities, truck_legs=None, warehouse_cost_per_day=WAREHOUSE_COST_PER_DAY):
+    """
+    Nachlauf-Kosten als Matrix (Häfen, Städte) – inf = keine Verbindung
+
+    OUTPUT: (total, truck, warehouse) je (Häfen, Städte)
+    """
+    truck_legs = TRUCK_LEGS if truck_legs is None else truck_legs
+    truck = np.full((len(ports), len(cities)), np.inf)
+    warehouse = np.full((len(ports), len(cities)), np.inf)
+    for i, port in enumerate(ports):
+        for j, city in enumerate(cities):
+            if (port, city) in truck_legs:
+                cost, days = truck_legs[(port, city)]
+                truck[i, j] = cost
+                warehouse[i, j] = days * warehouse_cost_per_day
+    return truck + warehouse, truck, warehouse
+
+
+class LaneGraph:
+    """Vorberechnete Door-to-Door-Kosten für alle Daten × Origins × Städte"""
+
+    def __init__(self, dates, origins, carriers, ports, cities, sea_cost, truck_legs=None):
+        """
+        sea_cost: (Daten, Origins, Carrier, Häfen) – € pro See-Leg (Preis oder TCO),
+                  NaN/inf = Leg existiert nicht
+        """
+        self.dates = pd.DatetimeIndex(dates).normalize()
+        self.origins, self.carriers = list(origins), list(carriers)
+        self.ports, self.cities = list(ports), list(cities)
+        self.sea_cost = np.where(np.isnan(sea_cost), np.inf, np.asarray(sea_cost, dtype=np.float64))
+        self.last_mile, self.truck, self.warehouse = last_mile_costs(self.ports, self.cities, truck_legs)
+
+        # Min-Plus: (D, O, 1, C, P) + (1, 1, Städte, 1, P) → (D, O, Städte, C, P)
+        total = self.sea_cost[:, :, None, :, :] + self.last_mile.T[None, None, :, None, :]
+        self.total = total
+        flat = total.reshape(total.shape[:3] + (-1,))           # (D, O, Städte, C×P)
+        self.order = np.argsort(flat, axis=-1, kind='stable')    # Ranking aller Pfade
+        self.best_cost = np.take_along_axis(flat, self.order[..., :1], axis=-1)[..., 0]
+
+        self._origin_idx = {o: i for i, o in enumerate(self.origins)}
+        self._city_idx = {c: i for i, c in enumerate(self.cities)}
+
+    @classmethod
+    def from_route_forecast(cls, prices, routes, carriers, dates, cities=None, port_proxies=None,
+                            truck_legs=None):
+        """
+        Aus einer Prognose/TCO pro Route: prices (Routen, Carrier, Tage), Routen als "A → B"
+        Zusätzliche Häfen (z.B. Bremen) über PORT_PROXIES abgeleitet.
+        """
+        port_proxies = PORT_PROXIES if port_proxies is None else port_proxies
+        truck_legs = TRUCK_LEGS if truck_legs is None else truck_legs
+        pairs = [tuple(route.split(" → ")) for route in routes]
+        origins = list(dict.fromkeys(o for o, _ in pairs))
+        ports = list(dict.fromkeys(d for _, d in pairs))
+        ports += [p for p, (proxy, _) in port_proxies.items() if proxy in ports and p not in ports]
+        if cities is None:
+            cities = list(dict.fromkeys(city for _, city in truck_legs))
+
+        prices = np.asarray(prices, dtype=np.float64)
+        sea = np.full((prices.shape[2], len(origins), len(carriers), len(ports)), np.nan)
+        for r, (origin, port) in enumerate(pairs):
+            sea[:, origins.index(origin), :, ports.index(port)] = prices[r].T
+        for port, (proxy, adjustment) in port_proxies.items():
+            if port in ports and proxy in ports:
+                sea[..., ports.index(port)] = sea[..., ports.index(proxy)] + adjustment
+
+        return cls(dates, origins, carriers, ports, cities, sea, truck_legs)
+
+    # ── Abfragen ─────────────────────────────────────────────────────────────
+
+    def _indices(self, origins, cities, dates):
+        o = np.array([self._origin_idx[x] for x in np.atleast_1d(origins)])
+        c = np.array([self._city_idx[x] for x in np.atleast_1d(cities)])
+        d = self.dates.get_indexer(pd.DatetimeIndex(np.atleast_1d(pd.to_datetime(dates))).normalize())
+        if (d < 0).any():
+            raise KeyError("Datum liegt außerhalb des Lane-Graphen")
+        return d, o, c
+
+    def query(self, origins, cities, dates, k=1):
+        """
+        Viele Sendungen auf einmal (Arrays gleicher Länge oder broadcastbar)
+
+        OUTPUT: Dict mit Arrays (Sendungen, k): carrier, port (Index), cost
+        """
+        d, o, c = self._indices(origins, cities, dates)
+        d, o, c = np.broadcast_arrays(d, o, c)
+        paths = self.order[d, o, c, :k]                                    # (N, k)
+        cost = self.total.reshape(self.total.shape[:3] + (-1,))[d[:, None], o[:, None], c[:, None], paths]
+        carrier_idx, port_idx = np.divmod(paths, len(self.ports))
+        return {'carrier': carrier_idx, 'port': port_idx, 'cost': cost}
+
+    def k_best(self, origin, city, date, k=3):
+        """Die k günstigsten Door-to-Door-Optionen einer Sendung mit Aufschlüsselung"""
+        result = self.query([origin], [city], [date], k=k)
+        d, o, c = (idx[0] for idx in self._indices([origin], [city], [date]))
+        options = []
+        for carrier_idx, port_idx, cost in zip(result['carrier'][0], result['port'][0], result['cost'][0]):
+            if not np.isfinite(cost):
+                break
+            options.append({
+                'carrier': self.carriers[carrier_idx],
+                'port': self.ports[port_idx],
+                'sea_eur': round(float(self.sea_cost[d, o, carrier_idx, port_idx]), 2),
+                'truck_eur': round(float(self.truck[port_idx, c]), 2),
+                'warehouse_eur': round(float(self.warehouse[port_idx, c]), 2),
+                'total_eur': round(float(cost), 2),
+            })
+        return options
+
+    def best(self, origin, city, date):
+        options = self.k_best(origin, city, date, k=1)
+        return options[0] if options else None
+
+    def compare_ports(self, origin, city, date):
+        """Pitch-Tabelle: pro Zielhafen die beste Carrier-Option (See + LKW + Lager)"""
+        d, o, c = (idx[0] for idx in self._indices([origin], [city], [date]))
+        rows = []
+        for p, port in enumerate(self.ports):
+            costs = self.total[d, o, c, :, p]
+            carrier_idx = int(np.argmin(costs))
+            if not np.isfinite(costs[carrier_idx]):
+                continue
+            rows.append({
+                'port': port,
+                'carrier': self.carriers[carrier_idx],
+                'sea_eur': round(float(self.sea_cost[d, o, carrier_idx, p]), 2),
+                'truck_eur': round(float(self.truck[p, c]), 2),
+                'warehouse_eur': round(float(self.warehouse[p, c]), 2),
+                'total_eur': round(float(costs[carrier_idx]), 2),
+            })
+        return sorted(rows, key=lambda row: row['total_eur'])
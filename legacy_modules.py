@@ -0,0 +1,50 @@
+# ════════════════════════════════════════════════════════════════════════════
+# LEGACY MODULES – Module aus _old/ über den Dateipfad laden
+# ════════════════════════════════════════════════════════════════════════════
+# Per `import` nicht erreichbar:
+#   "_old/freight_optimizer_ old.py"  → Leerzeichen im Dateinamen
+#   "_old/data_generator.py"          → von data_generator.py im Root verdeckt
+#
+# Geladen wird 1× pro Prozess unter festem Namen in sys.modules – Service,
+# Benchmark und spätere `from freight_optimizer import ...` teilen dieselbe
+# Instanz (und ProcessPoolExecutor findet die Funktionen beim Pickeln).
+# ════════════════════════════════════════════════════════════════════════════
+
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+LEGACY_FILES = {
+    'freight_optimizer': 'freight_optimizer_ old.py',
+    'daily_data_generator': 'data_generator.py',
+}
+
+
+def load_legacy(name):
+    """Modul aus _old/ laden (oder das bereits geladene zurückgeben)"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    if name not in LEGACY_FILES:
+        raise KeyError(f"Unbekanntes Legacy-Modul {name!r} – bekannt: {sorted(LEGACY_FILES)}")
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, '_old', LEGACY_FILES[name]))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+def load_freight_optimizer():
+    """_old/freight_optimizer_ old.py als Modul `freight_optimizer`"""
+    return load_legacy('freight_optimizer')
+
+
+def load_daily_generator():
+    """_old/data_generator.py als Modul `daily_data_generator`"""
+    return load_legacy('daily_data_generator')
@@ -0,0 +1,122 @@
+# ════════════════════════════════════════════════════════════════════════════
+# LINEAR MODELS – Gruppierte lineare Regression (1 Modell pro Gruppe)
+# ════════════════════════════════════════════════════════════════════════════
+# Statt einer Python-Schleife mit sklearn-Fits pro Carrier × Route:
+# - Suffiziente Statistiken (n, Σx, ΣxxT, Σxy, Σy) für ALLE Gruppen per
+#   np.bincount in einem Durchlauf über die Daten
+# - Scaler (Mittelwert/Std) pro Gruppe direkt aus diesen Statistiken
+# - Normalgleichungen aller Gruppen als gestapeltes (G, F, F)-System,
+#   gelöst mit einem einzigen batched pinv
+#
+# Skaliert auf hunderte Carrier × Lane-Modelle; weitere Daten lassen sich
+# per partial_fit einfach aufaddieren.
+# ════════════════════════════════════════════════════════════════════════════
+
+import numpy as np
+
+
+class GroupedLinearModel:
+    """Lineare Regression mit Standardisierung, je 1 Satz Parameter pro Gruppe"""
+
+    def __init__(self, n_groups, n_features, ridge=1e-6):
+        self.n_groups = n_groups
+        self.n_features = n_features
+        self.ridge = ridge          # Minimale Regularisierung gegen singuläre Gruppen
+        self.reset()
+
+    def reset(self):
+        G, F = self.n_groups, self.n_features
+        self.n_samples_ = np.zeros(G, dtype=np.float64)
+        self._sx = np.zeros((G, F))
+        self._sxx = np.zeros((G, F, F))
+        self._sxy = np.zeros((G, F))
+        self._sy = np.zeros(G)
+        self._syy = np.zeros(G)
+        self.mean_ = np.zeros((G, F))
+        self.scale_ = np.ones((G, F))
+        self.coef_ = np.zeros((G, F))
+        self.intercept_ = np.zeros(G)
+
+    # ── Training ─────────────────────────────────────────────────────────────
+
+    def fit(self, X, y, groups):
+        """
+        INPUT:
+        - X: (N, F) Features
+        - y: (N,) Zielwerte
+        - groups: (N,) Gruppen-Index 0..n_groups-1
+        """
+        self.reset()
+        return self.partial_fit(X, y, groups)
+
+    def partial_fit(self, X, y, groups):
+        """Addiert neue Zeilen zu den Statistiken und löst alle Gruppen neu"""
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        groups = np.asarray(groups, dtype=np.int64)
+        G, F = self.n_groups, self.n_features
+
+        def _sum(weights):
+            return np.bincount(groups, weights=weights, minlength=G)
+
+        self.n_samples_ += np.bincount(groups, minlength=G)
+        self._sy += _sum(y)
+        self._syy += _sum(y * y)
+        for i in range(F):
+            self._sx[:, i] += _sum(X[:, i])
+            self._sxy[:, i] += _sum(X[:, i] * y)
+            for j in range(i, F):
+                s = _sum(X[:, i] * X[:, j])
+                self._sxx[:, i, j] += s
+                if j != i:
+                    self._sxx[:, j, i] += s
+
+        self._solve()
+        return self
+
+    def _solve(self):
+        """Standardisierte Normalgleichungen aller Gruppen in einem Batch lösen"""
+        n = np.maximum(self.n_samples_, 1)[:, None]
+        mean = self._sx / n
+        y_mean = self._sy / n[:, 0]
+
+        # Kovarianz aus Rohsummen: E[xxT] - μμT
+        cov = self._sxx / n[:, :, None] - mean[:, :, None] * mean[:, None, :]
+        var = np.clip(np.diagonal(cov, axis1=1, axis2=2), 0, None)
+        scale = np.sqrt(var)
+        scale[scale < 1e-12] = 1.0      # Konstante Features (wie sklearn StandardScaler)
+
+        # Auf standardisierte Features umrechnen: z = (x - μ) / σ
+        zz = cov / (scale[:, :, None] * scale[:, None, :])
+        zy = (self._sxy / n - mean * y_mean[:, None]) / scale
+        zz = zz + self.ridge * np.eye(self.n_features)
+
+        coef = np.einsum('gij,gj->gi', np.linalg.pinv(zz), zy)
+
+        empty = self.n_samples_ == 0
+        coef[empty] = 0.0
+        self.mean_, self.scale_ = mean, scale
+        self.coef_, self.intercept_ = coef, np.where(empty, 0.0, y_mean)
+
+    # ── Anwendung ────────────────────────────────────────────────────────────
+
+    def transform(self, X, groups):
+        """Standardisiert X mit dem Scaler der jeweiligen Gruppe"""
+        groups = np.asarray(groups, dtype=np.int64)
+        return (np.asarray(X, dtype=np.float64) - self.mean_[groups]) / self.scale_[groups]
+
+    def predict(self, X, groups):
+        groups = np.asarray(groups, dtype=np.int64)
+        return np.einsum('nf,nf->n', self.transform(X, groups), self.coef_[groups]) + self.intercept_[groups]
+
+    def score(self, X, y, groups):
+        """R² pro Gruppe (NaN für Gruppen ohne Daten)"""
+        groups = np.asarray(groups, dtype=np.int64)
+        y = np.asarray(y, dtype=np.float64)
+        resid = y - self.predict(X, groups)
+        ss_res = np.bincount(groups, weights=resid ** 2, minlength=self.n_groups)
+        y_mean = np.bincount(groups, weights=y, minlength=self.n_groups) / np.maximum(
+            np.bincount(groups, minlength=self.n_groups), 1)
+        ss_tot = np.bincount(groups, weights=(y - y_mean[groups]) ** 2, minlength=self.n_groups)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(ss_tot > 0, 1 - ss_res / ss_tot, np.nan)
@@ -0,0 +1,107 @@
+# ════════════════════════════════════════════════════════════════════════════
+# MODEL REGISTRY – Trainierte Modelle versioniert auf Disk
+# ════════════════════════════════════════════════════════════════════════════
+# Schlüssel = Hash(Trainingsdaten + Modell-Konfiguration).
+# Gleiche Daten + gleiche Konfiguration → Artefakte laden (Millisekunden),
+# sonst 1× trainieren und ablegen. Überlebt Restarts, Deploys und Replicas.
+#
+# LAYOUT: <root>/<key>/artifacts.pkl   (Modelle, Scaler, Feature-Schema)
+#         <root>/<key>/meta.json       (Konfiguration, Zeitpunkt, Zeilenanzahl)
+#
+# Online-Updates (predictor.update): Modelle enthalten ihre suffizienten
+# Statistiken, neuer Key = derive_fingerprint(alter Key, neue Zeilen).
+# ════════════════════════════════════════════════════════════════════════════
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+
+REGISTRY_DIR = os.environ.get(
+    "FREIGHT_MODEL_REGISTRY",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "model_registry"),
+)
+
+
+def fingerprint(df, config=None):
+    """Stabiler Hash über Dateninhalt (Spalten + Werte) und Konfiguration"""
+    h = hashlib.sha256()
+    h.update(json.dumps(list(map(str, df.columns))).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    h.update(json.dumps(config or {}, sort_keys=True, default=str).encode())
+    return h.hexdigest()[:16]
+
+
+def derive_fingerprint(parent_key, new_rows):
+    """Key nach einem inkrementellen Update: Hash(alter Key + nur die neuen Zeilen)"""
+    h = hashlib.sha256(parent_key.encode())
+    h.update(pd.util.hash_pandas_object(new_rows, index=False).values.tobytes())
+    return h.hexdigest()[:16]
+
+
+class ModelRegistry:
+    """Lokale Ablage für Modell-Artefakte, adressiert per Fingerprint"""
+
+    def __init__(self, root=REGISTRY_DIR):
+        self.root = root
+
+    def _dir(self, key):
+        return os.path.join(self.root, key)
+
+    def exists(self, key):
+        return os.path.exists(os.path.join(self._dir(key), 'artifacts.pkl'))
+
+    def save(self, key, artifacts, meta=None):
+        """Schreibt atomar (erst temp-Ordner, dann rename) → keine halben Artefakte"""
+        os.makedirs(self.root, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=self.root, prefix=f'.{key}-')
+        with open(os.path.join(tmp, 'artifacts.pkl'), 'wb') as f:
+            pickle.dump(artifacts, f, protocol=pickle.HIGHEST_PROTOCOL)
+        with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'key': key,
+                'created': datetime.now().isoformat(timespec='seconds'),
+                **(meta or {}),
+            }, f, ensure_ascii=False, indent=2, default=str)
+
+        target = self._dir(key)
+        if os.path.exists(target):
+            shutil.rmtree(target)
+        os.replace(tmp, target)
+
+    def load(self, key):
+        with open(os.path.join(self._dir(key), 'artifacts.pkl'), 'rb') as f:
+            return pickle.load(f)
+
+    def meta(self, key):
+        with open(os.path.join(self._dir(key), 'meta.json'), encoding='utf-8') as f:
+            return json.load(f)
+
+    def keys(self):
+        """Alle gespeicherten Schlüssel, neueste zuerst"""
+        if not os.path.isdir(self.root):
+            return []
+        keys = [k for k in os.listdir(self.root) if not k.startswith('.') and self.exists(k)]
+        return sorted(keys, key=lambda k: os.path.getmtime(self._dir(k)), reverse=True)
+
+    def get_or_train(self, key, train_fn, meta=None):
+        """
+        Artefakte laden, falls vorhanden – sonst train_fn() aufrufen und speichern
+
+        OUTPUT: (artifacts, from_cache)
+        """
+        if self.exists(key):
+            return self.load(key), True
+        artifacts = train_fn()
+        self.save(key, artifacts, meta)
+        return artifacts, False
+
+    def prune(self, keep=5):
+        """Löscht alte Versionen, behält die `keep` neuesten"""
+        for key in self.keys()[keep:]:
+            shutil.rmtree(self._dir(key))
@@ -0,0 +1,238 @@
+# ════════════════════════════════════════════════════════════════════════════
+# PORTFOLIO – Viele Sendungen gemeinsam auf Carrier × Buchungstage verteilen
+# ════════════════════════════════════════════════════════════════════════════
+# get_best_booking_dates optimiert 1 Sendung. Im Betrieb werden pro Woche
+# dutzende bis hunderte Sendungen gebucht, und Carrier haben Kapazitäten.
+#
+# MODELL (Generalized Assignment):
+#   x[s, c, d] ∈ {0, 1}   Sendung s bei Carrier c am Tag d
+#   min Σ kosten[s, c, d] · x          kosten = €/Ton × Gewicht + Verspätungsrisiko
+#   Σ_c,d x[s, c, d] = 1               jede Sendung genau 1×
+#   Σ_s gewicht[s] · x[s, c, d] ≤ kap[c, d]
+#
+# LÖSER:
+# - "lp":     LP-Relaxierung mit HiGHS (scipy) auf den top_k Optionen pro
+#             Sendung, dann Runden + Reparatur per Greedy
+# - "greedy": Regret-Heuristik (Sendungen mit dem größten Abstand zwischen
+#             bester und zweitbester Option zuerst) – skaliert auf 10k+
+# - "auto":   LP bis lp_max_vars Variablen, sonst Greedy
+#
+# Kosten kommen vektorisiert aus der Batch-Prognose (Routen, Carrier, Tage).
+# ════════════════════════════════════════════════════════════════════════════
+
+import numpy as np
+import pandas as pd
+
+from tco_engine import DEFAULT_TRANSIT_DAYS, penalty_per_day
+
+WEIGHT_MIN = 5      # Tonnen, wie data_generator.py (kleine LCL)
+WEIGHT_MAX = 500    # Tonnen (große Full Container Load)
+
+
+def candidate_costs(shipments, prices, dates, routes, ontime, window=14,
+                    transit_days=DEFAULT_TRANSIT_DAYS):
+    """
+    Kosten aller Optionen pro Sendung: (Sendungen, Carrier, Tage), inf = nicht buchbar
+
+    INPUT:
+    - shipments: DataFrame mit ready_date, route, weight und profile ODER penalty_per_day_late
+    - prices: (Routen, Carrier, Tage) €/Ton, dates: (Tage,)
+    - ontime: (Carrier, Routen) erwartete On-Time %
+    - window: buchbar sind ready_date … ready_date + window - 1
+    OUTPUT: (total, freight, delay) je (S, C, D)
+    """
+    weights = shipments['weight'].to_numpy(dtype=np.float64)
+    if ((weights < WEIGHT_MIN) | (weights > WEIGHT_MAX)).any():
+        raise ValueError(f"Gewicht muss zwischen {WEIGHT_MIN} und {WEIGHT_MAX} Tonnen liegen")
+
+    route_idx = pd.Categorical(shipments['route'], categories=routes).codes
+    if (route_idx < 0).any():
+        raise KeyError("Unbekannte Route in shipments")
+
+    if 'penalty_per_day_late' in shipments:
+        penalties = shipments['penalty_per_day_late'].to_numpy(dtype=np.float64)
+    else:
+        profiles = shipments['profile'] if 'profile' in shipments else pd.Series('Default', index=shipments.index)
+        penalties = np.array([penalty_per_day(p) for p in profiles], dtype=np.float64)
+
+    # Buchungsfenster als Maske über die globalen Prognose-Tage
+    days = pd.DatetimeIndex(dates).values.astype('datetime64[D]')
+    ready = pd.to_datetime(shipments['ready_date']).values.astype('datetime64[D]')
+    offset = (days[None, :] - ready[:, None]).astype(np.int64)              # (S, D)
+    bookable = (offset >= 0) & (offset < window)
+
+    freight = weights[:, None, None] * np.asarray(prices, dtype=np.float64)[route_idx]       # (S, C, D)
+    late_days = (100 - np.asarray(ontime, dtype=np.float64).T[route_idx]) / 100 * transit_days  # (S, C)
+    delay = np.broadcast_to((late_days * penalties[:, None])[:, :, None], freight.shape)
+    total = np.where(bookable[:, None, :], freight + delay, np.inf)
+    return total, freight, delay
+
+
+def _greedy(cost, weights, capacity, order=None):
+    """
+    Regret-Greedy: Sendungen mit dem größten Nachteil bei Verlust der besten
+    Option zuerst, jeweils günstigste Option mit freier Kapazität
+
+    cost: (S, O) – jede Spalte ist ein Kapazitäts-Slot, capacity: (O,)
+    order: optionale feste Reihenfolge der Sendungen
+    OUTPUT: gewählte Spalte pro Sendung, -1 = nicht zuordenbar
+    """
+    S = cost.shape[0]
+    remaining = capacity.astype(np.float64).copy()
+    choice = np.full(S, -1, dtype=np.int64)
+
+    ranked = np.argsort(cost, axis=1, kind='stable')
+    if order is None:
+        best = np.take_along_axis(cost, ranked[:, :1], axis=1)[:, 0]
+        second = np.take_along_axis(cost, ranked[:, 1:2], axis=1)[:, 0] if cost.shape[1] > 1 else best
+        with np.errstate(invalid='ignore'):     # Sendung ohne Option: inf - inf
+            regret = np.where(np.isfinite(second), second - best, np.inf)
+        order = np.lexsort((np.arange(S), -regret))
+
+    for s in order:
+        for option in ranked[s]:
+            if not np.isfinite(cost[s, option]):
+                break
+            if remaining[option] >= weights[s]:
+                remaining[option] -= weights[s]
+                choice[s] = option
+                break
+    return choice
+
+
+def _solve_lp(cost, weights, capacity, top_k):
+    """
+    LP-Relaxierung (HiGHS) auf den top_k Optionen pro Sendung → fraktionale Lösung
+
+    OUTPUT: ((ship_idx, opt_idx, x), lp_info) – lp_info: lp_objective = LP-Optimum inkl.
+            Strafkosten big_m je nicht platzierter Sendung, lp_unassigned = Σ Schlupf,
+            lp_bound = lp_objective nur wenn alle Optionen im LP sind (sonst None)
+    """
+    from scipy.optimize import linprog
+    from scipy.sparse import csr_matrix
+
+    S, O = cost.shape
+    k = min(top_k, O)
+    options = np.argpartition(cost, k - 1, axis=1)[:, :k] if k < O else np.tile(np.arange(O), (S, 1))
+    var_cost = np.take_along_axis(cost, options, axis=1)
+    keep = np.isfinite(var_cost)
+    ship_idx = np.repeat(np.arange(S), k)[keep.ravel()]
+    opt_idx = options.ravel()[keep.ravel()]
+    c = var_cost.ravel()[keep.ravel()]
+    n = len(c)
+
+    # Schlupf pro Sendung ("nicht buchen") mit Strafkosten → LP bleibt auch bei
+    # zu knapper Kapazität lösbar, der Rest geht an die Greedy-Reparatur
+    big_m = 10 * (c.max() if n else 1.0)
+    a_eq = csr_matrix((np.ones(n + S), (np.concatenate([ship_idx, np.arange(S)]), np.arange(n + S))),
+                      shape=(S, n + S))
+    a_ub = csr_matrix((weights[ship_idx], (opt_idx, np.arange(n))), shape=(O, n + S))
+    result = linprog(np.concatenate([c, np.full(S, big_m)]), A_ub=a_ub, b_ub=capacity,
+                     A_eq=a_eq, b_eq=np.ones(S), bounds=(0, 1), method='highs')
+    if result.status != 0:
+        return None, None
+    x, slack = result.x[:n], result.x[n:]
+    # Nur mit allen Optionen ist das LP eine Relaxierung – auf top_k beschränkt kann
+    # die Reparatur Optionen außerhalb nutzen und besser als das LP sein
+    return (ship_idx, opt_idx, x), {
+        'lp_objective': float(result.fun),
+        'lp_bound': float(result.fun) if k >= O else None,
+        'lp_unassigned': round(float(slack.sum()), 6),
+        'big_m': float(big_m),
+    }
+
+
+def allocate_shipments(shipments, prices, dates, routes, carriers, capacity, ontime,
+                       window=14, transit_days=DEFAULT_TRANSIT_DAYS, method='auto',
+                       top_k=10, lp_max_vars=200_000):
+    """
+    Verteilt alle Sendungen gemeinsam auf Carrier × Buchungstage
+
+    INPUT:
+    - shipments: DataFrame (ready_date, route, weight, profile/penalty_per_day_late)
+    - prices: (Routen, Carrier, Tage) €/Ton aus predict_batch, dates: (Tage,)
+    - capacity: Tonnen pro Carrier (C,) über das ganze Fenster ODER pro Tag (C, Tage)
+    - ontime: (Carrier, Routen) erwartete On-Time %
+    - method: 'auto' | 'lp' | 'greedy'
+    OUTPUT: (assignments DataFrame, info Dict mit method, objective, unassigned und bei LP
+            lp_objective, lp_bound, lp_unassigned, penalized_objective)
+
+    Im LP kostet jede nicht platzierte Sendung big_m → lp_objective ist mit
+    penalized_objective = objective + big_m × unassigned vergleichbar, nicht mit
+    objective allein. Untere Schranke (lp_bound) nur, wenn top_k alle Optionen umfasst.
+    """
+    total, freight, delay = candidate_costs(shipments, prices, dates, routes, ontime, window, transit_days)
+    S, C, D = total.shape
+    weights = shipments['weight'].to_numpy(dtype=np.float64)
+
+    # Kapazität als Slots: pro Carrier (ganzes Fenster) oder pro Carrier × Tag
+    capacity = np.asarray(capacity, dtype=np.float64)
+    if capacity.ndim == 1:
+        # Pro Carrier: Optionen eines Carriers teilen sich 1 Slot → Tage vorab minimieren
+        best_day = np.argmin(total, axis=2)                                   # (S, C)
+        cost = np.take_along_axis(total, best_day[:, :, None], axis=2)[:, :, 0]
+        slot_capacity = capacity
+    else:
+        cost = total.reshape(S, C * D)
+        slot_capacity = capacity.reshape(-1)
+
+    use_lp = method == 'lp' or (method == 'auto' and S * min(top_k, cost.shape[1]) <= lp_max_vars)
+    info = {'method': 'greedy', 'lp_bound': None}
+    choice = None
+    big_m = None
+
+    if use_lp:
+        try:
+            lp, lp_info = _solve_lp(cost, weights, slot_capacity, top_k)
+        except ImportError:
+            lp, lp_info = None, None
+        if lp is not None:
+            ship_idx, opt_idx, x = lp
+            big_m = lp_info.pop('big_m')
+            info.update(method='lp', **lp_info)
+            # Runden: pro Sendung die Option mit dem größten x; Reparatur per Greedy,
+            # beginnend mit den ganzzahligen (sicheren) Zuordnungen
+            strongest = np.full(S, -1.0)
+            preferred = np.full(S, -1, dtype=np.int64)
+            np.maximum.at(strongest, ship_idx, x)
+            mask = x >= strongest[ship_idx]
+            preferred[ship_idx[mask]] = opt_idx[mask]
+            lp_cost = np.full_like(cost, np.inf)
+            lp_cost[np.arange(S), preferred] = cost[np.arange(S), preferred]
+            order = np.argsort(-strongest, kind='stable')
+            choice = _greedy(lp_cost, weights, slot_capacity, order=order)
+            # Was nicht passt, bekommt die beste verbleibende Option
+            left = np.flatnonzero(choice < 0)
+            if len(left):
+                used = np.bincount(choice[choice >= 0], weights=weights[choice >= 0],
+                                   minlength=len(slot_capacity))
+                choice[left] = _greedy(cost[left], weights[left], slot_capacity - used)
+
+    if choice is None:
+        choice = _greedy(cost, weights, slot_capacity)
+
+    # Gewählte Spalte → (Carrier, Tag), nicht zugeordnete Sendungen bleiben leer
+    assigned = choice >= 0
+    idx = np.arange(S)
+    if capacity.ndim == 1:
+        c = np.where(assigned, choice, 0)
+        d = best_day[idx, c]
+    else:
+        c, d = np.divmod(np.where(assigned, choice, 0), D)
+
+    def _pick(values):
+        return np.where(assigned, np.round(values[idx, c, d], 2), np.nan)
+
+    assignments = pd.DataFrame({
+        'shipment': shipments.index,
+        'carrier': pd.Series(np.asarray(carriers, dtype=object)[c]).where(assigned, None).values,
+        'booking_date': pd.DatetimeIndex(np.asarray(dates)[d]).where(assigned),
+        'freight_eur': _pick(freight),
+        'delay_eur': _pick(delay),
+        'total_eur': _pick(total),
+    })
+    info['objective'] = float(assignments['total_eur'].sum())
+    info['unassigned'] = int((choice < 0).sum())
+    if big_m is not None:
+        info['penalized_objective'] = info['objective'] + big_m * info['unassigned']
+    return assignments, info
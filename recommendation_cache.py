@@ -0,0 +1,123 @@
+# ════════════════════════════════════════════════════════════════════════════
+# RECOMMENDATION CACHE – LRU + TTL für Prognosen & Empfehlungen
+# ════════════════════════════════════════════════════════════════════════════
+# get_best_booking_dates ist eine reine Funktion von
+#   (Route, Ready-Date, Kriterium, Tage, Profil, top_k) + Daten-/Modell-Stand.
+# Streamlit rechnet sie trotzdem bei jeder Widget-Interaktion neu.
+#
+# - Schlüssel enthält die Version (predictor.version = Fingerprint aus
+#   Daten + Modell-Konfiguration, nach update() abgeleitet) → neue Raten oder
+#   ein neu trainiertes Modell treffen nie alte Einträge; beim ersten Zugriff
+#   mit neuer Version werden alte Einträge aktiv entfernt
+# - LRU begrenzt die Anzahl, TTL die Lebensdauer
+# - Thread-sicher (Streamlit-Sessions, Service-Worker teilen 1 Instanz)
+# ════════════════════════════════════════════════════════════════════════════
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAXSIZE = 2048
+DEFAULT_TTL = 3600          # Sekunden
+
+
+def make_key(kind, *args, **params):
+    """Hashbarer Schlüssel: Datumswerte auf Tage normalisiert, Parameter sortiert"""
+    def _norm(value):
+        if isinstance(value, (date, np.datetime64)):
+            return pd.Timestamp(value).strftime('%Y-%m-%d')
+        return value
+    return (kind,) + tuple(_norm(a) for a in args) + tuple(sorted((k, _norm(v)) for k, v in params.items()))
+
+
+class RecommendationCache:
+    """LRU-Cache mit TTL, Versions-Invalidierung und Treffer-Statistik"""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, ttl=DEFAULT_TTL, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.version = None
+        self._entries = OrderedDict()   # (version, key) → (value, expires_at, version)
+        self._lock = threading.RLock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    # ── Versionen ────────────────────────────────────────────────────────────
+
+    def _sync_version(self, version):
+        """Neue Daten-/Modell-Version → alle Einträge älterer Versionen entfernen"""
+        if version is None or version == self.version:
+            return
+        stale = [key for key, (_, _, v) in self._entries.items() if v != version]
+        for key in stale:
+            del self._entries[key]
+        self._stats['invalidations'] += len(stale)
+        self.version = version
+
+    # ── Zugriff ──────────────────────────────────────────────────────────────
+
+    def get(self, key, version=None, default=None):
+        with self._lock:
+            self._sync_version(version)
+            entry = self._entries.get((version, key))
+            if entry is None:
+                self._stats['misses'] += 1
+                return default
+            value, expires_at, _ = entry
+            if expires_at is not None and self.clock() >= expires_at:
+                del self._entries[(version, key)]
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return default
+            self._entries.move_to_end((version, key))
+            self._stats['hits'] += 1
+            return value
+
+    def put(self, key, value, version=None):
+        with self._lock:
+            self._sync_version(version)
+            expires_at = self.clock() + self.ttl if self.ttl is not None else None
+            self._entries[(version, key)] = (value, expires_at, version)
+            self._entries.move_to_end((version, key))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def get_or_compute(self, key, compute, version=None):
+        """
+        Treffer → gespeicherter Wert (1 Dict-Lookup), sonst compute() und ablegen
+
+        compute läuft außerhalb des Locks – gleichzeitige Misses rechnen ggf.
+        doppelt, blockieren sich aber nicht (Coalescing: recommendation_service)
+        """
+        missing = object()
+        value = self.get(key, version, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value, version)
+        return value
+
+    def invalidate(self):
+        """Alles verwerfen (z.B. nach manuellem Daten-Import ohne Versionswechsel)"""
+        with self._lock:
+            self._stats['invalidations'] += len(self._entries)
+            self._entries.clear()
+
+    # ── Statistik ────────────────────────────────────────────────────────────
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'size': len(self._entries),
+                'hit_rate': round(self._stats['hits'] / lookups, 3) if lookups else 0.0,
+                'version': self.version,
+            }
+
+    def __len__(self):
+        return len(self._entries)
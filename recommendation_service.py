@@ -0,0 +1,259 @@
+# ════════════════════════════════════════════════════════════════════════════
+# RECOMMENDATION SERVICE – Lokaler HTTP/JSON-Dienst um den BookingOptimizer
+# ════════════════════════════════════════════════════════════════════════════
+# Bisher rechnet jede Streamlit-Session get_best_booking_dates synchron im
+# Skript-Rerun. Hier: 1 Prozess, Modelle 1× geladen, asyncio nimmt Anfragen
+# an (TMS-Integration, mehrere UIs), CPU-Arbeit läuft im Thread-Pool
+# (NumPy gibt das GIL in den großen Array-Operationen frei).
+#
+# COALESCING: Identische Anfragen, die gleichzeitig "in flight" sind, teilen
+# sich EINE Berechnung – in 2 Stufen:
+#   1. Prognose   (Route, Ready-Date, Tage)            → predict_batch 1×
+#   2. Ranking    (+ Kriterium, Profil, top_k)         → get_best_booking_dates 1×
+# 8 Uhr morgens, 20 Planer auf Shanghai → Hamburg: 1 Prognose, je Kriterium 1 Ranking.
+# Hat der Optimizer einen RecommendationCache, holt Stufe 2 die Prognose selbst
+# (ohne forecast=) → wiederholte Anfragen treffen dessen Empfehlungs-Einträge.
+#
+# ENDPUNKTE (GET mit Query-String oder POST mit JSON-Body):
+#   /recommendations  route, ready_date, criteria=price, days_ahead=14, profile=Default, top_k=3
+#   /forecast         route, ready_date, days_ahead=14
+#   /health           Status + Zähler (berechnet / zusammengelegt)
+#
+# START: python recommendation_service.py --port 8765
+# ════════════════════════════════════════════════════════════════════════════
+
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 1 << 20
+
+CRITERIA = ('price', 'ontime', 'tco', 'risk')
+
+HTTP_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+def _json_default(value):
+    """NumPy-/Pandas-Werte für json.dumps"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(value).strftime('%Y-%m-%d')
+    raise TypeError(f"Nicht serialisierbar: {type(value).__name__}")
+
+
+class RecommendationService:
+    """Async-Fassade um Predictor + Optimizer mit Worker-Pool und Request-Coalescing"""
+
+    def __init__(self, predictor, optimizer, carriers, routes, workers=None):
+        self.predictor = predictor
+        self.optimizer = optimizer
+        self.carriers = list(carriers)
+        self.routes = list(routes)
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='recommend')
+        self._in_flight = {}    # Key → asyncio.Future der laufenden Berechnung
+        self.stats = {'requests': 0, 'computed': 0, 'coalesced': 0, 'errors': 0}
+
+    # ── Coalescing ───────────────────────────────────────────────────────────
+
+    async def _coalesce(self, key, fn, *args):
+        """
+        fn(*args) im Pool – läuft für denselben Key schon eine Berechnung,
+        wird auf deren Ergebnis gewartet statt neu zu rechnen
+        """
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.pool, fn, *args)
+        self._in_flight[key] = future
+        self.stats['computed'] += 1
+        try:
+            return await asyncio.shield(future)
+        finally:
+            # Nur laufende Anfragen teilen sich Ergebnisse – kein Cache
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    # ── Parameter ────────────────────────────────────────────────────────────
+
+    def _forecast_params(self, params):
+        route = params.get('route')
+        if route not in self.routes:
+            raise KeyError(f"Unbekannte Route: {route}")
+        if 'ready_date' not in params:
+            raise ValueError("ready_date fehlt")
+        ready_date = pd.Timestamp(params['ready_date']).normalize()
+        days_ahead = int(params.get('days_ahead', 14))
+        if not 1 <= days_ahead <= 90:
+            raise ValueError("days_ahead muss zwischen 1 und 90 liegen")
+        return route, ready_date, days_ahead
+
+    # ── Endpunkte ────────────────────────────────────────────────────────────
+
+    def _compute_forecast(self, route, ready_date, days_ahead):
+        # Über den Optimizer → nutzt dessen RecommendationCache, falls vorhanden
+        return self.optimizer.route_forecast(route, ready_date, days_ahead)
+
+    async def route_forecast(self, route, ready_date, days_ahead):
+        """(prices (Carrier, Tage), dates) – geteilt von /forecast und /recommendations"""
+        key = ('forecast', route, ready_date, days_ahead)
+        return await self._coalesce(key, self._compute_forecast, route, ready_date, days_ahead)
+
+    async def forecast(self, params):
+        route, ready_date, days_ahead = self._forecast_params(params)
+        prices, dates = await self.route_forecast(route, ready_date, days_ahead)
+        return {
+            'route': route,
+            'dates': [pd.Timestamp(d).strftime('%Y-%m-%d') for d in dates],
+            'prices': {carrier: np.round(row, 2).tolist() for carrier, row in zip(self.carriers, prices)},
+        }
+
+    async def recommendations(self, params):
+        route, ready_date, days_ahead = self._forecast_params(params)
+        criteria = params.get('criteria', 'price')
+        if criteria not in CRITERIA:
+            raise ValueError(f"criteria muss eines von {CRITERIA} sein")
+        profile = params.get('profile', 'Default')
+        top_k = int(params.get('top_k', 3))
+        max_k = len(self.carriers) * days_ahead
+        if not 1 <= top_k <= max_k:
+            raise ValueError(f"top_k muss zwischen 1 und {max_k} liegen")
+
+        options = {'criteria': criteria, 'days_ahead': days_ahead, 'top_k': top_k, 'profile': profile}
+        if self.optimizer.cache is None:
+            options['forecast'] = await self.route_forecast(route, ready_date, days_ahead)
+        # mit Cache ohne forecast → Optimizer nutzt seine versionierten Empfehlungs-Einträge
+        key = ('recommendations', route, ready_date, days_ahead, criteria, profile, top_k)
+        recommendations = await self._coalesce(
+            key, lambda: self.optimizer.get_best_booking_dates(ready_date, route, **options)
+        )
+        return {
+            'route': route,
+            'ready_date': ready_date.strftime('%Y-%m-%d'),
+            'criteria': criteria,
+            'profile': profile,
+            'recommendations': recommendations,
+        }
+
+    async def health(self, params):
+        return {'status': 'ok', 'in_flight': len(self._in_flight), **self.stats}
+
+    # ── HTTP ─────────────────────────────────────────────────────────────────
+
+    async def dispatch(self, method, target, body=b''):
+        """(Status, JSON-Dict) für 1 Anfrage – ohne Socket, auch direkt aufrufbar"""
+        routes = {'/recommendations': self.recommendations, '/forecast': self.forecast, '/health': self.health}
+        url = urlsplit(target)
+        handler = routes.get(url.path.rstrip('/') or '/')
+        if handler is None:
+            return 404, {'error': f"Unbekannter Pfad: {url.path}"}
+        if method not in ('GET', 'POST'):
+            return 405, {'error': f"Methode nicht erlaubt: {method}"}
+
+        self.stats['requests'] += 1
+        try:
+            params = dict(parse_qsl(url.query))
+            if method == 'POST' and body:
+                params.update(json.loads(body))
+            return 200, await handler(params)
+        except (KeyError, ValueError, TypeError) as exc:
+            self.stats['errors'] += 1
+            return 400, {'error': str(exc).strip("'\"")}
+        except Exception as exc:
+            self.stats['errors'] += 1
+            return 500, {'error': f"{type(exc).__name__}: {exc}"}
+
+    async def handle_connection(self, reader, writer):
+        """Minimales HTTP/1.1: 1 Anfrage pro Verbindung, Antwort immer JSON"""
+        try:
+            request_line = (await reader.readline()).decode('latin-1').strip()
+            if not request_line:
+                return
+            method, target, _ = request_line.split(' ', 2)
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1').strip()
+                if not line:
+                    break
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            length = int(headers.get('content-length', 0))
+            if length > MAX_BODY_BYTES:
+                status, payload = 413, {'error': "Body zu groß"}
+            else:
+                body = await reader.readexactly(length) if length else b''
+                status, payload = await self.dispatch(method.upper(), target, body)
+        except (ValueError, asyncio.IncompleteReadError):
+            status, payload = 400, {'error': "Ungültige HTTP-Anfrage"}
+
+        data = json.dumps(payload, ensure_ascii=False, default=_json_default).encode('utf-8')
+        writer.write(
+            f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: close\r\n\r\n".encode('latin-1') + data
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"🚀 Recommendation Service auf http://{host}:{port} ({self.workers} Worker)")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.pool.shutdown(wait=False)
+
+
+def load_service(workers=None):
+    """Modelle wie die Streamlit-UI laden: Daten → Registry → Predictor + Optimizer"""
+    from legacy_modules import load_freight_optimizer
+    from model_registry import ModelRegistry, fingerprint
+    from recommendation_cache import RecommendationCache
+
+    fo = load_freight_optimizer()
+    df = fo.generate_training_data(seed=42)
+    registry = ModelRegistry()
+    key = fingerprint(df, fo.ShippingPricePredictor.model_config())
+    artifacts, _ = registry.get_or_train(
+        key, lambda: fo.ShippingPricePredictor(df).export_artifacts(),
+        meta={'rows': len(df), **fo.ShippingPricePredictor.model_config()},
+    )
+    predictor = fo.ShippingPricePredictor.from_artifacts(df, artifacts, version=key)
+    optimizer = fo.BookingOptimizer(df, predictor, cache=RecommendationCache())
+    return RecommendationService(predictor, optimizer, fo.CARRIERS, fo.ROUTES, workers=workers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Freight Optimizer – lokaler Recommendation Service")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    service = load_service(args.workers)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
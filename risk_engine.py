@@ -0,0 +1,107 @@
+# ════════════════════════════════════════════════════════════════════════════
+# RISK ENGINE – Monte-Carlo-TCO mit Verspätungs- & Event-Risiko
+# ════════════════════════════════════════════════════════════════════════════
+# Pitch: TCO = Fracht + Verspätungsrisiko × Cost of Delay + Event-Impact.
+# Statt eines Punktschätzers für On-Time % werden pro Kandidat tausende
+# Lieferausgänge simuliert:
+#
+#   On-Time ~ clip(μ + σ·Z + Σ Event-Treffer × On-Time-Impact, min, max)
+#   Preis   = Prognose + Σ Event-Treffer × Preis-Impact
+#
+#   centered=True: Treffer als Abweichung vom Erwartungswert, (Treffer − p) × Impact –
+#   wenn μ und Prognose den mittleren Event-Effekt schon enthalten (aus Historie
+#   gelernt). Dann bleibt nur das Risiko, nicht der Effekt selbst, doppelt zu zählen.
+#   Kosten  = Preis + (100 - On-Time)/100 × Transit-Tage × Penalty/Tag
+#
+# - Z und Event-Ziehungen sind für ALLE Kandidaten dieselben (Common Random
+#   Numbers) → Unterschiede im Ranking kommen aus den Kandidaten, nicht aus
+#   dem Zufall; gleicher Seed ⇒ identisches Ergebnis
+# - Antithetische Variaten (Z, -Z) bzw. (U, 1-U) reduzieren die Varianz
+# - Event-Terme hängen nur vom Datum ab → nur auf (Tage, Samples) berechnet
+#   und dann auf Carrier × Route gebroadcastet
+# - Der Preis ist additiv: Quantil(Preis + X) = Preis + Quantil(X) → Routen,
+#   die sich nur im Preis unterscheiden, kosten keine zusätzliche Simulation
+# ════════════════════════════════════════════════════════════════════════════
+
+import numpy as np
+
+from tco_engine import DEFAULT_TRANSIT_DAYS, penalty_per_day
+
+DEFAULT_SAMPLES = 4000
+DEFAULT_SEED = 42
+
+
+class RiskEngine:
+    """Monte-Carlo-Simulation der TCO mit geteilten, antithetischen Samples"""
+
+    def __init__(self, n_samples=DEFAULT_SAMPLES, n_events=0, seed=DEFAULT_SEED):
+        rng = np.random.default_rng(seed)
+        half = (n_samples + 1) // 2
+        z = rng.standard_normal(half)
+        u = rng.random((n_events, half))
+        self.z = np.concatenate([z, -z])[:n_samples]                 # (S,)
+        self.u = np.concatenate([u, 1 - u], axis=1)[:, :n_samples]   # (Events, S)
+        self.n_samples = n_samples
+
+    def _event_terms(self, event_price, event_ontime, event_prob, centered=False):
+        """Event-Treffer pro Sample → (…, S) Preis- und On-Time-Zuschlag"""
+        event_price = np.asarray(event_price, dtype=np.float64)
+        event_ontime = np.asarray(event_ontime, dtype=np.float64)
+        event_prob = np.asarray(event_prob, dtype=np.float64)
+        n_events = np.broadcast_shapes(event_price.shape, event_ontime.shape, event_prob.shape)[-1]
+        if n_events > len(self.u):
+            raise ValueError(f"RiskEngine wurde für {len(self.u)} Events erzeugt, nicht {n_events}")
+
+        price_add, ontime_add = 0.0, 0.0
+        for e in range(n_events):
+            prob = event_prob[..., e, None]
+            hit = self.u[e] < prob
+            weight = np.where(hit, 1.0 - prob, -prob) if centered else hit
+            price_add = price_add + weight * event_price[..., e, None]
+            ontime_add = ontime_add + weight * event_ontime[..., e, None]
+        return price_add, ontime_add
+
+    def simulate(self, price, ontime_mean, ontime_std, transit_days=DEFAULT_TRANSIT_DAYS,
+                 profile="Default", penalty_per_day_late=None,
+                 event_price=None, event_ontime=None, event_prob=None, centered_events=False,
+                 ontime_bounds=(0, 100), quantiles=(0.9, 0.99)):
+        """
+        INPUT (broadcastbar, z.B. (Carrier, Tage)):
+        - price, ontime_mean, ontime_std, transit_days
+        - profile / penalty_per_day_late: Cost of Delay (tco_engine.COST_OF_DELAY_PROFILES)
+        - event_price, event_ontime, event_prob: (…, Events) – Impact falls aktiv +
+          Wahrscheinlichkeit; typischerweise (Tage, Events), gebroadcastet gegen price
+        - centered_events: nur Abweichung vom erwarteten Event-Effekt simulieren
+          (price/ontime_mean enthalten ihn bereits)
+        OUTPUT: Dict mit Arrays in Kandidaten-Form:
+        - expected, std, p90, p99 (TCO €), expected_late_days
+        """
+        penalty = penalty_per_day(profile, penalty_per_day_late)
+        price = np.asarray(price, dtype=np.float64)
+        ontime = (np.asarray(ontime_mean, dtype=np.float64)[..., None]
+                  + np.asarray(ontime_std, dtype=np.float64)[..., None] * self.z)
+        transit = np.asarray(transit_days, dtype=np.float64)[..., None]
+        price_add = 0.0
+
+        if event_prob is not None:
+            price_add, ontime_add = self._event_terms(event_price, event_ontime, event_prob, centered_events)
+            ontime = ontime + ontime_add
+
+        # Der Frachtpreis ist pro Kandidat eine Konstante → nur der zufällige Teil
+        # wird simuliert, und zwar in seiner eigenen (kleineren) Form, z.B.
+        # (Carrier, Tage) statt (Routen, Carrier, Tage). Preis danach addieren.
+        ontime = np.clip(ontime, *ontime_bounds)
+        late_days = (100 - ontime) / 100 * transit
+        random_cost = price_add + late_days * penalty          # (…, S)
+
+        shape = np.broadcast_shapes(price.shape, random_cost.shape[:-1])
+        q = np.quantile(random_cost, quantiles, axis=-1)
+        result = {
+            'expected': np.broadcast_to(price + random_cost.mean(axis=-1), shape),
+            'std': np.broadcast_to(random_cost.std(axis=-1), shape),
+            'expected_late_days': np.broadcast_to(
+                np.broadcast_to(late_days, random_cost.shape).mean(axis=-1), shape),
+        }
+        for level, values in zip(quantiles, q):
+            result[f'p{round(level * 100):d}'] = np.broadcast_to(price + values, shape)
+        return result
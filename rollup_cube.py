@@ -0,0 +1,246 @@
+# ════════════════════════════════════════════════════════════════════════════
+# ROLLUP CUBE – Materialisierte Aggregate Carrier × Route × Jahr × Monat
+# ════════════════════════════════════════════════════════════════════════════
+# Statistiken (Optimizer, UI-Tabelle, find_cheapest_carrier, Validierungs-
+# Report) liefen bisher als groupby über die komplette Historie – bei jedem
+# Rerun. Hier 1× pro Zeile aufaddiert, danach beliebig oft abgefragt:
+#
+#   count, sum, sumsq, min, max   (Carrier, Route, Jahr, Monat)  je Kennzahl
+#   Histogramm-Sketch             (Carrier, Route, Jahr, Bins)   für Quantile
+#
+# - Alle Werte sind additiv (min/max: elementweise) → append() für neue
+#   Zeilen kostet O(neue Zeilen), unabhängig von der Historie
+# - Mittel/Std aus sum/sumsq (Std mit ddof=1 wie pandas)
+# - Quantile aus dem Histogramm, linear im Bin interpoliert → Genauigkeit
+#   = Bin-Breite (z.B. €5 bzw. 0.1 %-Punkte)
+# ════════════════════════════════════════════════════════════════════════════
+
+import numpy as np
+import pandas as pd
+
+# Kennzahl → (untere Grenze, obere Grenze, Bins) des Quantil-Sketches
+DEFAULT_MEASURES = {
+    'price': (0, 6000, 1200),
+    'ontime': (50, 100, 500),
+}
+
+DIMS = ('carrier', 'route', 'year', 'month')
+
+
+class RollupCube:
+    """Additive Aggregate pro Carrier × Route × Jahr × Monat, inkrementell erweiterbar"""
+
+    def __init__(self, carriers, routes, first_year, measures=None):
+        self.carriers = list(carriers)
+        self.routes = list(routes)
+        self.first_year = int(first_year)
+        self.measures = dict(DEFAULT_MEASURES if measures is None else measures)
+        self.count = np.zeros((len(self.carriers), len(self.routes), 0, 12), dtype=np.int64)
+        self.data = {}          # Kennzahl → {'sum', 'sumsq', 'min', 'max', 'sketch'}
+        for measure, (_, _, n_bins) in self.measures.items():
+            self.data[measure] = {
+                'sum': np.zeros(self.count.shape, dtype=np.float64),
+                'sumsq': np.zeros(self.count.shape, dtype=np.float64),
+                'min': np.full(self.count.shape, np.inf),
+                'max': np.full(self.count.shape, -np.inf),
+                'sketch': np.zeros(self.count.shape[:3] + (n_bins,), dtype=np.uint32),
+            }
+
+    @classmethod
+    def from_frame(cls, df, carriers=None, routes=None, measures=None, date_col='date'):
+        """Cube aus einer kompletten Historie (1 Durchlauf)"""
+        carriers = list(carriers) if carriers is not None else sorted(df['carrier'].unique())
+        routes = list(routes) if routes is not None else sorted(df['route'].unique())
+        first_year = pd.to_datetime(df[date_col]).dt.year.min() if len(df) else pd.Timestamp.now().year
+        cube = cls(carriers, routes, first_year, measures)
+        return cube.append(df, date_col)
+
+    @property
+    def years(self):
+        return list(range(self.first_year, self.first_year + self.count.shape[2]))
+
+    # ── Aufbau ───────────────────────────────────────────────────────────────
+
+    def _grow(self, n_years):
+        """Jahr-Achse nach hinten verlängern (neue Jahre = leere Zellen)"""
+        extra = n_years - self.count.shape[2]
+        if extra <= 0:
+            return
+
+        def _pad(arr, fill):
+            pad = np.full(arr.shape[:2] + (extra,) + arr.shape[3:], fill, dtype=arr.dtype)
+            return np.concatenate([arr, pad], axis=2)
+
+        self.count = _pad(self.count, 0)
+        for stats in self.data.values():
+            stats['sum'] = _pad(stats['sum'], 0)
+            stats['sumsq'] = _pad(stats['sumsq'], 0)
+            stats['min'] = _pad(stats['min'], np.inf)
+            stats['max'] = _pad(stats['max'], -np.inf)
+            stats['sketch'] = _pad(stats['sketch'], 0)
+
+    def append(self, rows, date_col='date'):
+        """
+        Neue Zeilen (date, carrier, route, Kennzahlen) einrechnen – O(neue Zeilen)
+
+        Unbekannte Carrier/Routen werden ignoriert. Jahre vor first_year: ValueError
+        """
+        dates = pd.to_datetime(rows[date_col])
+        year = dates.dt.year.to_numpy() - self.first_year
+        if len(year) and year.min() < 0:
+            raise ValueError(f"Zeilen vor {self.first_year} passen nicht in den Cube")
+        c = pd.Categorical(rows['carrier'], categories=self.carriers).codes.astype(np.int64)
+        r = pd.Categorical(rows['route'], categories=self.routes).codes.astype(np.int64)
+        month = dates.dt.month.to_numpy() - 1
+        keep = (c >= 0) & (r >= 0)
+        c, r, year, month = c[keep], r[keep], year[keep], month[keep]
+        if not len(c):
+            return self
+        self._grow(int(year.max()) + 1)
+
+        shape = self.count.shape
+        cell = np.ravel_multi_index((c, r, year, month), shape)
+        self.count += np.bincount(cell, minlength=self.count.size).reshape(shape)
+
+        for measure, (lo, hi, n_bins) in self.measures.items():
+            values = rows[measure].to_numpy(dtype=np.float64)[keep]
+            valid = ~np.isnan(values)
+            stats = self.data[measure]
+            cv, v = cell[valid], values[valid]
+            stats['sum'] += np.bincount(cv, weights=v, minlength=self.count.size).reshape(shape)
+            stats['sumsq'] += np.bincount(cv, weights=v * v, minlength=self.count.size).reshape(shape)
+            np.minimum.at(stats['min'].reshape(-1), cv, v)
+            np.maximum.at(stats['max'].reshape(-1), cv, v)
+
+            bins = np.clip(((v - lo) / (hi - lo) * n_bins).astype(np.int64), 0, n_bins - 1)
+            sketch_cell = np.ravel_multi_index((c[valid], r[valid], year[valid]), shape[:3])
+            sketch = stats['sketch']
+            sketch += np.bincount(sketch_cell * n_bins + bins, minlength=sketch.size).reshape(sketch.shape).astype(np.uint32)
+        return self
+
+    # ── Abfragen ─────────────────────────────────────────────────────────────
+
+    def _selection(self, carriers=None, routes=None, years=None, months=None):
+        """Index-Arrays pro Dimension (None = alle)"""
+        def _pick(values, universe):
+            if values is None:
+                return np.arange(len(universe))
+            lookup = {v: i for i, v in enumerate(universe)}
+            return np.array([lookup[v] for v in values if v in lookup], dtype=np.int64)
+
+        return (
+            _pick(carriers, self.carriers),
+            _pick(routes, self.routes),
+            _pick(years, self.years),
+            np.arange(12) if months is None else np.asarray(months, dtype=np.int64) - 1,
+        )
+
+    def _reduce(self, arr, by, selection, op):
+        """Auswahl + Reduktion über alle Dimensionen, die nicht in `by` sind"""
+        sub = arr[np.ix_(*selection)] if arr.ndim == 4 else arr[np.ix_(*selection[:3])]
+        axes = tuple(i for i, dim in enumerate(DIMS[:sub.ndim]) if dim not in by)
+        return op(sub, axis=axes) if axes else sub
+
+    def _index(self, by, selection):
+        """Gruppen-Index in by-Reihenfolge (1 Dimension → einfacher Index)"""
+        labels = {'carrier': self.carriers, 'route': self.routes, 'year': self.years,
+                  'month': list(range(1, 13))}
+        levels = [np.asarray(labels[dim], dtype=object)[selection[DIMS.index(dim)]] for dim in by]
+        if not by:
+            return pd.RangeIndex(1)
+        if len(by) == 1:
+            return pd.Index(levels[0], name=by[0])
+        return pd.MultiIndex.from_product(levels, names=list(by))
+
+    def stats(self, measure, by=('carrier',), carriers=None, routes=None, years=None, months=None):
+        """
+        count, mean, std, min, max pro Gruppe – in Mikrosekunden statt groupby
+
+        by: Teilmenge von ('carrier', 'route', 'year', 'month'), z.B. ('route', 'carrier')
+        OUTPUT: DataFrame (Index = by), nur Gruppen mit Werten
+        """
+        by = tuple(by)
+        selection = self._selection(carriers, routes, years, months)
+        stats = self.data[measure]
+        count = self._reduce(self.count, by, selection, np.sum)
+        total = self._reduce(stats['sum'], by, selection, np.sum)
+        sumsq = self._reduce(stats['sumsq'], by, selection, np.sum)
+        low = self._reduce(stats['min'], by, selection, np.min)
+        high = self._reduce(stats['max'], by, selection, np.max)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = total / count
+            var = (sumsq - total * mean) / (count - 1)
+        index = self._index(by, selection)
+        # by-Reihenfolge der Ausgabe = Reihenfolge in DIMS → ggf. umsortieren
+        order = sorted(range(len(by)), key=lambda i: DIMS.index(by[i]))
+        perm = np.argsort(order)
+
+        def _flat(arr):
+            return np.transpose(arr, perm).ravel() if by else np.ravel(arr)
+
+        frame = pd.DataFrame({
+            'count': _flat(count),
+            'mean': _flat(mean),
+            'std': _flat(np.sqrt(np.clip(var, 0, None))),
+            'min': _flat(low),
+            'max': _flat(high),
+        }, index=index)
+        return frame[frame['count'] > 0]
+
+    def quantile(self, measure, q, by=('carrier',), carriers=None, routes=None, years=None):
+        """
+        Quantile aus dem Histogramm-Sketch (Genauigkeit = Bin-Breite)
+
+        by: Teilmenge von ('carrier', 'route', 'year') – Monate hat der Sketch nicht
+        OUTPUT: DataFrame (Index = by, Spalten = q)
+        """
+        by = tuple(by)
+        if 'month' in by:
+            raise ValueError("Quantile gibt es nur pro Carrier/Route/Jahr")
+        lo, hi, n_bins = self.measures[measure]
+        selection = self._selection(carriers, routes, years)
+        sketch = self.data[measure]['sketch'][np.ix_(*selection[:3])]
+        sub = np.transpose(sketch, [DIMS.index(d) for d in by] + [i for i in range(3) if DIMS[i] not in by] + [3])
+        hist = sub.reshape(sub.shape[:len(by)] + (-1, n_bins)).sum(axis=-2).reshape(-1, n_bins).astype(np.float64)
+
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        cum = np.cumsum(hist, axis=1)
+        totals = cum[:, -1:]
+        target = q[None, :] * totals                                   # (Gruppen, Q)
+        bin_idx = np.minimum((cum[:, None, :] < target[:, :, None]).sum(axis=2), n_bins - 1)
+        before = np.where(bin_idx > 0, np.take_along_axis(cum, np.maximum(bin_idx - 1, 0), axis=1), 0)
+        inside = np.take_along_axis(hist, bin_idx, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            frac = np.where(inside > 0, (target - before) / inside, 0.5)
+        width = (hi - lo) / n_bins
+        values = np.where(totals > 0, lo + (bin_idx + frac) * width, np.nan)
+
+        frame = pd.DataFrame(values, index=self._index(by, selection), columns=q)
+        return frame.dropna(how='all')
+
+    def total_count(self, by=('carrier',), **filters):
+        """Anzahl Zeilen pro Gruppe (z.B. Carrier-/Routen-Verteilung)"""
+        return self.stats(next(iter(self.measures)), by, **filters)['count']
+
+    # ── Persistenz ───────────────────────────────────────────────────────────
+
+    def save(self, path):
+        arrays = {'count': self.count}
+        for measure, stats in self.data.items():
+            arrays.update({f'{measure}__{name}': arr for name, arr in stats.items()})
+        np.savez_compressed(
+            path, carriers=np.array(self.carriers), routes=np.array(self.routes),
+            first_year=self.first_year, measures=np.array(list(self.measures)),
+            bounds=np.array(list(self.measures.values()), dtype=np.float64), **arrays,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            measures = {m: (lo, hi, int(n)) for m, (lo, hi, n) in zip(f['measures'].tolist(), f['bounds'])}
+            cube = cls(f['carriers'].tolist(), f['routes'].tolist(), int(f['first_year']), measures)
+            cube.count = f['count']
+            for measure in measures:
+                cube.data[measure] = {name: f[f'{measure}__{name}'] for name in ('sum', 'sumsq', 'min', 'max', 'sketch')}
+        return cube
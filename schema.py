@@ -0,0 +1,154 @@
+# ════════════════════════════════════════════════════════════════════════════
+# SCHEMA – Gemeinsame Codes für Carrier, Routen, Events & Wochentage
+# ════════════════════════════════════════════════════════════════════════════
+# Bisher trägt jede Zeile eigene Python-Strings: carrier, route, active_events
+# (" | "-verkettet), day_of_week (strftime('%A')) und date (strftime).
+# Kompakt:
+#
+#   carrier / route / day_of_week → Categorical (int8-Codes + 1 Lookup-Tabelle)
+#   active_events                 → event_mask uint8/uint16 (Bit j = Event j aktiv)
+#   date                          → datetime64
+#
+# Event-Häufigkeiten = Bit-Test über ein Histogramm der Masken statt
+# str.split pro Zeile. Anzeige-Strings nur bei Bedarf, 1× pro eindeutiger Maske.
+# ════════════════════════════════════════════════════════════════════════════
+
+import numpy as np
+import pandas as pd
+
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+EVENT_SEPARATOR = " | "
+NO_EVENTS = "None"
+
+
+class FreightSchema:
+    """Lookup-Tabellen + Kodierung für Carrier, Routen, Events und Wochentage"""
+
+    def __init__(self, carriers, routes, events=()):
+        self.carriers = list(carriers)
+        self.routes = list(routes)
+        self.events = list(events)
+        if len(self.events) > 16:
+            raise ValueError("event_mask unterstützt höchstens 16 Events")
+
+        self.carrier_dtype = pd.CategoricalDtype(self.carriers)
+        self.route_dtype = pd.CategoricalDtype(self.routes)
+        self.day_dtype = pd.CategoricalDtype(DAY_NAMES)
+        self.mask_dtype = np.uint8 if len(self.events) <= 8 else np.uint16
+        self.bits = (1 << np.arange(len(self.events))).astype(self.mask_dtype)
+        self._event_bit = dict(zip(self.events, self.bits.tolist()))
+
+    # ── Carrier / Route / Wochentag ──────────────────────────────────────────
+
+    def carrier_codes(self, values):
+        """Carrier-Namen (oder Categorical) → Index in self.carriers, -1 = unbekannt"""
+        return pd.Categorical(values, dtype=self.carrier_dtype).codes
+
+    def route_codes(self, values):
+        return pd.Categorical(values, dtype=self.route_dtype).codes
+
+    def carriers_from_codes(self, codes):
+        return pd.Categorical.from_codes(codes, dtype=self.carrier_dtype)
+
+    def routes_from_codes(self, codes):
+        return pd.Categorical.from_codes(codes, dtype=self.route_dtype)
+
+    def days_from_dow(self, dow):
+        """Wochentag 0=Montag … 6=Sonntag → Categorical mit Namen wie strftime('%A')"""
+        return pd.Categorical.from_codes(np.asarray(dow, dtype=np.int8), dtype=self.day_dtype)
+
+    # ── Events ───────────────────────────────────────────────────────────────
+
+    def event_mask(self, active):
+        """bool (…, Events) → Bitmaske (…); z.B. EventCalendar.active"""
+        active = np.asarray(active, dtype=bool)
+        return np.where(active, self.bits, 0).sum(axis=-1, dtype=self.mask_dtype)
+
+    def mask_from_names(self, names):
+        """Liste von Event-Namen → 1 Maske"""
+        mask = 0
+        for name in names:
+            mask |= self._event_bit[name]
+        return self.mask_dtype(mask)
+
+    def parse_labels(self, labels):
+        """Alte " | "-Strings (CSV) → Masken; jeder eindeutige String wird 1× zerlegt"""
+        codes, uniques = pd.factorize(pd.Series(labels).fillna(NO_EVENTS))
+        lookup = np.array([
+            self.mask_from_names([] if label == NO_EVENTS else label.split(EVENT_SEPARATOR))
+            for label in uniques
+        ], dtype=self.mask_dtype)
+        return lookup[codes] if len(lookup) else np.zeros(len(codes), dtype=self.mask_dtype)
+
+    def has_event(self, masks, event):
+        """bool pro Zeile: ist `event` aktiv?"""
+        return (np.asarray(masks) & self._event_bit[event]) != 0
+
+    def event_names(self, mask):
+        return [event for event, bit in self._event_bit.items() if int(mask) & bit]
+
+    def event_labels(self, masks):
+        """Anzeige-Strings wie früher active_events (" | "-verkettet, "None" wenn leer)"""
+        masks = np.asarray(masks, dtype=self.mask_dtype)
+        uniques, inverse = np.unique(masks, return_inverse=True)
+        labels = np.array([EVENT_SEPARATOR.join(self.event_names(m)) or NO_EVENTS for m in uniques],
+                          dtype=object)
+        return labels[inverse]
+
+    def event_counts(self, masks):
+        """Zeilen pro Event: Histogramm über alle möglichen Masken, dann 1 Bit-Test je Event"""
+        histogram = np.bincount(np.asarray(masks, dtype=np.int64), minlength=1 << len(self.events))
+        values = np.arange(len(histogram))
+        return pd.Series(
+            [int(histogram[(values & bit) != 0].sum()) for bit in self.bits.tolist()],
+            index=self.events, dtype=np.int64,
+        )
+
+    # ── DataFrames ───────────────────────────────────────────────────────────
+
+    def encode(self, df):
+        """
+        Beliebiges Zeilen-Format (Strings, CSV, Parquet) → kompakte Spalten
+
+        carrier/route/day_of_week → Categorical mit fester Kategorien-Reihenfolge,
+        date → datetime64, active_events (String) → event_mask
+        """
+        df = df.copy()
+        if 'date' in df:
+            df['date'] = pd.to_datetime(df['date'])
+        if 'carrier' in df:
+            df['carrier'] = pd.Categorical(df['carrier'], dtype=self.carrier_dtype)
+        if 'route' in df:
+            df['route'] = pd.Categorical(df['route'], dtype=self.route_dtype)
+        if 'day_of_week' in df:
+            df['day_of_week'] = pd.Categorical(df['day_of_week'], dtype=self.day_dtype)
+        if 'active_events' in df:
+            df['event_mask'] = self.parse_labels(df.pop('active_events').values)
+        return df
+
+    def from_codes(self, rows):
+        """
+        Generator-Zeilen (Dicts mit int-Codes) → kompakte Spalten
+
+        carrier/route/day_of_week als Codes → Categorical, event_mask als
+        Bitmaske, Zähler/Kalenderfelder auf int16/int8 verkleinert
+        """
+        df = pd.DataFrame(rows)
+        df['date'] = df['date'].astype('datetime64[ns]')
+        df['carrier'] = self.carriers_from_codes(df['carrier'])
+        df['route'] = self.routes_from_codes(df['route'])
+        df['event_mask'] = df['event_mask'].astype(self.mask_dtype)
+        df['shipment_count'] = df['shipment_count'].astype(np.int16)
+        df['year'] = df['year'].astype(np.int16)
+        df['month'] = df['month'].astype(np.int8)
+        df['day_of_week'] = self.days_from_dow(df['day_of_week'])
+        return df
+
+    def decode(self, df):
+        """Kompakte Spalten → Anzeige/Export mit Strings (z.B. für CSV)"""
+        df = df.copy()
+        if 'event_mask' in df:
+            df['active_events'] = self.event_labels(df.pop('event_mask').values)
+        if 'date' in df:
+            df['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
+        return df
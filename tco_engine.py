@@ -0,0 +1,101 @@
+# ════════════════════════════════════════════════════════════════════════════
+# TCO ENGINE – Vektorisierte Total Cost of Ownership mit Cost-of-Delay-Profilen
+# ════════════════════════════════════════════════════════════════════════════
+# TCO = Frachtpreis + erwartete Verspätungskosten (+ Event-Anteil)
+#
+#   erwartete Verspätungstage = (100 - On-Time %) / 100 × Transit-Tage
+#   Verspätungskosten         = Verspätungstage × Penalty pro Tag (Profil)
+#
+# Alle Eingaben sind Arrays beliebiger (broadcastbarer) Form, z.B.
+# (Carrier, Tage). Verspätungstage werden 1× berechnet, danach ist jedes
+# Profil nur noch eine Multiplikation → Re-Ranking ohne neue Prognose.
+#
+# PROFILE aus dem Pitch (Feature 2C: Cost-of-Delay Sensitivity)
+# ════════════════════════════════════════════════════════════════════════════
+
+import numpy as np
+
+DEFAULT_TRANSIT_DAYS = 12   # Annahme: 10-14 Tage Transit
+
+COST_OF_DELAY_PROFILES = {
+    # Bisheriges Verhalten von calculate_tco: €100 pro Verspätungstag
+    "Default": {"penalty_per_day_late": 100, "label": "Standard-TCO (€100/Tag)"},
+    "Bulk Goods": {"penalty_per_day_late": 500, "label": "Preis zählt am meisten"},
+    "Standard Assembly": {"penalty_per_day_late": 1000, "label": "Normale Fertigung"},
+    "Time-Sensitive": {"penalty_per_day_late": 2000, "label": "Fließband, risikoscheu"},
+    "JIT Manufacturing": {"penalty_per_day_late": 5000, "label": "Produktionsstopp bei Verspätung"},
+}
+
+
+def penalty_per_day(profile, penalty_per_day_late=None):
+    """€ pro Verspätungstag für ein Profil (explizite Angabe hat Vorrang)"""
+    if penalty_per_day_late is not None:
+        return penalty_per_day_late
+    if profile not in COST_OF_DELAY_PROFILES:
+        raise KeyError(f"Unbekanntes Cost-of-Delay-Profil: {profile}")
+    return COST_OF_DELAY_PROFILES[profile]["penalty_per_day_late"]
+
+
+class TCOEngine:
+    """
+    Kandidaten-Menge 1× aufbereiten, dann beliebig oft pro Profil bewerten
+
+    INPUT (Arrays, broadcastbar):
+    - price: Frachtpreis €
+    - ontime_pct: erwartete On-Time % (historisch)
+    - transit_days: Transit-Tage (Default 12)
+    - event_ontime_impact: zusätzliche On-Time-Änderung durch Events in %-Punkten
+      (negativ = schlechter, z.B. aus EventCalendar.ontime_impact)
+    """
+
+    def __init__(self, price, ontime_pct, transit_days=DEFAULT_TRANSIT_DAYS, event_ontime_impact=0.0):
+        self.price = np.asarray(price, dtype=np.float64)
+        ontime = np.asarray(ontime_pct, dtype=np.float64)
+        transit = np.asarray(transit_days, dtype=np.float64)
+        event = np.asarray(event_ontime_impact, dtype=np.float64)
+
+        # Verspätungstage getrennt nach Ursache (Basis vs. Event), einmalig
+        self.late_days = np.broadcast_to((100 - ontime) / 100 * transit, self._shape(ontime, transit))
+        self.event_late_days = np.broadcast_to(
+            np.clip(-event, 0, None) / 100 * transit, self._shape(event, transit)
+        )
+
+    def _shape(self, *arrays):
+        return np.broadcast_shapes(self.price.shape, *(a.shape for a in arrays))
+
+    def breakdown(self, profile="Default", penalty_per_day_late=None):
+        """Kosten-Komponenten pro Kandidat: freight, delay, event_delay, total"""
+        penalty = penalty_per_day(profile, penalty_per_day_late)
+        freight = np.broadcast_to(self.price, self._shape(self.late_days, self.event_late_days))
+        delay = self.late_days * penalty
+        event_delay = self.event_late_days * penalty
+        return {
+            'freight': freight,
+            'delay': delay,
+            'event_delay': event_delay,
+            'total': freight + delay + event_delay,
+        }
+
+    def totals(self, profiles=None):
+        """TCO für mehrere Profile auf einmal → (Profile, *Kandidaten-Form)"""
+        profiles = list(COST_OF_DELAY_PROFILES) if profiles is None else list(profiles)
+        penalties = np.array([penalty_per_day(p) for p in profiles], dtype=np.float64)
+        penalties = penalties.reshape((-1,) + (1,) * self.late_days.ndim)
+        return self.price + (self.late_days + self.event_late_days) * penalties
+
+    def rank(self, profile="Default", k=3):
+        """Flache Indizes der k günstigsten Kandidaten (TCO aufsteigend, stabil)"""
+        total = self.breakdown(profile)['total'].ravel()
+        k = min(k, total.size)
+        candidates = np.argpartition(total, k - 1)[:k] if k < total.size else np.arange(total.size)
+        # Gleichstand: alle mit TCO ≤ Schwelle berücksichtigen, frühere Position gewinnt
+        candidates = np.flatnonzero(total <= total[candidates].max())
+        return candidates[np.lexsort((candidates, total[candidates]))][:k]
+
+
+def calculate_tco(price, ontime_pct, transit_days=DEFAULT_TRANSIT_DAYS, penalty_per_day_late=100,
+                  event_ontime_impact=0.0):
+    """Kurzform: nur die Gesamt-TCO (Skalar oder Array)"""
+    engine = TCOEngine(price, ontime_pct, transit_days, event_ontime_impact)
+    total = engine.breakdown(penalty_per_day_late=penalty_per_day_late)['total']
+    return total if total.ndim else float(total)